@@ -1,65 +1,119 @@
-from flask import Flask, render_template_string, request, jsonify
-from datetime import datetime, timedelta, date
-import sqlite3
-from flask_sqlalchemy import SQLAlchemy
-
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///turnos.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db = SQLAlchemy(app)
-
-# Modelo para la base de datos
-class CirujanosTurno(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    fecha = db.Column(db.Date, nullable=False)
-    nombre_turno = db.Column(db.String(50), nullable=False)
-    cirujano1 = db.Column(db.String(100), nullable=False)
-    cirujano2 = db.Column(db.String(100), nullable=False)
-
-    def __repr__(self):
-        return f'<Turno {self.fecha} {self.nombre_turno}>'
-
-# Función para inicializar la base de datos con los datos por defecto
-def inicializar_db():
-    with app.app_context():
-        db.create_all()
-        
-        # Verificar si ya hay datos
-        if CirujanosTurno.query.first() is None:
-            # Datos iniciales de cirujanos por turno
-            datos_iniciales = {
-                "Turno miércoles": ["Dr. Pérez", "Dr. González"],
-                "Turno jueves": ["Dr. Rodríguez", "Dr. Sánchez"],
-                "Volante 1": ["Dr. López", "Dr. Martínez"],
-                "Volante 2": ["Dr. García", "Dr. Torres"],
-                "Turno lunes": ["Dr. Díaz", "Dr. Ruiz"],
-                "Turno martes": ["Dr. Morales", "Dr. Castro"]
-            }
-            
-            # Crear registros para todo 2025 y 2026
-            for año in [2025, 2026]:
-                for mes in range(1, 13):
-                    for dia in range(1, 32):
-                        try:
-                            fecha = datetime(año, mes, dia).date()
-                            # Obtener el turno para esta fecha usando la lógica existente
-                            turno = get_turno_for_date(fecha, TURNOS)
-                            if turno:
-                                nuevo_turno = CirujanosTurno(
-                                    fecha=fecha,
-                                    nombre_turno=turno['nombre'],
-                                    cirujano1=datos_iniciales[turno['nombre']][0],
-                                    cirujano2=datos_iniciales[turno['nombre']][1]
-                                )
-                                db.session.add(nuevo_turno)
-                        except ValueError:
-                            # Ignorar fechas inválidas (ej. 31 de abril)
-                            continue
-            
-            db.session.commit()
+from flask import Blueprint, Flask, abort, current_app, redirect, render_template, request, jsonify, Response, send_file, stream_with_context
+from markupsafe import Markup
+from functools import lru_cache, wraps
+from datetime import datetime, timedelta, date, timezone
+import calendar
+import hashlib
+import json
+import os
+from base_datos import bloquear_revisiones, configurar_base_datos, instalar_pragmas
+from descanso import infracciones_nuevas, rango_afectado
+from estaticos import CACHE_REVALIDAR, Estaticos, elegir_codificacion, etag_variante
+from eventos import DifusorCambios
+from guardia import CacheGuardia
+from instantanea import InstantaneaBinaria, serializar_instantanea
+from metricas import instalar_metricas, seccion
+from modelos import (
+    LIMITE_CELDAS_SYNC, CambioCalendario, CirujanosTurno, HashMes, HistorialCelda, PuntoControlMes,
+    actualizar_hashes_mes, actualizar_puntos_control, años_modificados, db, formatear_hash,
+    generar_calendario, generar_calendario_año, inicializar_db, leer_cambios, leer_filas_turnos,
+    leer_ultimo_id, reconstruir_mes, revision_en, serializar_celda
+)
+from publicador import Publicador
+from tareas import TareaAgrupada
+from rotacion import COLORES_TURNOS, TURNOS, obtener_instantanea, turno_rotacion
+
+# Capa web. El motor de rotación está en rotacion.py y la base de datos en
+# modelos.py; este módulo solo define las rutas y create_app(), que arma
+# una aplicación con ellas. Importarlo no crea ninguna aplicación.
+web = Blueprint('calendario', __name__)
+
+# Años de la página principal
+AÑOS_CALENDARIO = (2025, 2026)
+
+def en_contexto(app, funcion):
+    # Los hilos del difusor y del publicador no tienen contexto de aplicación
+    @wraps(funcion)
+    def envuelta(*args, **kwargs):
+        with app.app_context():
+            return funcion(*args, **kwargs)
+    return envuelta
+
+class Servicios:
+    """
+    Lo que cada aplicación mantiene entre peticiones: los estáticos, el
+    difusor de cambios, la caché de guardia, el publicador y la tarea de
+    puntos de control. Las plantillas
+    y el service worker se preparan la primera vez que se usan.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # La carpeta static/ la sirve Estaticos, con hash en el nombre y compresión
+        self.estaticos = Estaticos(app, os.path.join(app.root_path, 'static'))
+        self.difusor = DifusorCambios(en_contexto(app, leer_cambios), en_contexto(app, leer_ultimo_id),
+                                      max_conexiones=app.config['SSE_MAX_CONEXIONES'])
+        self.cache_guardia = CacheGuardia(
+            turno_rotacion, COLORES_TURNOS, en_contexto(app, leer_filas_turnos), self.difusor)
+        self.publicador = Publicador(
+            app.config['CARPETA_PUBLICADO'],
+            AÑOS_CALENDARIO,
+            en_contexto(app, renderizar_año),
+            en_contexto(app, renderizar_pagina),
+            en_contexto(app, leer_ultimo_id),
+            en_contexto(app, años_modificados),
+            adicionales=[en_contexto(app, escribir_instantanea_binaria)]
+        )
+        # Los puntos de control del historial no dependen de que se pueda publicar
+        self.puntos_control = TareaAgrupada(en_contexto(app, actualizar_puntos_control), 'puntos-control')
+        self._plantillas = None
+        self._service_worker = None
+        self._binaria = (None, None)  # (identidad del archivo, lector)
+
+    @property
+    def plantillas(self):
+        # (meses, página), compiladas una sola vez; render_template_string
+        # las compilaría en cada llamada
+        if self._plantillas is None:
+            self._plantillas = (self.app.jinja_env.from_string(HTML_MESES),
+                                self.app.jinja_env.from_string(HTML_TEMPLATE))
+        return self._plantillas
+
+    @property
+    def service_worker(self):
+        # (versión de los recursos, código del service worker)
+        if self._service_worker is None:
+            self._service_worker = generar_service_worker(self.estaticos)
+        return self._service_worker
+
+    def cerrar(self):
+        """
+        Detiene los hilos en segundo plano y cierra las conexiones, al
+        terminar un test o un script y antes de borrar su carpeta temporal.
+        """
+        self.difusor.detener()
+        self.publicador.tarea.esperar()
+        self.puntos_control.esperar()
+        with self.app.app_context():
+            db.engine.dispose()
+
+    def instantanea_publicada(self):
+        # Reabre el archivo solo cuando otro proceso lo reemplazó; None si no existe
+        ruta = self.publicador.ruta('calendario.bin')
+        try:
+            info = os.stat(ruta)
+        except FileNotFoundError:
+            return None
+        clave = (info.st_ino, info.st_mtime_ns)
+        if self._binaria[0] != clave:
+            self._binaria = (clave, InstantaneaBinaria(ruta))
+        return self._binaria[1]
+
+def servicios():
+    return current_app.extensions['calendario']
 
 # Modificar la ruta de actualización de cirujanos
-@app.route('/actualizar_cirujanos', methods=['POST'])
+@web.route('/actualizar_cirujanos', methods=['POST'])
 def actualizar_cirujanos():
     try:
         data = request.get_json()
@@ -67,269 +121,249 @@ def actualizar_cirujanos():
         nombre_turno = data['nombreTurno']
         aplicar_futuro = data['aplicarFuturo']
         
+        # Antes de leer los turnos: con el bloqueo de escritura tomado nadie
+        # más los cambia hasta el commit, así que `anteriores` sirve para el
+        # delta de los hashes, y las revisiones se confirman en orden
+        bloquear_revisiones(db.session)
         if aplicar_futuro:
             # Actualizar todos los turnos del mismo tipo desde la fecha en adelante
-            turnos = CirujanosTurno.query.filter(
-                CirujanosTurno.fecha >= fecha,
-                CirujanosTurno.nombre_turno == nombre_turno
-            ).all()
-            
-            for turno in turnos:
-                turno.cirujano1 = data['cirujano1']
-                turno.cirujano2 = data['cirujano2']
+            filtro = (CirujanosTurno.fecha >= fecha, CirujanosTurno.nombre_turno == nombre_turno)
         else:
             # Actualizar solo el turno seleccionado
-            turno = CirujanosTurno.query.filter_by(fecha=fecha).first()
-            if turno:
-                turno.cirujano1 = data['cirujano1']
-                turno.cirujano2 = data['cirujano2']
+            filtro = (CirujanosTurno.fecha == fecha,)
+        turnos = CirujanosTurno.query.filter(*filtro).all()
+
+        anteriores = [(t.fecha, t.nombre_turno, t.cirujano1, t.cirujano2) for t in turnos]
+        if turnos:
+            # Un solo UPDATE con el mismo filtro, aunque algunos días ya
+            # tuvieran uno de los cirujanos; también actualiza los objetos cargados
+            db.session.execute(
+                db.update(CirujanosTurno).where(*filtro).values(
+                    cirujano1=data['cirujano1'], cirujano2=data['cirujano2']),
+                execution_options={'synchronize_session': 'evaluate'}
+            )
+
+        # Reglas de descanso: se revisan las guardias de los cirujanos
+        # asignados en las ventanas que tocan los días editados, antes y
+        # después de la edición (la consulta ya ve el UPDATE). Solo cuentan
+        # las infracciones nuevas; con forzar la edición se guarda igual y
+        # vuelven como avisos.
+        avisos = []
+        if turnos:
+            cirujanos = {data['cirujano1'], data['cirujano2']}
+            desde, hasta = rango_afectado([turno.fecha for turno in turnos])
+            despues = leer_filas_turnos(desde, hasta, cirujanos)
+            editadas = {fila[0]: fila for fila in anteriores}
+            antes = [editadas.get(fila[0], fila) for fila in despues]
+            avisos = [infraccion.como_dict() for infraccion in infracciones_nuevas(antes, despues, cirujanos)]
+            if avisos and not data.get('forzar'):
+                db.session.rollback()
+                return jsonify({
+                    'success': False,
+                    'error': 'El cambio no respeta las reglas de descanso',
+                    'infracciones': avisos
+                })
+
+        celdas = [serializar_celda(turno) for turno in turnos]
+        if celdas:
+            # Se registra en la misma transacción para que los demás
+            # navegadores reciban exactamente lo que se confirmó
+            cambio = CambioCalendario(
+                datos=json.dumps({'celdas': celdas}, ensure_ascii=False, separators=(',', ':'))
+            )
+            db.session.add(cambio)
+            db.session.flush()  # asigna cambio.id, la revisión del historial
+            db.session.execute(db.insert(HistorialCelda), [{
+                'revision': cambio.id,
+                'mes': turno.fecha.replace(day=1),
+                'fecha': turno.fecha,
+                'nombre_turno': turno.nombre_turno,
+                'cirujano1': turno.cirujano1,
+                'cirujano2': turno.cirujano2
+            } for turno in turnos])
+            actualizar_hashes_mes(anteriores, turnos, cambio.id)
         
+        if celdas:
+            # Antes del commit, que expira el objeto
+            cambios = [(cambio.id, cambio.datos)]
         db.session.commit()
-        return jsonify({'success': True})
+        if celdas:
+            # Este worker responde /api/guardia con la edición sin esperar al difusor
+            servicios().cache_guardia.aplicar_cambios(cambios)
+            servicios().publicador.publicar_en_segundo_plano()
+            servicios().puntos_control.solicitar()
+        # Devolver las celdas modificadas para que el cliente las actualice
+        # sin recargar la página completa
+        return jsonify({'success': True, 'celdas': celdas, 'avisos': avisos})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
-# Diccionario de colores para los turnos
-COLORES_TURNOS = {
-    "Turno miércoles": "lightblue",
-    "Turno jueves": "plum",
-    "Volante 1": "khaki",
-    "Volante 2": "salmon",
-    "Turno lunes": "pink",
-    "Turno martes": "lightgreen"
-}
-
-def generar_calendario_año(año):
-    calendario = {}
-    for mes in range(1, 13):
-        for dia in range(1, 32):
-            try:
-                fecha = datetime(año, mes, dia).date()
-                turno_db = CirujanosTurno.query.filter_by(fecha=fecha).first()
-                if turno_db:
-                    calendario[fecha] = {
-                        'nombre': turno_db.nombre_turno,
-                        'color': COLORES_TURNOS[turno_db.nombre_turno],
-                        'cirujanos': [turno_db.cirujano1, turno_db.cirujano2]
-                    }
-            except ValueError:
-                continue
-    return calendario
+# Stream de cambios en vivo (Server-Sent Events)
+@web.route('/eventos')
+def eventos():
+    ultimo = request.headers.get('Last-Event-ID', type=int)
+    if ultimo is None:
+        # Primera conexión: la revisión con la que se generó la página
+        ultimo = request.args.get('desde', type=int)
+    return Response(
+        stream_with_context(servicios().difusor.stream(ultimo)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# --- Historial y sincronización ----------------------------------------------
+
+@web.route('/api/sync')
+def api_sync():
+    """
+    Cambios posteriores a la revisión `since`: los meses modificados con su
+    hash y, si no son demasiadas, las celdas en su estado actual. Sin `since`
+    devuelve el hash de todos los meses. Con `reiniciar: true` el historial
+    no alcanza y el cliente debe volver a pedir los meses listados.
+    """
+    since = request.args.get('since', type=int)
+    if since is None and 'since' in request.args:
+        return jsonify({'success': False, 'error': 'since debe ser un número de revisión'}), 400
+
+    # Primero la revisión: lo que se confirme después llega en la próxima sincronización
+    revision = leer_ultimo_id()
+    meses = HashMes.query.order_by(HashMes.mes)
+    if since is not None:
+        meses = meses.filter(HashMes.revision > since)
+    respuesta = {
+        'success': True,
+        'revision': revision,
+        'meses': {
+            hash_mes.mes.strftime('%Y-%m'): {'hash': formatear_hash(hash_mes.hash), 'revision': hash_mes.revision}
+            for hash_mes in meses
+        }
+    }
+    if since is None:
+        return jsonify(respuesta)
+
+    inicio_historial = db.session.query(db.func.min(PuntoControlMes.revision)).scalar() or 0
+    if since < inicio_historial:
+        respuesta['reiniciar'] = True
+        return jsonify(respuesta)
+
+    filas = HistorialCelda.query.filter(
+        HistorialCelda.revision > since
+    ).order_by(HistorialCelda.id).limit(LIMITE_CELDAS_SYNC + 1).all()
+    if len(filas) <= LIMITE_CELDAS_SYNC:
+        # Las filas están en orden de revisión: queda la última de cada fecha
+        respuesta['celdas'] = list({fila.fecha: serializar_celda(fila) for fila in filas}.values())
+    return jsonify(respuesta)
+
+@web.route('/api/historial')
+def api_historial():
+    # Calendario de una fecha (?fecha=AAAA-MM-DD) o de un mes (?mes=AAAA-MM)
+    # tal como estaba en un momento (?al=, fecha y hora UTC) o revisión (?revision=)
+    try:
+        if 'fecha' in request.args:
+            fecha = datetime.strptime(request.args['fecha'], '%Y-%m-%d').date()
+            mes = fecha.replace(day=1)
+        else:
+            fecha = None
+            mes = datetime.strptime(request.args['mes'], '%Y-%m').date()
+        if 'al' in request.args:
+            momento = datetime.fromisoformat(request.args['al'])
+            if momento.tzinfo is not None:
+                momento = momento.astimezone(timezone.utc).replace(tzinfo=None)
+            revision = revision_en(momento)
+        elif 'revision' in request.args:
+            revision = int(request.args['revision'])
+        else:
+            revision = leer_ultimo_id()
+    except (KeyError, ValueError):
+        return jsonify({'success': False, 'error': 'Parámetros: fecha o mes, y opcionalmente al o revision'}), 400
+
+    estado = reconstruir_mes(mes, revision, fecha)
+    if estado is None:
+        return jsonify({'success': False, 'error': 'No hay historial para esa revisión'}), 404
+    celdas = [{
+        'fecha': dia.isoformat(),
+        'nombre': nombre_turno,
+        'color': COLORES_TURNOS[nombre_turno],
+        'cirujanos': [cirujano1, cirujano2]
+    } for dia, (nombre_turno, cirujano1, cirujano2) in sorted(estado.items())
+        if fecha is None or dia == fecha]
+    return jsonify({'success': True, 'revision': revision, 'celdas': celdas})
 
 # Constantes
-DIAS_POR_MES = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
 NOMBRES_MESES = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", 
                 "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
 
-class TurnoCiclo:
-    def __init__(self, nombre, color, fecha_inicial, semana_inicial):
-        self.nombre = nombre
-        self.color = color
-        self.fecha_inicial = fecha_inicial if isinstance(fecha_inicial, date) else fecha_inicial.date()
-        self.semana_inicial = semana_inicial
-        self.ciclo_dias = 42  # 6 semanas
-
-    def get_turno_para_fecha(self, fecha):
-        fecha = fecha if isinstance(fecha, date) else fecha.date()
-        dias_desde_inicio = (fecha - self.fecha_inicial).days
-        ciclo_actual = (dias_desde_inicio // self.ciclo_dias)
-        dia_en_ciclo = dias_desde_inicio % self.ciclo_dias
-        semana_en_ciclo = (dia_en_ciclo // 7 + self.semana_inicial) % 6
-        
-        if semana_en_ciclo == 0:
-            semana_en_ciclo = 6
-
-        dia_semana = fecha.weekday()
-        dia_turno = {
-            "Turno lunes": 0,
-            "Turno martes": 1,
-            "Turno miércoles": 2,
-            "Turno jueves": 3
-        }[self.nombre]
-
-        if semana_en_ciclo <= 3:
-            return dia_semana == dia_turno
-        elif semana_en_ciclo == 4:
-            return dia_semana == dia_turno or dia_semana == 6
-        elif semana_en_ciclo == 5:
-            return dia_semana == 5
-        else:  # semana_en_ciclo == 6
-            return dia_semana == 4
-
-class TurnoVolante:
-    def __init__(self, nombre, color, fecha_inicial):
-        self.nombre = nombre
-        self.color = color
-        self.fecha_inicial = fecha_inicial if isinstance(fecha_inicial, date) else fecha_inicial.date()
-
-    def get_turno_para_fecha(self, fecha):
-        fecha = fecha if isinstance(fecha, date) else fecha.date()
-        if self.nombre == "Volante 1":
-            dias_desde_v1 = (fecha - datetime(2025, 1, 3).date()).days
-            return dias_desde_v1 >= 0 and dias_desde_v1 % 6 == 0
-        else:  # Volante 2
-            dias_desde_v2 = (fecha - datetime(2025, 1, 4).date()).days
-            return dias_desde_v2 >= 0 and dias_desde_v2 % 6 == 0
-
-# Configuración de turnos con fechas consistentes
-TURNOS = {
-    "Turno miércoles": TurnoCiclo("Turno miércoles", "lightblue", 
-                                 datetime(2025, 1, 1).date(), 3),  # Convertir a date
-    "Turno jueves": TurnoCiclo("Turno jueves", "plum", 
-                              datetime(2025, 1, 2).date(), 4),    # Convertir a date
-    "Volante 1": TurnoVolante("Volante 1", "khaki", 
-                             datetime(2025, 1, 3).date()),        # Convertir a date
-    "Volante 2": TurnoVolante("Volante 2", "salmon", 
-                             datetime(2025, 1, 4).date()),        # Convertir a date
-    "Turno lunes": TurnoCiclo("Turno lunes", "pink", 
-                             datetime(2025, 1, 6).date(), 2),     # Convertir a date
-    "Turno martes": TurnoCiclo("Turno martes", "lightgreen", 
-                              datetime(2025, 1, 7).date(), 3)     # Convertir a date
-}
-
-def get_turno_for_date(fecha, turnos):
-    fecha = fecha if isinstance(fecha, date) else fecha.date()
-    
-    for turno_name, turno in turnos.items():
-        if turno.get_turno_para_fecha(fecha):
-            return {"nombre": turno.nombre, "color": turno.color}
-    return None
+
+_CALENDARIO_SEMANAL = calendar.Calendar(firstweekday=calendar.MONDAY)
+
+@lru_cache(maxsize=1024)
+def cuadricula_mes(año, mes):
+    """
+    Semanas del mes, de lunes a domingo, como tuplas de celdas. Cada celda
+    es (día, fecha, fecha en ISO) o None para los días de otro mes al
+    principio de la primera semana; las semanas terminan el último día.
+    """
+    semanas = []
+    for semana in _CALENDARIO_SEMANAL.monthdatescalendar(año, mes):
+        celdas = tuple(
+            (fecha.day, fecha, fecha.isoformat()) if fecha.month == mes else None
+            for fecha in semana
+        )
+        semanas.append(celdas)
+    ultima = semanas[-1]
+    while ultima[-1] is None:
+        ultima = ultima[:-1]
+    semanas[-1] = ultima
+    return tuple(semanas)
+
+# Uno o más meses; la sección de cada año de la página principal es una de
+# estas con sus doce meses
+HTML_MESES = """
+{% if encabezado %}<h1>{{ encabezado }}</h1>{% endif %}
+{% for año, mes in meses %}
+<div class="mes">
+    <h2>{{ nombres_meses[mes - 1] }}{% if mostrar_año %} {{ año }}{% endif %}</h2>
+    <div class="dias-container">
+        {% for dia in ["Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom"] %}
+            <div class="weekday">{{ dia }}</div>
+        {% endfor %}
+
+        {% for semana in cuadricula_mes(año, mes) -%}
+        {% for celda in semana -%}
+            {% if celda is none -%}
+            <div class="dia"></div>
+            {%- else -%}
+            {% set dia, fecha, iso = celda -%}
+            {% set turno = calendario.get(fecha) -%}
+            {# Celda compacta: la fecha va en el id y los datos del turno en su
+               propio contenido; un único listener en calendario.js maneja los clics #}
+            <div class="dia" id="d{{ iso }}">{{ dia }}
+            {%- if turno %}<div class="turno-info" style="background:{{ turno.color }}">{{ turno.nombre }}<div class="cirujanos"><div>{{ turno.cirujanos[0] }}</div><div>{{ turno.cirujanos[1] }}</div></div></div>{% endif -%}
+            </div>
+            {%- endif %}
+        {%- endfor %}
+        {%- endfor %}
+    </div>
+</div>
+{% endfor %}
+"""
 
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
-    <title>Calendario de Turnos 2025-2026</title>
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            margin: 20px;
-            background-color: #f0f0f0;
-        }
-        .year-container {
-            margin-bottom: 50px;
-        }
-        .year-title {
-            text-align: center;
-            font-size: 24px;
-            margin: 20px 0;
-            padding: 10px;
-            background-color: #333;
-            color: white;
-            border-radius: 5px;
-        }
-        .calendar-container {
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-        .mes {
-            background: white;
-            border-radius: 10px;
-            padding: 20px;
-            margin-bottom: 20px;
-            box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-        }
-        h1, h2 {
-            color: black;
-            text-align: center;
-        }
-        .dias-container {
-            display: grid;
-            grid-template-columns: repeat(7, 1fr);
-            gap: 5px;
-        }
-        .dia {
-            min-height: 80px;
-            padding: 10px;
-            border: 1px solid #ddd;
-            border-radius: 4px;
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            color: black;
-        }
-        .dia span {
-            margin-top: 5px;
-            padding: 5px;
-            border-radius: 3px;
-            width: 90%;
-            text-align: center;
-            font-size: 12px;
-        }
-        .weekday {
-            font-weight: bold;
-            text-align: center;
-            padding: 5px;
-            background-color: #f0f0f0;
-            color: black;
-        }
-        
-        /* Estilos para el modal */
-        .modal {
-            display: none;
-            position: fixed;
-            z-index: 1;
-            left: 0;
-            top: 0;
-            width: 100%;
-            height: 100%;
-            background-color: rgba(0,0,0,0.4);
-        }
-        
-        .modal-content {
-            background-color: #fefefe;
-            margin: 15% auto;
-            padding: 20px;
-            border: 1px solid #888;
-            width: 300px;
-            border-radius: 5px;
-        }
-        
-        .close {
-            color: #aaa;
-            float: right;
-            font-size: 28px;
-            font-weight: bold;
-            cursor: pointer;
-        }
-        
-        .turno-info {
-            cursor: pointer;
-            padding: 5px;
-            border-radius: 3px;
-        }
-        
-        .cirujanos {
-            font-size: 11px;
-            margin-top: 3px;
-        }
-        
-        .modal input {
-            width: 100%;
-            padding: 8px;
-            margin: 5px 0;
-            border: 1px solid #ddd;
-            border-radius: 4px;
-        }
-        
-        .modal button {
-            width: 100%;
-            padding: 10px;
-            background-color: #4CAF50;
-            color: white;
-            border: none;
-            border-radius: 4px;
-            cursor: pointer;
-            margin-top: 10px;
-        }
-        
-        .modal button:hover {
-            background-color: #45a049;
-        }
-    </style>
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <meta name="theme-color" content="#333333">
+    <title>{{ titulo }}</title>
+    {% for url in prefetch %}
+    <link rel="prefetch" href="{{ url }}">
+    {% endfor %}
+    <link rel="manifest" href="{{ asset_url('manifest.webmanifest') }}">
+    <link rel="icon" href="{{ asset_url('icono.svg') }}" type="image/svg+xml">
+    <link rel="stylesheet" href="{{ asset_url('calendario.css') }}">
 </head>
-<body>
+<body data-revision="{{ revision }}">
     <!-- Modal para editar cirujanos -->
     <div id="editModal" class="modal">
         <div class="modal-content">
@@ -367,130 +401,276 @@ HTML_TEMPLATE = """
     </div>
 
     <div class="calendar-container">
-        {% for año in [2025, 2026] %}
-        <h1>Calendario de Turnos {{ año }}</h1>
-        {% for mes in range(12) %}
-        <div class="mes">
-            <h2>{{ nombres_meses[mes] }}</h2>
-            <div class="dias-container">
-                {% for dia in ["Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom"] %}
-                    <div class="weekday">{{ dia }}</div>
-                {% endfor %}
-                
-                {% set primer_dia = datetime(año, mes + 1, 1).weekday() %}
-                {% for _ in range(primer_dia) %}
-                    <div class="dia"></div>
-                {% endfor %}
-                
-                {% for dia in range(1, dias_por_mes[mes] + 1) %}
-                    {% set fecha = datetime(año, mes + 1, dia).date() %}
-                    <div class="dia">
-                        {{ dia }}
-                        {% if fecha in calendarios[año] %}
-                            <div class="turno-info" 
-                                 onclick="editarTurno('{{ fecha }}', '{{ calendarios[año][fecha].cirujanos[0] }}', '{{ calendarios[año][fecha].cirujanos[1] }}', '{{ calendarios[año][fecha].nombre }}')"
-                                 style="background-color: {{ calendarios[año][fecha].color }}">
-                                {{ calendarios[año][fecha].nombre }}
-                                <div class="cirujanos">
-                                    {{ calendarios[año][fecha].cirujanos[0] }}<br>
-                                    {{ calendarios[año][fecha].cirujanos[1] }}
-                                </div>
-                            </div>
-                        {% endif %}
-                    </div>
-                {% endfor %}
-            </div>
-        </div>
-        {% endfor %}
-        {% endfor %}
+        {% if navegacion %}
+        <nav class="navegacion">
+            {% for texto, url in navegacion %}<a href="{{ url }}">{{ texto }}</a>{% endfor %}
+        </nav>
+        {% endif %}
+        {% for seccion in secciones %}{{ seccion }}{% endfor %}
     </div>
 
-    <script>
-        const modal = document.getElementById('editModal');
-        const span = document.getElementsByClassName('close')[0];
-
-        function editarTurno(fecha, cirujano1, cirujano2, nombreTurno) {
-            const [year, month, day] = fecha.split('-');
-            const fechaObj = new Date(year, month - 1, day);
-            const fechaFormateada = fechaObj.toLocaleDateString('es-ES', {
-                day: '2-digit',
-                month: 'long',
-                year: 'numeric'
-            });
-            
-            document.getElementById('fechaTurno').value = fecha;
-            document.getElementById('fechaMostrada').value = fechaFormateada;
-            document.getElementById('cirujano1').value = cirujano1;
-            document.getElementById('cirujano2').value = cirujano2;
-            document.getElementById('nombreTurno').value = nombreTurno;
-            document.getElementById('aplicarFuturo').checked = false;
-            modal.style.display = "block";
-        }
-
-        function guardarCambios() {
-            const fecha = document.getElementById('fechaTurno').value;
-            const cirujano1 = document.getElementById('cirujano1').value;
-            const cirujano2 = document.getElementById('cirujano2').value;
-            const nombreTurno = document.getElementById('nombreTurno').value;
-            const aplicarFuturo = document.getElementById('aplicarFuturo').checked;
-            
-            fetch('/actualizar_cirujanos', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    fecha: fecha,
-                    cirujano1: cirujano1,
-                    cirujano2: cirujano2,
-                    nombreTurno: nombreTurno,
-                    aplicarFuturo: aplicarFuturo
-                })
-            })
-            .then(response => response.json())
-            .then(data => {
-                if(data.success) {
-                    location.reload();
-                } else {
-                    alert('Error al guardar los cambios: ' + data.error);
-                }
-            });
-            
-            modal.style.display = "none";
-        }
-
-        function cerrarModal() {
-            modal.style.display = "none";
-        }
-
-        span.onclick = cerrarModal;
-        window.onclick = function(event) {
-            if (event.target == modal) {
-                cerrarModal();
-            }
-        }
-    </script>
+    <script src="{{ asset_url('calendario.js') }}"></script>
 </body>
 </html>
 """
 
-@app.route('/')
-def show_calendar():
-    calendarios = {
-        2025: generar_calendario_año(2025),
-        2026: generar_calendario_año(2026)
-    }
-    
-    return render_template_string(
-        HTML_TEMPLATE,
-        datetime=datetime,
-        calendarios=calendarios,
-        dias_por_mes=DIAS_POR_MES,
+# Compiladas una sola vez; render_template_string las compilaría en cada llamada
+def renderizar_meses(meses, calendario, encabezado=None, mostrar_año=False):
+    return render_template(
+        servicios().plantillas[0],
+        meses=meses,
+        encabezado=encabezado,
+        mostrar_año=mostrar_año,
+        cuadricula_mes=cuadricula_mes,
+        calendario=calendario,
         nombres_meses=NOMBRES_MESES
     )
 
+def renderizar_año(año):
+    # La revisión se lee antes que los datos: cualquier cambio posterior
+    # se volverá a enviar por /eventos, y aplicarlo dos veces no tiene efecto
+    revision = leer_ultimo_id()
+    with seccion('calendario'):
+        calendario = generar_calendario_año(año)
+    html = renderizar_meses(
+        [(año, mes) for mes in range(1, 13)], calendario, encabezado=f'Calendario de Turnos {año}'
+    )
+    return revision, html
+
+def renderizar_pagina(secciones, revision, titulo=None, navegacion=(), prefetch=()):
+    if titulo is None:
+        titulo = f'Calendario de Turnos {AÑOS_CALENDARIO[0]}-{AÑOS_CALENDARIO[-1]}'
+    return render_template(
+        servicios().plantillas[1],
+        secciones=[Markup(html) for html in secciones],
+        revision=revision,
+        titulo=titulo,
+        navegacion=navegacion or [('Ver por mes', '/calendario')],
+        prefetch=prefetch
+    )
+
+def escribir_instantanea_binaria(escribir):
+    # Copia compacta de todos los turnos, que los workers leen con mmap
+    revision = leer_ultimo_id()
+    filas = leer_filas_turnos()
+    turnos = [(turno.nombre, turno.color) for turno in TURNOS.values()]
+    escribir('calendario.bin', serializar_instantanea(turnos, filas, revision))
+
+@web.route('/api/turnos')
+def api_turnos():
+    try:
+        desde = datetime.strptime(request.args['desde'], '%Y-%m-%d').date()
+        hasta = datetime.strptime(request.args['hasta'], '%Y-%m-%d').date()
+    except (KeyError, ValueError):
+        return jsonify({'success': False, 'error': 'Parámetros desde y hasta requeridos (AAAA-MM-DD)'}), 400
+
+    instantanea = servicios().instantanea_publicada()
+    if instantanea is not None:
+        revision = instantanea.revision
+        dias = instantanea.rango(desde, hasta)
+    else:
+        revision = leer_ultimo_id()
+        dias = (
+            (turno.fecha, serializar_celda(turno))
+            for turno in CirujanosTurno.query.filter(
+                CirujanosTurno.fecha.between(desde, hasta)
+            ).order_by(CirujanosTurno.fecha)
+        )
+    return jsonify({
+        'success': True,
+        'revision': revision,
+        'celdas': [dict(celda, fecha=fecha.isoformat()) for fecha, celda in dias]
+    })
+
+# --- Guardia del día ----------------------------------------------------------
+
+@web.route('/api/guardia')
+def api_guardia():
+    # Para la central telefónica: quién está de guardia hoy o en ?fecha=AAAA-MM-DD
+    try:
+        fecha = datetime.strptime(request.args['fecha'], '%Y-%m-%d').date() if 'fecha' in request.args else date.today()
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Formato de fecha inválido (AAAA-MM-DD)'}), 400
+    cache_guardia = servicios().cache_guardia
+    celda = cache_guardia.consultar(fecha)
+    if celda is None:
+        return jsonify({'success': False, 'error': 'No hay guardia asignada para esa fecha'}), 404
+    return jsonify({
+        'success': True,
+        'fecha': fecha.isoformat(),
+        'revision': cache_guardia.revision,
+        'turno': celda['nombre'],
+        'color': celda['color'],
+        'cirujanos': celda['cirujanos']
+    })
+
+# --- Aplicación instalable y uso sin conexión ---------------------------------
+
+# Recursos que el service worker guarda al instalarse
+RECURSOS_SIN_CONEXION = ('calendario.css', 'calendario.js', 'manifest.webmanifest', 'icono.svg')
+
+def generar_service_worker(estaticos):
+    # Lleva incrustadas las URLs con hash: cuando cambia un recurso cambia
+    # también el service worker y el navegador instala la versión nueva.
+    # Devuelve (versión, código)
+    urls = [estaticos.url(nombre) for nombre in RECURSOS_SIN_CONEXION]
+    version = hashlib.sha256(' '.join(urls).encode('utf-8')).hexdigest()[:12]
+    fuente = estaticos.recursos['sw.js'].variantes[None].decode('utf-8')
+    fuente = fuente.replace('__RECURSOS__', json.dumps(urls)).replace('__VERSION__', json.dumps(version))
+    return version, fuente.encode('utf-8')
+
+@web.route('/sw.js')
+def service_worker():
+    # Desde la raíz, para que su alcance sea todo el sitio
+    version, codigo = servicios().service_worker
+    respuesta = Response(codigo, mimetype='text/javascript')
+    respuesta.set_etag(version)
+    respuesta.headers['Cache-Control'] = CACHE_REVALIDAR
+    return respuesta.make_conditional(request)
+
+@web.route('/api/version')
+def api_version():
+    # Consulta barata del service worker antes de volver a descargar la
+    # página: la revisión la mantiene el hilo del difusor, sin ir a la base
+    difusor = servicios().difusor
+    difusor.iniciar()
+    respuesta = jsonify({'revision': difusor.ultimo_id})
+    respuesta.headers['Cache-Control'] = 'no-store'
+    return respuesta
+
+# --- Páginas por mes y por año ------------------------------------------------
+
+def url_mes(año, mes):
+    return f'/calendario/{año}/{mes}'
+
+def url_año(año):
+    return f'/calendario/{año}'
+
+def responder_calendario(meses, titulo, navegacion, prefetch, encabezado=None, mostrar_año=False):
+    # La página solo cambia con una nueva revisión o con otra versión de los
+    # recursos: si el navegador ya la tiene se responde 304 sin leer los turnos
+    revision = leer_ultimo_id()
+    etag = f'{revision}-{servicios().service_worker[0]}'
+    # El navegador guarda la ETag de la variante comprimida que recibió
+    variante = etag_variante(etag, elegir_codificacion(request.headers.get('Accept-Encoding', '')))
+    if variante in request.if_none_match:
+        respuesta = Response(status=304)
+        respuesta.set_etag(variante)
+        respuesta.vary.add('Accept-Encoding')
+        respuesta.headers['Cache-Control'] = CACHE_REVALIDAR
+        return respuesta
+
+    (primer_año, primer_mes), (ultimo_año, ultimo_mes) = meses[0], meses[-1]
+    hasta = date(ultimo_año + ultimo_mes // 12, ultimo_mes % 12 + 1, 1) - timedelta(days=1)
+    with seccion('calendario'):
+        calendario = generar_calendario(date(primer_año, primer_mes, 1), hasta)
+    html = renderizar_meses(meses, calendario, encabezado=encabezado, mostrar_año=mostrar_año)
+    respuesta = Response(renderizar_pagina([html], revision, titulo, navegacion, prefetch), mimetype='text/html')
+    # comprimir_respuesta le agrega la codificación si la comprime
+    respuesta.set_etag(etag)
+    respuesta.headers['Cache-Control'] = CACHE_REVALIDAR
+    return respuesta
+
+@web.route('/calendario')
+def calendario_actual():
+    hoy = date.today()
+    return redirect(url_mes(hoy.year, hoy.month))
+
+# Werkzeug solo acepta nombres ASCII en las variables de las reglas
+@web.route('/calendario/<int:anio>/<int:mes>')
+def calendario_mes(anio, mes):
+    año = anio
+    # Los límites dejan lugar al mes anterior y al siguiente
+    if not 1 <= mes <= 12 or not date.min.year < año < date.max.year:
+        abort(404)
+    anterior = (año - 1, 12) if mes == 1 else (año, mes - 1)
+    siguiente = (año + 1, 1) if mes == 12 else (año, mes + 1)
+    return responder_calendario(
+        [(año, mes)],
+        titulo=f'Turnos {NOMBRES_MESES[mes - 1]} {año}',
+        navegacion=[
+            (f'‹ {NOMBRES_MESES[anterior[1] - 1]}', url_mes(*anterior)),
+            (str(año), url_año(año)),
+            (f'{NOMBRES_MESES[siguiente[1] - 1]} ›', url_mes(*siguiente))
+        ],
+        # El navegador descarga los meses vecinos en segundo plano
+        prefetch=[url_mes(*anterior), url_mes(*siguiente)],
+        mostrar_año=True
+    )
+
+@web.route('/calendario/<int:anio>')
+def calendario_año(anio):
+    año = anio
+    if not date.min.year < año < date.max.year:
+        abort(404)
+    return responder_calendario(
+        [(año, mes) for mes in range(1, 13)],
+        titulo=f'Turnos {año}',
+        navegacion=[(f'‹ {año - 1}', url_año(año - 1)), (f'{año + 1} ›', url_año(año + 1))],
+        prefetch=[url_año(año - 1), url_año(año + 1)],
+        encabezado=f'Calendario de Turnos {año}'
+    )
+
+@web.route('/')
+def show_calendar():
+    # Camino normal: la página ya publicada en disco, sin base de datos ni Jinja
+    publicador = servicios().publicador
+    codificacion = elegir_codificacion(request.headers.get('Accept-Encoding', ''))
+    ruta = publicador.ruta_pagina(codificacion)
+    if ruta is None:
+        codificacion, ruta = None, publicador.ruta_pagina()
+    if ruta is not None:
+        respuesta = send_file(ruta, mimetype='text/html', conditional=True, max_age=0)
+        if codificacion:
+            respuesta.headers['Content-Encoding'] = codificacion
+        respuesta.vary.add('Accept-Encoding')
+        return respuesta
+
+    # Todavía no hay nada publicado: se renderiza en el momento
+    revisiones, secciones = zip(*(renderizar_año(año) for año in AÑOS_CALENDARIO))
+    return renderizar_pagina(secciones, min(revisiones))
+
+def create_app(config=None):
+    """
+    Crea una aplicación con las rutas del calendario. Es el punto de entrada
+    de gunicorn (ver gunicorn.conf.py, que usa --preload).
+
+    config: diccionario que reemplaza la configuración por defecto, por
+    ejemplo SQLALCHEMY_DATABASE_URI o CARPETA_PUBLICADO. Con PRECALENTAR
+    (por defecto) se construyen en el proceso maestro las estructuras de
+    solo lectura y se publica la página, para que los workers las hereden
+    ya calculadas; con PRECALENTAR=False, como en los tests y los scripts,
+    cada pieza se prepara la primera vez que se usa.
+    """
+    app = Flask(__name__, static_folder=None)
+    # Detrás de un proxy que entienda X-Sendfile, la página publicada la envía el proxy
+    app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1'
+    app.config['CARPETA_PUBLICADO'] = os.environ.get(
+        'CARPETA_PUBLICADO', os.path.join(app.instance_path, 'publicado'))
+    # Streams de /eventos abiertos a la vez por worker (ver gunicorn.conf.py)
+    app.config['SSE_MAX_CONEXIONES'] = int(os.environ.get('SSE_MAX_CONEXIONES', 50))
+    app.config['PRECALENTAR'] = True
+    app.config.update(config or {})
+    configurar_base_datos(app)
+    db.init_app(app)
+    app.extensions['calendario'] = Servicios(app)
+    app.register_blueprint(web)
+
+    with app.app_context():
+        instalar_pragmas(db.engine)
+        instalar_metricas(app, db.engine)
+        inicializar_db()
+        if app.config['PRECALENTAR']:
+            obtener_instantanea()
+            servicios().plantillas
+            servicios().service_worker
+            # La plantilla o los estáticos pudieron cambiar con el despliegue
+            servicios().publicador.publicar(forzar=True)
+        # Los workers no deben heredar conexiones abiertas por el maestro
+        db.engine.dispose()
+    return app
+
 if __name__ == '__main__':
     # Instalar las dependencias necesarias:
-    # pip install flask-sqlalchemy
-    inicializar_db()
-    app.run(debug=True, port=8080)
+    # pip install -r requirements.txt
+    create_app().run(debug=True, port=8080)
@@ -0,0 +1,156 @@
+import os
+from contextlib import contextmanager
+
+from sqlalchemy import event, text
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se usa el servidor de desarrollo, de un proceso
+    fcntl = None
+
+URI_POR_DEFECTO = 'sqlite:///turnos.db'
+
+# Claves arbitrarias de los advisory locks de Postgres: inicialización,
+# asignación de revisiones y puntos de control del historial
+CLAVE_BLOQUEO_INICIALIZACION = 7_302_025
+CLAVE_BLOQUEO_REVISIONES = 7_302_026
+CLAVE_BLOQUEO_PUNTOS_CONTROL = 7_302_027
+
+# Pragmas aplicados a cada conexión SQLite nueva.
+# WAL permite que los lectores no bloqueen al escritor (ni al revés),
+# synchronous=NORMAL es seguro con WAL y evita un fsync por commit,
+# y busy_timeout hace que un escritor espere en vez de fallar con
+# "database is locked" mientras otro worker termina su transacción.
+PRAGMAS_SQLITE = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,          # milisegundos
+    'cache_size': -20000,          # negativo = KiB, unos 20 MB por conexión
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def obtener_uri():
+    """
+    URI de la base de datos: DATABASE_URL si está definida (Heroku Postgres),
+    o el archivo SQLite local en caso contrario.
+    """
+    uri = os.environ.get('DATABASE_URL', URI_POR_DEFECTO)
+    # Heroku todavía entrega "postgres://", que SQLAlchemy 2 ya no acepta
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+
+def opciones_motor(uri):
+    """Opciones del pool de conexiones según el motor de base de datos."""
+    if uri in ('sqlite://', 'sqlite:///:memory:'):
+        # La base en memoria usa un pool de una sola conexión
+        return {}
+    if uri.startswith('sqlite'):
+        return {
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+            'pool_pre_ping': False,
+            'connect_args': {'timeout': PRAGMAS_SQLITE['busy_timeout'] / 1000},
+        }
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        # Las conexiones de Postgres gestionadas se cortan tras un tiempo inactivas
+        'pool_pre_ping': True,
+        'pool_recycle': 300,
+        'pool_timeout': 10,
+        'connect_args': {
+            'connect_timeout': 5,
+            'keepalives': 1,
+            'keepalives_idle': 30,
+        },
+    }
+
+
+def configurar_base_datos(app):
+    """
+    Configura la URI y el pool de la aplicación antes de db.init_app(app);
+    después hay que llamar a instalar_pragmas() con el motor ya creado.
+    Respeta los valores que ya vengan en la configuración de create_app().
+    """
+    uri = app.config.setdefault('SQLALCHEMY_DATABASE_URI', obtener_uri())
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', opciones_motor(uri))
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+
+def aplicar_pragmas(conexion):
+    cursor = conexion.cursor()
+    for nombre, valor in PRAGMAS_SQLITE.items():
+        cursor.execute(f'PRAGMA {nombre}={valor}')
+    cursor.close()
+
+
+def _al_conectar(dbapi_connection, connection_record):
+    aplicar_pragmas(dbapi_connection)
+
+
+def instalar_pragmas(engine):
+    """
+    Aplica PRAGMAS_SQLITE a cada conexión nueva del motor de la aplicación.
+    Solo a ese motor: otros motores del mismo proceso (otra aplicación, un
+    script) quedan como estén. Los motores de Postgres no se tocan.
+    """
+    if engine.dialect.name == 'sqlite' and not event.contains(engine, 'connect', _al_conectar):
+        event.listen(engine, 'connect', _al_conectar)
+
+
+def bloquear_revisiones(sesion):
+    """
+    Serializa las transacciones que registran un cambio del calendario: hay
+    que llamarla antes de leer lo que se va a modificar. Así las revisiones
+    (el id autoincremental de la tabla de cambios) se confirman en el mismo
+    orden en que se asignan, y lo leído para calcular los hashes de los
+    meses no cambia hasta el commit.
+
+    En Postgres se toma un advisory lock de transacción, que se libera solo
+    con el commit o el rollback; dos transacciones podrían si no
+    confirmarse en orden inverso a sus ids, y un lector que ya vio el id
+    mayor nunca volvería a pedir el menor. En SQLite el único escritor no
+    alcanza: pysqlite no abre una transacción antes de un SELECT, así que
+    otro worker puede confirmar entre la lectura y el UPDATE. Se abre la
+    transacción con BEGIN IMMEDIATE, que toma el bloqueo de escritura (y
+    espera busy_timeout si otro lo tiene).
+    """
+    conexion = sesion.connection()
+    dialecto = conexion.dialect.name
+    if dialecto == 'postgresql':
+        conexion.execute(text('SELECT pg_advisory_xact_lock(:clave)'), {'clave': CLAVE_BLOQUEO_REVISIONES})
+    elif dialecto == 'sqlite' and not conexion.connection.dbapi_connection.in_transaction:
+        conexion.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+@contextmanager
+def bloqueo_exclusivo(engine, clave=CLAVE_BLOQUEO_INICIALIZACION, sufijo='.lock'):
+    """
+    Bloqueo entre procesos para que un solo worker a la vez haga una tarea
+    (por defecto, inicializar la base de datos). SQLite usa un flock sobre
+    un archivo junto a la base, terminado en `sufijo`; Postgres usa el
+    advisory lock `clave`, que también cubre varias máquinas.
+    """
+    if engine.dialect.name == 'postgresql':
+        with engine.connect() as conexion:
+            conexion.execute(text('SELECT pg_advisory_lock(:clave)'), {'clave': clave})
+            try:
+                yield
+            finally:
+                conexion.execute(text('SELECT pg_advisory_unlock(:clave)'), {'clave': clave})
+        return
+
+    ruta = engine.url.database
+    if fcntl is None or not ruta or ruta == ':memory:':
+        yield
+        return
+    with open(ruta + sufijo, 'w') as archivo:
+        fcntl.flock(archivo, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(archivo, fcntl.LOCK_UN)
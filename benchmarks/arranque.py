@@ -0,0 +1,108 @@
+"""
+Benchmark de arranque de gunicorn: tiempo de arranque de cada worker y
+memoria propia por worker, con y sin --preload.
+
+Usa la configuración de gunicorn.conf.py y le agrega hooks que registran
+cuándo se crea cada worker y cuándo termina de cargar la aplicación.
+
+Uso:
+    python benchmarks/arranque.py --workers 4
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFIG = '''
+exec(open({conf!r}, encoding='utf-8').read())
+import json, os, time
+preload_app = {preload!r}
+workers = {workers!r}
+bind = '127.0.0.1:0'
+
+def post_fork(server, worker):
+    worker._inicio_benchmark = time.perf_counter()
+
+def post_worker_init(worker):
+    with open({registro!r}, 'a') as f:
+        f.write(json.dumps({{
+            'pid': os.getpid(),
+            'arranque_ms': (time.perf_counter() - worker._inicio_benchmark) * 1000,
+        }}) + '\\n')
+'''
+
+
+def memoria_propia_kb(pid):
+    # USS (memoria privada) y PSS del proceso según /proc/<pid>/smaps_rollup
+    valores = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for linea in f:
+            partes = linea.split()
+            if partes[0] in ('Pss:', 'Private_Clean:', 'Private_Dirty:'):
+                valores[partes[0][:-1]] = int(partes[1])
+    return valores['Private_Clean'] + valores['Private_Dirty'], valores['Pss']
+
+
+def medir(preload, workers):
+    with tempfile.TemporaryDirectory() as directorio:
+        registro = os.path.join(directorio, 'workers.jsonl')
+        config = os.path.join(directorio, 'gunicorn_benchmark.conf.py')
+        with open(config, 'w', encoding='utf-8') as f:
+            f.write(CONFIG.format(conf=os.path.join(RAIZ, 'gunicorn.conf.py'),
+                                  preload=preload, workers=workers, registro=registro))
+
+        entorno = dict(os.environ, DATABASE_URL=f'sqlite:///{directorio}/turnos.db',
+                       CARPETA_PUBLICADO=os.path.join(directorio, 'publicado'))
+        inicio = time.perf_counter()
+        proceso = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', config, 'app:create_app()'],
+            cwd=RAIZ, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            while True:
+                if os.path.exists(registro):
+                    with open(registro) as f:
+                        datos = [json.loads(linea) for linea in f]
+                    if len(datos) == workers:
+                        break
+                if time.perf_counter() - inicio > 60:
+                    raise RuntimeError('gunicorn no arrancó a tiempo')
+                time.sleep(0.01)
+            total_ms = (time.perf_counter() - inicio) * 1000
+            memorias = [memoria_propia_kb(d['pid']) for d in datos]
+        finally:
+            proceso.send_signal(signal.SIGTERM)
+            proceso.wait()
+
+    return {
+        'preload': preload,
+        'workers': workers,
+        'arranque_total_ms': round(total_ms, 1),
+        'arranque_worker_ms': round(sum(d['arranque_ms'] for d in datos) / workers, 1),
+        'uss_worker_kb': sum(m[0] for m in memorias) // workers,
+        'pss_worker_kb': sum(m[1] for m in memorias) // workers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--salida', help='archivo JSON donde guardar los resultados')
+    args = parser.parse_args()
+
+    resultados = [medir(preload, args.workers) for preload in (False, True)]
+    for resultado in resultados:
+        print(json.dumps(resultado))
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+Prueba de carga local: levanta gunicorn sobre una base temporal y envía una
+mezcla configurable de lecturas y ediciones con concurrencia creciente.
+
+Reporta por etapa el throughput, las latencias p50/p95/p99 y la tasa de
+errores, y escribe un reporte JSON (y una tabla en Markdown) para comparar
+entre versiones.
+
+Las ediciones al azar suelen incumplir las reglas de descanso (descanso.py),
+así que se envían con forzar para medir una escritura real. Con --sin-forzar
+se mide el rechazo: las ediciones rechazadas por las reglas se cuentan
+aparte, no como errores.
+
+Uso:
+    python benchmarks/carga.py --etapas 1,5,10,25 --segundos 10 --reporte carga.json
+    python benchmarks/carga.py --mezcla lectura=90,edicion=8,definitivo=2
+    python benchmarks/carga.py --database-url postgresql://localhost/turnos_carga
+    python benchmarks/carga.py --sin-forzar
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+NOMBRES = ['Dr. Pérez', 'Dra. Robles', 'Dr. Astorga', 'Dra. Trepat', 'Dr. Díaz', 'Dr. Ruiz']
+TURNOS = ['Turno lunes', 'Turno martes', 'Turno miércoles', 'Turno jueves', 'Volante 1', 'Volante 2']
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def levantar_servidor(database_url, workers, puerto, carpeta):
+    entorno = dict(os.environ, DATABASE_URL=database_url, PORT=str(puerto),
+                   WEB_CONCURRENCY=str(workers),
+                   CARPETA_PUBLICADO=os.path.join(carpeta, 'publicado'))
+    proceso = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'app:create_app()', '--bind', f'127.0.0.1:{puerto}'],
+        cwd=RAIZ, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    limite = time.time() + 60
+    while time.time() < limite:
+        try:
+            conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=5)
+            conexion.request('GET', '/metrics')
+            if conexion.getresponse().status == 200:
+                return proceso
+        except OSError:
+            time.sleep(0.1)
+    proceso.kill()
+    raise RuntimeError('gunicorn no respondió a tiempo')
+
+
+def parsear_mezcla(texto):
+    pesos = {}
+    for parte in texto.split(','):
+        nombre, peso = parte.split('=')
+        pesos[nombre.strip()] = float(peso)
+    desconocidas = set(pesos) - {'lectura', 'edicion', 'definitivo'}
+    if desconocidas:
+        raise ValueError(f'operaciones desconocidas: {", ".join(sorted(desconocidas))}')
+    return pesos
+
+
+def peticion(conexion, operacion, azar, forzar=True):
+    """Ejecuta una operación; devuelve 'correcta', 'rechazada' (reglas de descanso) o 'error'."""
+    if operacion == 'lectura':
+        conexion.request('GET', '/', headers={'Accept-Encoding': 'identity'})
+        respuesta = conexion.getresponse()
+        respuesta.read()
+        return 'correcta' if respuesta.status == 200 else 'error'
+
+    fecha = date(2025, 1, 1) + timedelta(days=azar.randrange(730))
+    cuerpo = json.dumps({
+        'fecha': fecha.isoformat(),
+        'nombreTurno': azar.choice(TURNOS),
+        'cirujano1': azar.choice(NOMBRES),
+        'cirujano2': azar.choice(NOMBRES),
+        'aplicarFuturo': operacion == 'definitivo',
+        'forzar': forzar,
+    })
+    conexion.request('POST', '/actualizar_cirujanos', body=cuerpo,
+                     headers={'Content-Type': 'application/json'})
+    respuesta = conexion.getresponse()
+    datos = respuesta.read()
+    if respuesta.status != 200:
+        return 'error'
+    datos = json.loads(datos)
+    if datos.get('success', False):
+        return 'correcta'
+    return 'rechazada' if 'infracciones' in datos else 'error'
+
+
+def cliente(puerto, mezcla, fin, semilla, resultados, forzar):
+    azar = random.Random(semilla)
+    operaciones = list(mezcla)
+    pesos = [mezcla[o] for o in operaciones]
+    conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+    while time.perf_counter() < fin:
+        operacion = azar.choices(operaciones, pesos)[0]
+        inicio = time.perf_counter()
+        try:
+            estado = peticion(conexion, operacion, azar, forzar)
+        except (OSError, http.client.HTTPException, ValueError):
+            estado = 'error'
+            conexion.close()
+            conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+        resultados.append((operacion, time.perf_counter() - inicio, estado))
+    conexion.close()
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    indice = min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))
+    return round(valores[indice] * 1000, 2)
+
+
+def resumir(resultados, segundos):
+    resumen = {}
+    for operacion in sorted({r[0] for r in resultados}) + ['total']:
+        filas = resultados if operacion == 'total' else [r for r in resultados if r[0] == operacion]
+        latencias = sorted(r[1] for r in filas)
+        errores = sum(1 for r in filas if r[2] == 'error')
+        rechazadas = sum(1 for r in filas if r[2] == 'rechazada')
+        resumen[operacion] = {
+            'peticiones': len(filas),
+            'por_segundo': round(len(filas) / segundos, 1),
+            'p50_ms': percentil(latencias, 50),
+            'p95_ms': percentil(latencias, 95),
+            'p99_ms': percentil(latencias, 99),
+            'errores': errores,
+            'tasa_error': round(errores / len(filas), 4) if filas else 0.0,
+            'rechazadas': rechazadas,
+        }
+    return resumen
+
+
+def ejecutar_etapa(puerto, concurrencia, segundos, mezcla, forzar=True):
+    resultados = []
+    fin = time.perf_counter() + segundos
+    hilos = [threading.Thread(target=cliente, args=(puerto, mezcla, fin, i, resultados, forzar))
+             for i in range(concurrencia)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return resumir(resultados, segundos)
+
+
+def tabla_markdown(reporte):
+    lineas = [
+        '| concurrencia | operación | req/s | p50 ms | p95 ms | p99 ms | errores | rechazadas |',
+        '|---:|---|---:|---:|---:|---:|---:|---:|',
+    ]
+    for etapa in reporte['etapas']:
+        for operacion, datos in etapa['resultados'].items():
+            lineas.append(
+                f"| {etapa['concurrencia']} | {operacion} | {datos['por_segundo']} | {datos['p50_ms']} "
+                f"| {datos['p95_ms']} | {datos['p99_ms']} | {datos['errores']} ({datos['tasa_error']:.2%}) "
+                f"| {datos['rechazadas']} |"
+            )
+    return '\n'.join(lineas) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--etapas', default='1,5,10,25', help='concurrencias a probar, en orden')
+    parser.add_argument('--segundos', type=float, default=10.0, help='duración de cada etapa')
+    parser.add_argument('--mezcla', default='lectura=90,edicion=8,definitivo=2',
+                        help='pesos de lectura (GET /), edicion y definitivo (aplicarFuturo)')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--database-url', help='por defecto, un SQLite temporal')
+    parser.add_argument('--reporte', default='carga.json', help='archivo JSON del reporte')
+    parser.add_argument('--sin-forzar', action='store_true',
+                        help='no forzar las ediciones que incumplen las reglas de descanso')
+    args = parser.parse_args()
+
+    mezcla = parsear_mezcla(args.mezcla)
+    # La base (si no se indica otra) y la página publicada, borradas al terminar
+    with tempfile.TemporaryDirectory() as temporal:
+        database_url = args.database_url or 'sqlite:///' + os.path.join(temporal, 'carga.db')
+        puerto = puerto_libre()
+        servidor = levantar_servidor(database_url, args.workers, puerto, temporal)
+
+        reporte = {
+            'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'workers': args.workers,
+            'mezcla': mezcla,
+            'base_datos': database_url.split(':', 1)[0],
+            'forzar': not args.sin_forzar,
+            'etapas': [],
+        }
+        try:
+            for concurrencia in (int(c) for c in args.etapas.split(',')):
+                resultados = ejecutar_etapa(puerto, concurrencia, args.segundos, mezcla, not args.sin_forzar)
+                total = resultados['total']
+                print(f"concurrencia {concurrencia:>4}: {total['por_segundo']:>8} req/s  "
+                      f"p50 {total['p50_ms']} ms  p95 {total['p95_ms']} ms  p99 {total['p99_ms']} ms  "
+                      f"errores {total['tasa_error']:.2%}  rechazadas {total['rechazadas']}")
+                reporte['etapas'].append({'concurrencia': concurrencia, 'resultados': resultados})
+        finally:
+            servidor.send_signal(signal.SIGTERM)
+            servidor.wait()
+
+    with open(args.reporte, 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=2)
+    with open(os.path.splitext(args.reporte)[0] + '.md', 'w', encoding='utf-8') as f:
+        f.write(tabla_markdown(reporte))
+
+
+if __name__ == '__main__':
+    main()
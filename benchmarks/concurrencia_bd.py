@@ -0,0 +1,145 @@
+"""
+Benchmark de concurrencia sobre SQLite: lecturas por segundo mientras un
+proceso escribe, con la configuración por defecto y con los pragmas de
+base_datos.PRAGMAS_SQLITE (WAL, synchronous=NORMAL, busy_timeout...).
+
+Uso:
+    python benchmarks/concurrencia_bd.py --lectores 4 --segundos 5
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from base_datos import aplicar_pragmas  # noqa: E402
+
+AÑOS = (2025, 2026)
+
+
+def conectar(ruta, ajustada):
+    conexion = sqlite3.connect(ruta, timeout=5.0)
+    if ajustada:
+        aplicar_pragmas(conexion)
+    else:
+        conexion.execute('PRAGMA journal_mode=DELETE')
+    return conexion
+
+
+def crear_base(ruta):
+    conexion = sqlite3.connect(ruta)
+    conexion.execute(
+        'CREATE TABLE cirujanos_turno (id INTEGER PRIMARY KEY, fecha DATE NOT NULL, '
+        'nombre_turno VARCHAR(50) NOT NULL, cirujano1 VARCHAR(100) NOT NULL, '
+        'cirujano2 VARCHAR(100) NOT NULL)'
+    )
+    fecha = date(AÑOS[0], 1, 1)
+    filas = []
+    while fecha.year <= AÑOS[-1]:
+        filas.append((fecha.isoformat(), 'Turno lunes', 'Dr. A', 'Dr. B'))
+        fecha += timedelta(days=1)
+    conexion.executemany(
+        'INSERT INTO cirujanos_turno (fecha, nombre_turno, cirujano1, cirujano2) VALUES (?, ?, ?, ?)',
+        filas
+    )
+    conexion.commit()
+    conexion.close()
+
+
+def lector(ruta, ajustada, segundos, resultados):
+    conexion = conectar(ruta, ajustada)
+    lecturas = errores = 0
+    fin = time.perf_counter() + segundos
+    while time.perf_counter() < fin:
+        año = AÑOS[lecturas % len(AÑOS)]
+        try:
+            # La misma consulta por rango que necesita la vista de un año
+            conexion.execute(
+                'SELECT fecha, nombre_turno, cirujano1, cirujano2 FROM cirujanos_turno '
+                'WHERE fecha BETWEEN ? AND ?',
+                (f'{año}-01-01', f'{año}-12-31')
+            ).fetchall()
+            lecturas += 1
+        except sqlite3.OperationalError:
+            errores += 1
+    conexion.close()
+    resultados.put(('lector', lecturas, errores, []))
+
+
+def escritor(ruta, ajustada, segundos, resultados):
+    conexion = conectar(ruta, ajustada)
+    escrituras = errores = 0
+    latencias = []
+    fin = time.perf_counter() + segundos
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        try:
+            # Un "cambio definitivo": muchas filas en una transacción
+            conexion.execute(
+                'UPDATE cirujanos_turno SET cirujano1 = ? WHERE fecha >= ?',
+                (f'Dr. {escrituras}', f'{AÑOS[0]}-06-01')
+            )
+            conexion.commit()
+            escrituras += 1
+            latencias.append(time.perf_counter() - inicio)
+        except sqlite3.OperationalError:
+            conexion.rollback()
+            errores += 1
+        time.sleep(0.01)
+    conexion.close()
+    resultados.put(('escritor', escrituras, errores, latencias))
+
+
+def ejecutar(ajustada, lectores, segundos):
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'turnos.db')
+        crear_base(ruta)
+
+        resultados = multiprocessing.Queue()
+        procesos = [multiprocessing.Process(target=lector, args=(ruta, ajustada, segundos, resultados))
+                    for _ in range(lectores)]
+        procesos.append(multiprocessing.Process(target=escritor, args=(ruta, ajustada, segundos, resultados)))
+        for proceso in procesos:
+            proceso.start()
+        salida = [resultados.get() for _ in procesos]
+        for proceso in procesos:
+            proceso.join()
+
+    lecturas = sum(r[1] for r in salida if r[0] == 'lector')
+    errores_lectura = sum(r[2] for r in salida if r[0] == 'lector')
+    _, escrituras, errores_escritura, latencias = next(r for r in salida if r[0] == 'escritor')
+    latencias.sort()
+    return {
+        'configuracion': 'ajustada' if ajustada else 'por defecto',
+        'lecturas_por_segundo': round(lecturas / segundos, 1),
+        'errores_lectura': errores_lectura,
+        'escrituras_por_segundo': round(escrituras / segundos, 1),
+        'errores_escritura': errores_escritura,
+        'escritura_p50_ms': round(latencias[len(latencias) // 2] * 1000, 2) if latencias else None,
+        'escritura_max_ms': round(latencias[-1] * 1000, 2) if latencias else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--lectores', type=int, default=4)
+    parser.add_argument('--segundos', type=float, default=5.0)
+    parser.add_argument('--salida', help='archivo JSON donde guardar los resultados')
+    args = parser.parse_args()
+
+    resultados = [ejecutar(ajustada, args.lectores, args.segundos) for ajustada in (False, True)]
+    for resultado in resultados:
+        print(json.dumps(resultado, ensure_ascii=False))
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Latencia de GET /api/guardia frente a su objetivo publicado.
+
+Siembra una base temporal con ediciones en la mitad de los días, calienta la
+caché y mide muchas consultas a fechas al azar: la petición completa por el
+cliente de pruebas de Flask y la consulta a la caché sola. Termina con
+código 1 si la petición no cumple los objetivos de latencia o si alguna
+consulta ya caliente fue a la base de datos.
+
+Uso:
+    python benchmarks/guardia.py
+    python benchmarks/guardia.py --consultas 20000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+# Objetivos publicados en el README, medidos en proceso (sin red ni gunicorn)
+OBJETIVO_P50_MS = 1.0
+OBJETIVO_P99_MS = 2.0
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def medir(app, consultas):
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    from modelos import CirujanosTurno, db
+
+    with app.app_context():
+        azar = random.Random(0)
+        for fila in CirujanosTurno.query.all():
+            if azar.random() < 0.5:
+                fila.cirujano1 = f'Dr. {azar.randrange(200)}'
+        db.session.commit()
+
+    cliente = app.test_client()
+    azar = random.Random(1)
+    fechas = [date(2025, 1, 1) + timedelta(days=azar.randrange(730)) for _ in range(consultas)]
+    cliente.get('/api/guardia')  # carga las excepciones
+
+    # Solo cuentan las consultas de este hilo: el del difusor sigue sondeando
+    consultas_sql = []
+    hilo = threading.current_thread()
+
+    def contar(*_):
+        if threading.current_thread() is hilo:
+            consultas_sql.append(1)
+
+    event.listen(Engine, 'before_cursor_execute', contar)
+    peticiones = []
+    for fecha in fechas:
+        inicio = time.perf_counter()
+        cliente.get(f'/api/guardia?fecha={fecha.isoformat()}')
+        peticiones.append(time.perf_counter() - inicio)
+    event.remove(Engine, 'before_cursor_execute', contar)
+
+    cache = []
+    for fecha in fechas:
+        inicio = time.perf_counter()
+        app.extensions['calendario'].cache_guardia.consultar(fecha)
+        cache.append(time.perf_counter() - inicio)
+
+    return {
+        'consultas': consultas,
+        'peticion_p50_ms': round(statistics.median(peticiones) * 1000, 3),
+        'peticion_p99_ms': round(percentil(peticiones, 0.99) * 1000, 3),
+        'cache_p50_us': round(statistics.median(cache) * 1e6, 2),
+        'cache_p99_us': round(percentil(cache, 0.99) * 1e6, 2),
+        'consultas_sql': len(consultas_sql),
+        'objetivo_p50_ms': OBJETIVO_P50_MS,
+        'objetivo_p99_ms': OBJETIVO_P99_MS,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--consultas', type=int, default=5000)
+    args = parser.parse_args()
+
+    from app import create_app
+
+    # Base y carpeta de publicación temporales, borradas al terminar
+    with tempfile.TemporaryDirectory() as temporal:
+        app = create_app({
+            'PRECALENTAR': False,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(temporal, 'guardia.db'),
+            'CARPETA_PUBLICADO': os.path.join(temporal, 'publicado'),
+        })
+        try:
+            resultado = medir(app, args.consultas)
+        finally:
+            app.extensions['calendario'].cerrar()
+
+    print(json.dumps(resultado))
+    if (resultado['peticion_p50_ms'] > OBJETIVO_P50_MS
+            or resultado['peticion_p99_ms'] > OBJETIVO_P99_MS or resultado['consultas_sql']):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Costo de importar cada capa y de crear la aplicación, medido con -X importtime.
+
+Cada medición corre en un intérprete nuevo, así que incluye las
+dependencias que arrastra el módulo. Se reporta el tiempo acumulado del
+módulo (el mínimo de varias corridas), el tiempo propio del módulo y las
+dependencias más costosas de la última corrida. El caso create_app mide
+además crear una aplicación sin precalentar contra una base temporal.
+
+Uso:
+    python benchmarks/importacion.py
+    python benchmarks/importacion.py --repeticiones 10 --mostrar 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Nombre del caso -> (módulo medido, código que se ejecuta)
+CASOS = {
+    'rotacion': ('rotacion', 'import rotacion'),
+    'modelos': ('modelos', 'import modelos'),
+    'app': ('app', 'import app'),
+    'create_app': ('app', "import time, app; inicio = time.perf_counter(); "
+                          "app.create_app({'PRECALENTAR': False}); "
+                          "print(int((time.perf_counter() - inicio) * 1e6))"),
+}
+
+
+def leer_importtime(salida):
+    """Diccionario módulo -> (propio_us, acumulado_us) a partir de la salida de -X importtime."""
+    tiempos = {}
+    for linea in salida.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, modulo = linea[len('import time:'):].split('|')
+        tiempos.setdefault(modulo.strip(), (int(propio), int(acumulado)))
+    return tiempos
+
+
+def medir(modulo, codigo, entorno):
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True
+    )
+    tiempos = leer_importtime(proceso.stderr)
+    propio, acumulado = tiempos[modulo]
+    creacion = int(proceso.stdout) if proceso.stdout.strip() else None
+    return propio, acumulado, creacion, tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--mostrar', type=int, default=3, help='dependencias más costosas a listar')
+    args = parser.parse_args()
+
+    # La base y la carpeta de publicación de create_app, borradas al terminar
+    with tempfile.TemporaryDirectory() as temporal:
+        entorno = dict(os.environ, PYTHONPATH=RAIZ,
+                       DATABASE_URL='sqlite:///' + os.path.join(temporal, 'importacion.db'),
+                       CARPETA_PUBLICADO=os.path.join(temporal, 'publicado'))
+
+        resultados = {}
+        for caso, (modulo, codigo) in CASOS.items():
+            corridas = [medir(modulo, codigo, entorno) for _ in range(args.repeticiones)]
+            propio, acumulado, creacion, tiempos = min(corridas, key=lambda corrida: corrida[1])
+            dependencias = sorted(
+                (nombre for nombre in tiempos if nombre != modulo and '.' not in nombre),
+                key=lambda nombre: tiempos[nombre][1], reverse=True
+            )[:args.mostrar]
+            resultado = {
+                'acumulado_ms': round(acumulado / 1000, 1),
+                'propio_ms': round(propio / 1000, 1),
+                'mas_costosas': {nombre: round(tiempos[nombre][1] / 1000, 1) for nombre in dependencias},
+            }
+            if creacion is not None:
+                resultado['create_app_ms'] = round(min(corrida[2] for corrida in corridas) / 1000, 1)
+            resultados[caso] = resultado
+    print(json.dumps(resultados, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
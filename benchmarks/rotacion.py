@@ -0,0 +1,84 @@
+"""
+Costo por consulta de los motores de rotación.
+
+Mide cuánto tarda una consulta "¿este equipo está de guardia tal día?" en
+TurnoCiclo y TurnoVolante (con date y con datetime, como llegan desde la
+aplicación y desde los scripts), un día de simulacion_turnos y una
+asignación de calendario_turnos. Los tiempos son por consulta, día o
+asignación, el mínimo de varias repeticiones.
+
+Uso:
+    python benchmarks/rotacion.py
+    python benchmarks/rotacion.py --años 20
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+def por_operacion(funcion, operaciones, repeticiones):
+    """Nanosegundos por operación, el mínimo de las repeticiones."""
+    return round(min(timeit.repeat(funcion, number=1, repeat=repeticiones)) / operaciones * 1e9, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--años', type=int, default=10)
+    parser.add_argument('--repeticiones', type=int, default=7)
+    args = parser.parse_args()
+
+    import calendario_turnos
+    import rotacion
+    import simulacion_turnos
+
+    dias = 365 * args.años
+    fechas = [date(2025, 1, 1) + timedelta(days=i) for i in range(dias)]
+    momentos = [datetime(fecha.year, fecha.month, fecha.day) for fecha in fechas]
+    ciclos = [turno for turno in rotacion.TURNOS.values() if isinstance(turno, rotacion.TurnoCiclo)]
+    volantes = [turno for turno in rotacion.TURNOS.values() if isinstance(turno, rotacion.TurnoVolante)]
+
+    def consultar(turnos, valores):
+        def ejecutar():
+            for turno in turnos:
+                consulta = turno.get_turno_para_fecha
+                for valor in valores:
+                    consulta(valor)
+        return ejecutar
+
+    def simular():
+        fijos, volantes_sim = simulacion_turnos.crear_equipos()
+        simulacion_turnos.simular(fijos, volantes_sim, date(2025, 2, 1),
+                                  date(2025, 2, 1) + timedelta(days=dias - 1), estricto=False)
+
+    fin = datetime(2025 + args.años - 1, 12, 31)
+    patrones = [calendario_turnos.TurnoPattern(nombre, dia, datetime(2025, 2, 3 + dia))
+                for dia, nombre in enumerate(('Turno lunes', 'Turno martes', 'Turno miércoles', 'Turno jueves'))]
+    asignaciones = sum(len(calendario_turnos.generate_fixed_turno(patron, fin)) for patron in patrones)
+    asignaciones += len(calendario_turnos.generate_volantes(datetime(2025, 2, 1), fin))
+
+    def generar():
+        for patron in patrones:
+            calendario_turnos.generate_fixed_turno(patron, fin)
+        calendario_turnos.generate_volantes(datetime(2025, 2, 1), fin)
+
+    r = args.repeticiones
+    resultado = {
+        'años': args.años,
+        'turno_ciclo_date_ns': por_operacion(consultar(ciclos, fechas), dias * len(ciclos), r),
+        'turno_ciclo_datetime_ns': por_operacion(consultar(ciclos, momentos), dias * len(ciclos), r),
+        'turno_volante_date_ns': por_operacion(consultar(volantes, fechas), dias * len(volantes), r),
+        'turno_volante_datetime_ns': por_operacion(consultar(volantes, momentos), dias * len(volantes), r),
+        'simulacion_dia_ns': por_operacion(simular, dias, r),
+        'calendario_asignacion_ns': por_operacion(generar, asignaciones, r),
+    }
+    print(json.dumps(resultado, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,352 @@
+"""
+Suite de benchmarks de los motores de rotación, el renderizado y la base de datos.
+
+Cada caso se mide con varios tamaños de datos sintéticos; se reporta el
+mínimo y la mediana de varias repeticiones. Los resultados se guardan en
+JSON para comparar corridas y detectar regresiones.
+
+Uso:
+    python benchmarks/suite.py                          # todos los casos
+    python benchmarks/suite.py -k calendario            # solo los que contienen "calendario"
+    python benchmarks/suite.py --salida antes.json
+    python benchmarks/suite.py --comparar antes.json    # marca regresiones
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+# La aplicación se importa contra una base temporal, nunca contra instance/turnos.db
+# (se borra al terminar main())
+_TEMPORAL = tempfile.TemporaryDirectory()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_TEMPORAL.name, 'benchmark.db')
+os.environ['CARPETA_PUBLICADO'] = os.path.join(_TEMPORAL.name, 'publicado')
+
+CASOS = []
+
+
+def caso(nombre, tamaños, repeticiones=5):
+    """Registra una función de benchmark. La función recibe el tamaño y
+    devuelve otra función sin argumentos que es la que se mide."""
+    def registrar(preparar):
+        CASOS.append((nombre, tamaños, repeticiones, preparar))
+        return preparar
+    return registrar
+
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+@contextlib.contextmanager
+def silencio():
+    # Los scripts de rotación imprimen su verificación por consola
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# --- Datos sintéticos --------------------------------------------------------
+
+_aplicacion = None
+
+
+def aplicacion():
+    """La aplicación de la suite, creada una vez y sin precalentar."""
+    global _aplicacion
+    if _aplicacion is None:
+        import app
+        _aplicacion = app.create_app({'PRECALENTAR': False})
+    return _aplicacion
+
+
+def sembrar_base(años):
+    """Deja en la base `años` años de turnos desde 2025, con cirujanos variados."""
+    from modelos import CirujanosTurno, db, sembrar_turnos
+
+    with aplicacion().app_context():
+        db.session.query(CirujanosTurno).delete()
+        sembrar_turnos(date(2025, 1, 1), date(2025 + años - 1, 12, 31))
+        db.session.commit()
+
+        # Nombres distintos por fila, como en una base con muchas ediciones
+        azar = random.Random(años)
+        filas = CirujanosTurno.query.all()
+        for fila in filas:
+            fila.cirujano1 = f'Dr. {azar.randrange(200)}'
+            fila.cirujano2 = f'Dra. {azar.randrange(200)}'
+        db.session.commit()
+    return aplicacion()
+
+
+# --- Motores de rotación -----------------------------------------------------
+
+@caso('get_turno_for_date', tamaños=(1, 10, 50))
+def bench_get_turno_for_date(años):
+    import rotacion
+
+    fechas = [date(2025, 1, 1) + timedelta(days=i) for i in range(365 * años)]
+
+    def ejecutar():
+        for fecha in fechas:
+            rotacion.get_turno_for_date(fecha, rotacion.TURNOS)
+    return ejecutar
+
+
+@caso('turno_ciclo_sin_instantanea', tamaños=(1, 10, 50))
+def bench_turno_ciclo(años):
+    # El motor original, sin la tabla precalculada
+    import rotacion
+
+    fechas = [date(2025, 1, 1) + timedelta(days=i) for i in range(365 * años)]
+    turnos = dict(rotacion.TURNOS)
+
+    def ejecutar():
+        for fecha in fechas:
+            rotacion.get_turno_for_date(fecha, turnos)
+    return ejecutar
+
+
+@caso('generate_annual_schedule', tamaños=(1, 10))
+def bench_generate_annual_schedule(años):
+    import calendario_turnos
+
+    def ejecutar():
+        with silencio():
+            for año in range(2025, 2025 + años):
+                calendario_turnos.generate_annual_schedule(año)
+    return ejecutar
+
+
+@caso('simulacion_turnos', tamaños=(1, 10, 50))
+def bench_simulacion(años):
+    import simulacion_turnos
+
+    def ejecutar():
+        fijos, volantes = simulacion_turnos.crear_equipos()
+        simulacion_turnos.simular(fijos, volantes, date(2025, 2, 1),
+                                  date(2025 + años - 1, 12, 31), estricto=False)
+    return ejecutar
+
+
+@caso('prioridades', tamaños=(1, 10, 50))
+def bench_prioridades(años):
+    # Los seis equipos en dos capas, más un rango de dos semanas por equipo y
+    # año con prioridad máxima, para que haya superposiciones que resolver
+    import prioridades
+    import rotacion
+
+    inicio = date(2025, 1, 1).toordinal()
+    dias = range(inicio, date(2025 + años - 1, 12, 31).toordinal() + 1)
+    flujos = []
+    for numero, (nombre, turno) in enumerate(rotacion.TURNOS.items()):
+        capa = 'volante' if isinstance(turno, rotacion.TurnoVolante) else 'fijo'
+        guardias = [(date.fromordinal(dia), nombre) for dia in dias if turno.de_guardia(dia)]
+        flujos.append(prioridades.Flujo(nombre, guardias, capa=capa, prioridad=numero + 1))
+        reemplazos = [(date(año, numero + 1, 1), date(año, numero + 1, 14), f'Reemplazo {nombre}')
+                      for año in range(2025, 2025 + años)]
+        flujos.append(prioridades.Flujo(f'Reemplazo {nombre}', reemplazos, capa=capa, prioridad=0))
+
+    def ejecutar():
+        prioridades.resolver(flujos)
+    return ejecutar
+
+
+@caso('descanso', tamaños=(1, 10, 50))
+def bench_descanso(años):
+    # Revisión en lote de la rotación con cirujanos variados, como una base
+    # con muchas ediciones
+    import descanso
+
+    azar = random.Random(años)
+    filas = [(fecha, turno, f'Dr. {azar.randrange(40)}', f'Dra. {azar.randrange(40)}')
+             for fecha, turno, _, _ in descanso.filas_rotacion(date(2025, 1, 1), date(2025 + años - 1, 12, 31))]
+
+    def ejecutar():
+        descanso.revisar(filas)
+    return ejecutar
+
+
+@caso('resolver_rotacion', tamaños=(1, 2, 4), repeticiones=3)
+def bench_resolver_rotacion(procesos):
+    # Aquí el tamaño es la cantidad de procesos de búsqueda
+    import resolver_rotacion
+
+    def ejecutar():
+        resolver_rotacion.resolver(procesos=procesos)
+    return ejecutar
+
+
+# --- Base de datos -----------------------------------------------------------
+
+@caso('sembrar_turnos', tamaños=(2, 10, 50), repeticiones=3)
+def bench_sembrar(años):
+    from modelos import CirujanosTurno, db, sembrar_turnos
+
+    app = aplicacion()
+
+    def ejecutar():
+        with app.app_context():
+            db.session.query(CirujanosTurno).delete()
+            sembrar_turnos(date(2025, 1, 1), date(2025 + años - 1, 12, 31))
+            db.session.commit()
+    return ejecutar
+
+
+# --- Web de punta a punta ----------------------------------------------------
+
+@caso('show_calendar', tamaños=(2, 10, 50))
+def bench_show_calendar(años):
+    # Sin página publicada: consulta y renderizado en cada petición
+    app = sembrar_base(años)
+    shutil.rmtree(app.extensions['calendario'].publicador.carpeta, ignore_errors=True)
+    cliente = app.test_client()
+
+    def ejecutar():
+        respuesta = cliente.get('/')
+        assert respuesta.status_code == 200
+    return ejecutar
+
+
+@caso('show_calendar_publicado', tamaños=(2, 10, 50))
+def bench_show_calendar_publicado(años):
+    app = sembrar_base(años)
+    app.extensions['calendario'].publicador.publicar(forzar=True)
+    cliente = app.test_client()
+
+    def ejecutar():
+        respuesta = cliente.get('/')
+        assert respuesta.status_code == 200
+    return ejecutar
+
+
+@caso('calendario_mes', tamaños=(2, 10, 50))
+def bench_calendario_mes(años):
+    # Un mes por petición: el costo no debería crecer con los años de datos
+    cliente = sembrar_base(años).test_client()
+
+    def ejecutar():
+        respuesta = cliente.get('/calendario/2025/3')
+        assert respuesta.status_code == 200
+    return ejecutar
+
+
+def _bench_actualizar(años, aplicar_futuro):
+    cliente = sembrar_base(años).test_client()
+    contador = iter(range(10 ** 9))
+
+    def ejecutar():
+        n = next(contador)
+        respuesta = cliente.post('/actualizar_cirujanos', json={
+            'fecha': '2025-03-05',
+            'nombreTurno': 'Volante 2',
+            'cirujano1': f'Dr. Bench {n}',
+            'cirujano2': f'Dra. Bench {n}',
+            'aplicarFuturo': aplicar_futuro,
+        })
+        assert respuesta.get_json()['success']
+    return ejecutar
+
+
+@caso('actualizar_cirujanos', tamaños=(2, 10, 50))
+def bench_actualizar(años):
+    return _bench_actualizar(años, False)
+
+
+@caso('actualizar_cirujanos_aplicar_futuro', tamaños=(2, 10, 50))
+def bench_actualizar_futuro(años):
+    return _bench_actualizar(años, True)
+
+
+# --- Ejecución ---------------------------------------------------------------
+
+def ejecutar_suite(filtro=None):
+    resultados = []
+    for nombre, tamaños, repeticiones, preparar in CASOS:
+        if filtro and filtro not in nombre:
+            continue
+        for tamaño in tamaños:
+            funcion = preparar(tamaño)
+            funcion()  # calentamiento
+            tiempos = medir(funcion, repeticiones)
+            resultado = {
+                'caso': nombre,
+                'tamaño': tamaño,
+                'repeticiones': repeticiones,
+                'min_ms': round(min(tiempos) * 1000, 3),
+                'mediana_ms': round(statistics.median(tiempos) * 1000, 3),
+            }
+            print(f"{nombre:<40} {tamaño:>4}  min {resultado['min_ms']:>10.3f} ms"
+                  f"  mediana {resultado['mediana_ms']:>10.3f} ms")
+            resultados.append(resultado)
+    return resultados
+
+
+def comparar(resultados, anteriores, tolerancia):
+    """Imprime las diferencias con una corrida anterior; devuelve las regresiones."""
+    previos = {(r['caso'], r['tamaño']): r for r in anteriores['resultados']}
+    regresiones = []
+    for resultado in resultados:
+        previo = previos.get((resultado['caso'], resultado['tamaño']))
+        if previo is None:
+            continue
+        razon = resultado['min_ms'] / previo['min_ms'] if previo['min_ms'] else 1.0
+        marca = ''
+        if razon > 1 + tolerancia:
+            marca = '  <-- REGRESIÓN'
+            regresiones.append(resultado)
+        print(f"{resultado['caso']:<40} {resultado['tamaño']:>4}  x{razon:.2f}{marca}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('-k', dest='filtro', help='solo los casos cuyo nombre contiene este texto')
+    parser.add_argument('--salida', help='archivo JSON donde guardar los resultados')
+    parser.add_argument('--comparar', help='archivo JSON de una corrida anterior')
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help='aumento relativo del mínimo considerado regresión (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    try:
+        resultados = ejecutar_suite(args.filtro)
+
+        if args.salida:
+            with open(args.salida, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'python': platform.python_version(),
+                    'plataforma': platform.platform(),
+                    'resultados': resultados,
+                }, f, ensure_ascii=False, indent=2)
+
+        if args.comparar:
+            with open(args.comparar, encoding='utf-8') as f:
+                anteriores = json.load(f)
+            print()
+            if comparar(resultados, anteriores, args.tolerancia):
+                sys.exit(1)
+    finally:
+        if _aplicacion is not None:
+            _aplicacion.extensions['calendario'].cerrar()
+        _TEMPORAL.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Tamaño y costo de parseo de la página del calendario.
+
+Renderiza GET / sobre una base sembrada y reporta los bytes del HTML (sin
+comprimir y con gzip), la cantidad de elementos y de atributos inline, y
+el tiempo que tarda html.parser en recorrerlo, como aproximación al costo
+de parseo en el navegador.
+
+Uso:
+    python benchmarks/tamano_html.py
+"""
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+from html.parser import HTMLParser
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+class Contador(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.elementos = 0
+        self.onclick = 0
+
+    def handle_starttag(self, tag, attrs):
+        self.elementos += 1
+        self.onclick += sum(1 for nombre, _ in attrs if nombre == 'onclick')
+
+
+def main():
+    from app import create_app
+
+    # Base y carpeta de publicación temporales, borradas al terminar
+    with tempfile.TemporaryDirectory() as temporal:
+        app = create_app({
+            'PRECALENTAR': False,
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(temporal, 'tamano.db'),
+            'CARPETA_PUBLICADO': os.path.join(temporal, 'publicado'),
+        })
+        try:
+            html = app.test_client().get('/', headers={'Accept-Encoding': 'identity'}).get_data()
+        finally:
+            app.extensions['calendario'].cerrar()
+
+    tiempos = []
+    for _ in range(5):
+        contador = Contador()
+        inicio = time.perf_counter()
+        contador.feed(html.decode('utf-8'))
+        contador.close()
+        tiempos.append(time.perf_counter() - inicio)
+
+    print(json.dumps({
+        'bytes': len(html),
+        'bytes_gzip': len(gzip.compress(html, compresslevel=6)),
+        'elementos': contador.elementos,
+        'atributos_onclick': contador.onclick,
+        'parseo_ms': round(min(tiempos) * 1000, 2),
+    }))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,22 @@
 from datetime import datetime, timedelta
-from dataclasses import dataclass
 from typing import List, Dict, Tuple
 
-@dataclass
 class TurnoPattern:
     """Define el patrón de un turno fijo."""
-    name: str
-    designated_day: int  # 0=Lunes, 6=Domingo
-    cycle_start: datetime  # Fecha de inicio del ciclo
+    __slots__ = ('name', 'designated_day', 'cycle_ordinal')
+
+    def __init__(self, name: str, designated_day: int, cycle_start: datetime):
+        self.name = name
+        self.designated_day = designated_day  # 0=Lunes, 6=Domingo
+        # Fecha de inicio del ciclo, como ordinal; se generan datetime solo al devolver
+        self.cycle_ordinal = cycle_start.toordinal()
+
+    @property
+    def cycle_start(self) -> datetime:
+        return datetime.fromordinal(self.cycle_ordinal)
+
+    def __repr__(self):
+        return f"TurnoPattern(name={self.name!r}, designated_day={self.designated_day}, cycle_start={self.cycle_start!r})"
 
 def generate_fixed_turno(pattern: TurnoPattern, end_date: datetime) -> List[Tuple[datetime, str]]:
     """
@@ -17,44 +26,25 @@ def generate_fixed_turno(pattern: TurnoPattern, end_date: datetime) -> List[Tupl
     - Semana 5: solo sábado
     - Semana 6: solo viernes
     """
-    assignments = []
-    current_cycle_start = pattern.cycle_start
-    
-    while current_cycle_start <= end_date:
-        # Obtener el primer día designado del ciclo
-        current = current_cycle_start
-        while current.weekday() != pattern.designated_day:
-            current += timedelta(days=1)
-        
+    # Con ordinales: date.fromordinal(1) es lunes, así que el día de la semana es (ordinal - 1) % 7
+    end = end_date.toordinal()
+    offsets = []
+    cycle_start = pattern.cycle_ordinal
+    while cycle_start <= end:
+        # Primer día designado del ciclo
+        current = cycle_start + (pattern.designated_day - (cycle_start - 1)) % 7
+
         # Semanas 1-4: turnos en día designado
-        for week in range(4):
-            assignment_date = current + timedelta(weeks=week)
-            if assignment_date <= end_date:
-                assignments.append((assignment_date, pattern.name))
-        
-        # Semana 4: turno adicional en domingo
-        week4_start = current + timedelta(weeks=3)
-        sunday_extra = week4_start
-        while sunday_extra.weekday() != 6:  # Avanzar hasta el domingo
-            sunday_extra += timedelta(days=1)
-        if sunday_extra <= end_date:
-            assignments.append((sunday_extra, pattern.name))
-        
-        # Semana 5: turno en sábado
-        saturday = sunday_extra + timedelta(days=6)
-        if saturday <= end_date:
-            assignments.append((saturday, pattern.name))
-        
-        # Semana 6: turno en viernes
-        friday = saturday + timedelta(days=6)
-        if friday <= end_date:
-            assignments.append((friday, pattern.name))
-        
-        # Siguiente ciclo comienza después del viernes
-        # Calculamos exactamente 42 días (6 semanas) desde el inicio del ciclo actual
-        current_cycle_start = current_cycle_start + timedelta(days=42)
-    
-    return assignments
+        offsets.extend(current + 7 * week for week in range(4))
+
+        # Semana 4: turno adicional en domingo, después sábado y viernes
+        sunday_extra = current + 21 + (6 - pattern.designated_day) % 7
+        offsets.extend((sunday_extra, sunday_extra + 6, sunday_extra + 12))
+
+        # Siguiente ciclo: exactamente 42 días (6 semanas) después
+        cycle_start += 42
+
+    return [(datetime.fromordinal(ordinal), pattern.name) for ordinal in offsets if ordinal <= end]
 
 def generate_volantes(start_date: datetime, end_date: datetime) -> List[Tuple[datetime, str]]:
     """
@@ -62,23 +52,13 @@ def generate_volantes(start_date: datetime, end_date: datetime) -> List[Tuple[da
     Volante 1 comienza el día especificado y retrocede un día cada semana.
     Volante 2 va siempre el día siguiente a Volante 1.
     """
+    # Retroceder un día por semana es avanzar 6 días
+    end = end_date.toordinal()
     assignments = []
-    current = start_date
-    current_weekday = start_date.weekday()  # Comenzar en el día especificado
-    
-    while current <= end_date:
-        if current <= end_date:
-            assignments.append((current, "Volante 1"))
-            next_day = current + timedelta(days=1)
-            if next_day <= end_date:
-                assignments.append((next_day, "Volante 2"))
-        
-        # Retroceder un día para la siguiente semana
-        current_weekday = (current_weekday - 1) % 7
-        current += timedelta(days=6)  # Avanzar a la siguiente semana
-        while current.weekday() != current_weekday:
-            current += timedelta(days=1)
-    
+    for ordinal in range(start_date.toordinal(), end + 1, 6):
+        assignments.append((datetime.fromordinal(ordinal), "Volante 1"))
+        if ordinal + 1 <= end:
+            assignments.append((datetime.fromordinal(ordinal + 1), "Volante 2"))
     return assignments
 
 def generate_annual_schedule(year: int) -> Dict[datetime.date, str]:
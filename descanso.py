@@ -0,0 +1,173 @@
+"""
+Reglas de descanso: cuántas guardias puede tener un equipo o un cirujano
+en una ventana móvil de días.
+
+Cada regla dice "no más de `maximo` guardias en cualquier ventana de `dias`
+días seguidos". Sin guardias en días consecutivos es la ventana de 2 días
+con máximo 1.
+
+ControlDescanso recorre las guardias en orden de fecha y lleva, por equipo
+y por cirujano, una cola de fechas por regla: cada guardia entra una vez y
+sale una vez de cada cola, así que registrar una guardia cuesta O(1)
+amortizado por regla. Se usa en lote sobre años completos (revisar()) y en
+/actualizar_cirujanos, que solo rechaza las infracciones que la edición
+agrega o agrava (infracciones_nuevas()).
+
+Uso:
+    python descanso.py                      # la base de datos de la aplicación
+    python descanso.py --rotacion --años 10 # la rotación de TURNOS, sin base
+"""
+import argparse
+from collections import deque
+from datetime import date, timedelta
+
+
+class Regla:
+    __slots__ = ('nombre', 'dias', 'maximo')
+
+    def __init__(self, nombre, dias, maximo):
+        self.nombre = nombre
+        self.dias = dias
+        self.maximo = maximo
+
+
+# La rotación de TURNOS las cumple: cada equipo tiene como máximo 2
+# guardias en 7 días y 5 en 28, y nunca dos días seguidos
+REGLAS = (
+    Regla('días consecutivos', 2, 1),
+    Regla('7 días', 7, 2),
+    Regla('28 días', 28, 5),
+)
+
+
+class Infraccion:
+    """Una ventana que termina en `fecha` con más guardias que las permitidas."""
+
+    __slots__ = ('fecha', 'tipo', 'nombre', 'regla', 'cuenta')
+
+    def __init__(self, fecha, tipo, nombre, regla, cuenta):
+        self.fecha = fecha
+        self.tipo = tipo  # 'equipo' o 'cirujano'
+        self.nombre = nombre
+        self.regla = regla
+        self.cuenta = cuenta
+
+    @property
+    def clave(self):
+        return (self.fecha, self.tipo, self.nombre, self.regla.nombre)
+
+    def describir(self):
+        return (f'{self.nombre}: {self.cuenta} guardias en {self.regla.dias} días '
+                f'hasta el {self.fecha.isoformat()} (máximo {self.regla.maximo})')
+
+    def como_dict(self):
+        return {
+            'fecha': self.fecha.isoformat(),
+            'tipo': self.tipo,
+            'nombre': self.nombre,
+            'regla': self.regla.nombre,
+            'cuenta': self.cuenta,
+            'maximo': self.regla.maximo,
+            'descripcion': self.describir(),
+        }
+
+
+class ControlDescanso:
+    """Contadores de ventana móvil por equipo y por cirujano."""
+
+    __slots__ = ('reglas', 'ventanas', 'ultimo')
+
+    def __init__(self, reglas=REGLAS):
+        self.reglas = reglas
+        self.ventanas = {}  # (tipo, nombre) -> una cola de ordinales por regla
+        self.ultimo = None
+
+    def registrar(self, fecha, nombre_turno, cirujanos):
+        """Agrega las guardias de un día y devuelve las infracciones que cierran ese día."""
+        ordinal = fecha.toordinal()
+        if self.ultimo is not None and ordinal < self.ultimo:
+            raise ValueError(f'Las guardias deben registrarse en orden de fecha: {fecha}')
+        self.ultimo = ordinal
+
+        entidades = [('equipo', nombre_turno)]
+        # Un cirujano en las dos posiciones del mismo día cuenta una sola guardia
+        entidades.extend(('cirujano', cirujano) for cirujano in dict.fromkeys(cirujanos) if cirujano)
+
+        infracciones = []
+        for entidad in entidades:
+            colas = self.ventanas.get(entidad)
+            if colas is None:
+                colas = self.ventanas[entidad] = [deque() for _ in self.reglas]
+            for regla, cola in zip(self.reglas, colas):
+                cola.append(ordinal)
+                limite = ordinal - regla.dias
+                while cola[0] <= limite:
+                    cola.popleft()
+                if len(cola) > regla.maximo:
+                    infracciones.append(Infraccion(fecha, entidad[0], entidad[1], regla, len(cola)))
+        return infracciones
+
+
+def revisar(filas, reglas=REGLAS):
+    """Infracciones de filas (fecha, turno, cirujano1, cirujano2) en orden de fecha."""
+    control = ControlDescanso(reglas)
+    infracciones = []
+    for fecha, nombre_turno, cirujano1, cirujano2 in filas:
+        infracciones.extend(control.registrar(fecha, nombre_turno, (cirujano1, cirujano2)))
+    return infracciones
+
+
+def rango_afectado(fechas, reglas=REGLAS):
+    """Días cuyas ventanas pueden cambiar si se editan `fechas`: (desde, hasta) inclusive."""
+    alcance = timedelta(days=max(regla.dias for regla in reglas) - 1)
+    return min(fechas) - alcance, max(fechas) + alcance
+
+
+def infracciones_nuevas(antes, despues, cirujanos, reglas=REGLAS):
+    """Infracciones de `cirujanos` en `despues` que no estaban en `antes` o
+    que la edición agravó (las mismas filas antes y después de una edición).
+    Una edición solo agrega guardias a los cirujanos que asigna, así que
+    basta con las filas donde aparecen; las infracciones que ya existían,
+    con la misma cuenta, no bloquean la edición."""
+    def propias(filas):
+        return [infraccion for infraccion in revisar(filas, reglas)
+                if infraccion.tipo == 'cirujano' and infraccion.nombre in cirujanos]
+
+    previas = {infraccion.clave: infraccion.cuenta for infraccion in propias(antes)}
+    return [infraccion for infraccion in propias(despues)
+            if infraccion.cuenta > previas.get(infraccion.clave, 0)]
+
+
+def filas_rotacion(desde, hasta):
+    """Filas de la rotación de TURNOS con los cirujanos por defecto."""
+    from rotacion import turno_rotacion
+
+    for ordinal in range(desde.toordinal(), hasta.toordinal() + 1):
+        fecha = date.fromordinal(ordinal)
+        turno = turno_rotacion(fecha)
+        if turno:
+            yield (fecha, turno['nombre'], *turno['cirujanos'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rotacion', action='store_true',
+                        help='revisar la rotación de TURNOS en lugar de la base de datos')
+    parser.add_argument('--desde', type=date.fromisoformat, default=date(2025, 1, 1))
+    parser.add_argument('--años', type=int, default=10, help='horizonte de --rotacion')
+    args = parser.parse_args()
+
+    if args.rotacion:
+        hasta = date(args.desde.year + args.años, args.desde.month, args.desde.day) - timedelta(days=1)
+        infracciones = revisar(filas_rotacion(args.desde, hasta))
+    else:
+        from app import create_app
+        from modelos import leer_filas_turnos
+
+        with create_app({'PRECALENTAR': False}).app_context():
+            infracciones = revisar(leer_filas_turnos(desde=args.desde))
+
+    for infraccion in infracciones:
+        print(f'{infraccion.tipo:<8} {infraccion.describir()}')
+    print(f'{len(infracciones)} infracciones')
+    raise SystemExit(1 if infracciones else 0)
@@ -0,0 +1,183 @@
+"""
+Comparación de rotaciones candidatas antes de cambiar TURNOS.
+
+Cada escenario se evalúa en un horizonte de varios años: días sin cubrir,
+días con más de un equipo, guardias de fin de semana por equipo y
+separación entre guardias consecutivas de un mismo equipo. Los escenarios
+se reparten entre procesos y el resultado es una tabla ordenada de mejor a
+peor.
+
+Un escenario puede ser:
+  - una rotación de resolver_rotacion.resolver(): lista de (nombre,
+    parámetros). Se evalúa un solo período y se repite, que es lo más rápido.
+    Los volantes no tienen guardias antes de su fecha inicial, como
+    TurnoVolante: antes de REFERENCIA, o si se corre la fecha inicial, el
+    período repetido deja días sin cubrir que la búsqueda no ve.
+  - un diccionario nombre -> turno con get_turno_para_fecha (como TURNOS
+    en rotacion.py). Se evalúa día por día.
+
+Uso:
+    python escenarios.py --años 5
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import resolver_rotacion
+
+# Guardias separadas por menos de estos días cuentan como seguidas
+SEPARACION_MINIMA = 2
+
+
+def _dias_rotacion(rotacion, desde, hasta):
+    """Ordinales de guardia de cada equipo, repitiendo un período."""
+    plantillas = {plantilla.nombre: plantilla for plantilla in resolver_rotacion.PLANTILLAS}
+    periodo = resolver_rotacion.periodo_comun(plantillas[nombre] for nombre, _ in rotacion)
+    referencia = resolver_rotacion.REFERENCIA.toordinal()
+    inicio, fin = desde.toordinal(), hasta.toordinal()
+    dias = {}
+    for nombre, parametros in rotacion:
+        plantilla = plantillas[nombre]
+        # Los parámetros son los mismos que imprime el resolvedor
+        alineacion = (parametros['fecha_inicial'].toordinal() - referencia) % periodo
+        if 'semana_inicial' in parametros:
+            en_periodo = [i for i in range(periodo)
+                          if plantilla.de_guardia(i, alineacion, parametros['semana_inicial'])]
+            desde_ordinal = inicio
+        else:
+            en_periodo = range(alineacion % plantilla.periodo, periodo, plantilla.periodo)
+            # Como TurnoVolante: sin guardias antes de la fecha inicial
+            desde_ordinal = max(inicio, parametros['fecha_inicial'].toordinal())
+        ordinales = []
+        for i in en_periodo:
+            primero = desde_ordinal + (referencia + i - desde_ordinal) % periodo
+            ordinales.extend(range(primero, fin + 1, periodo))
+        dias[nombre] = sorted(ordinales)
+    return dias
+
+
+def _dias_turnos(turnos, desde, hasta):
+    """Ordinales de guardia de cada equipo, consultando día por día."""
+    dias = {nombre: [] for nombre in turnos}
+    fecha = desde
+    while fecha <= hasta:
+        for nombre, turno in turnos.items():
+            if turno.get_turno_para_fecha(fecha):
+                dias[nombre].append(fecha.toordinal())
+        fecha += timedelta(days=1)
+    return dias
+
+
+def evaluar(configuracion, desde, hasta):
+    """Métricas de un escenario entre dos fechas, inclusive."""
+    if isinstance(configuracion, dict):
+        dias = _dias_turnos(configuracion, desde, hasta)
+    else:
+        dias = _dias_rotacion(configuracion, desde, hasta)
+
+    inicio = desde.toordinal()
+    equipos_por_dia = bytearray(hasta.toordinal() - inicio + 1)
+    fines_de_semana = {}
+    separaciones = {}
+    seguidas = 0
+    for nombre, ordinales in dias.items():
+        for ordinal in ordinales:
+            equipos_por_dia[ordinal - inicio] += 1
+        # date.fromordinal(1) es lunes, así que el día de la semana es (ordinal - 1) % 7
+        fines_de_semana[nombre] = sum(1 for ordinal in ordinales if (ordinal - 1) % 7 >= 5)
+        huecos = [b - a for a, b in zip(ordinales, ordinales[1:])]
+        separaciones[nombre] = min(huecos) if huecos else None
+        seguidas += sum(1 for hueco in huecos if hueco < SEPARACION_MINIMA)
+
+    cargas = list(fines_de_semana.values())
+    minimas = [separacion for separacion in separaciones.values() if separacion is not None]
+    return {
+        'dias': len(equipos_por_dia),
+        'sin_cubrir': equipos_por_dia.count(0),
+        'conflictos': sum(1 for equipos in equipos_por_dia if equipos > 1),
+        'fines_de_semana': fines_de_semana,
+        'desbalance_fines_de_semana': max(cargas) - min(cargas) if cargas else 0,
+        'separacion_minima': min(minimas) if minimas else None,
+        'guardias_seguidas': seguidas,
+    }
+
+
+def _clave(resultado):
+    # Primero la cobertura, después el reparto de fines de semana y el descanso
+    return (
+        resultado['sin_cubrir'] + resultado['conflictos'],
+        resultado['guardias_seguidas'],
+        resultado['desbalance_fines_de_semana'],
+        -(resultado['separacion_minima'] or 0),
+    )
+
+
+def _evaluar_escenario(argumentos):
+    nombre, configuracion, desde, hasta = argumentos
+    return nombre, evaluar(configuracion, desde, hasta)
+
+
+def comparar(escenarios, desde, hasta, procesos=None):
+    """
+    escenarios: diccionario nombre -> configuración
+    Devuelve [(nombre, resultado)] de mejor a peor. procesos=1 evalúa en
+    este proceso; None usa todos los núcleos.
+    """
+    tareas = [(nombre, configuracion, desde, hasta) for nombre, configuracion in escenarios.items()]
+    if procesos == 1:
+        resultados = [_evaluar_escenario(tarea) for tarea in tareas]
+    else:
+        procesos = procesos or os.cpu_count()
+        with ProcessPoolExecutor(procesos) as ejecutor:
+            # Lotes grandes: cada evaluación dura poco y el envío entre procesos no es gratis
+            lote = max(1, len(tareas) // (procesos * 4))
+            resultados = list(ejecutor.map(_evaluar_escenario, tareas, chunksize=lote))
+    return sorted(resultados, key=lambda par: _clave(par[1]))
+
+
+def tabla(ranking):
+    """Tabla de texto con una fila por escenario."""
+    encabezado = ('#', 'escenario', 'sin cubrir', 'conflictos', 'fines de semana',
+                  'separación mín.', 'seguidas')
+    filas = [encabezado]
+    for posicion, (nombre, resultado) in enumerate(ranking, start=1):
+        cargas = resultado['fines_de_semana'].values()
+        filas.append((
+            str(posicion), nombre, str(resultado['sin_cubrir']), str(resultado['conflictos']),
+            f'{min(cargas)}-{max(cargas)}' if cargas else '-',
+            str(resultado['separacion_minima'] or '-'), str(resultado['guardias_seguidas']),
+        ))
+    anchos = [max(len(fila[i]) for fila in filas) for i in range(len(encabezado))]
+    return '\n'.join('  '.join(celda.ljust(ancho) for celda, ancho in zip(fila, anchos)) for fila in filas)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--desde', type=date.fromisoformat, default=date(2025, 1, 1))
+    parser.add_argument('--años', type=int, default=5)
+    parser.add_argument('--procesos', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    hasta = date(args.desde.year + args.años, args.desde.month, args.desde.day) - timedelta(days=1)
+
+    # Candidatas: todas las rotaciones sin conflictos y, para contrastar, la
+    # primera con cada volante corrido de 1 a 5 días
+    rotaciones = resolver_rotacion.resolver(procesos=args.procesos)
+    escenarios = {f'rotación {numero}': rotacion for numero, rotacion in enumerate(rotaciones, start=1)}
+    if rotaciones:
+        for nombre_volante in ('Volante 1', 'Volante 2'):
+            for desfase in range(1, 6):
+                variante = [
+                    (nombre, dict(parametros, fecha_inicial=parametros['fecha_inicial'] + timedelta(days=desfase))
+                     if nombre == nombre_volante else parametros)
+                    for nombre, parametros in rotaciones[0]
+                ]
+                escenarios[f'rotación 1, {nombre_volante} +{desfase}'] = variante
+
+    inicio = time.perf_counter()
+    ranking = comparar(escenarios, args.desde, hasta, procesos=args.procesos)
+    duracion = time.perf_counter() - inicio
+    print(tabla(ranking))
+    print(f'\n{len(escenarios)} escenarios de {args.desde} a {hasta} en {duracion:.2f} s '
+          f'con {args.procesos} procesos')
@@ -0,0 +1,159 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import Response, abort, request
+
+try:
+    import brotli
+except ImportError:  # Brotli es opcional; sin él se usa solo gzip
+    brotli = None
+
+# Un año: los nombres con hash cambian cuando cambia el contenido
+CACHE_INMUTABLE = 'public, max-age=31536000, immutable'
+# Los nombres sin hash se revalidan siempre
+CACHE_REVALIDAR = 'no-cache'
+
+TIPOS_COMPRIMIBLES = {
+    'text/html', 'text/css', 'text/plain', 'application/json',
+    'application/javascript', 'text/javascript', 'application/manifest+json',
+    'image/svg+xml',
+}
+# Por debajo de este tamaño comprimir no compensa
+TAMAÑO_MINIMO = 500
+
+
+def comprimir(datos, codificacion):
+    if codificacion == 'br':
+        return brotli.compress(datos, quality=5)
+    return gzip.compress(datos, compresslevel=6)
+
+
+def calidades_aceptadas(accept_encoding):
+    """Diccionario codificación -> valor q del header Accept-Encoding (1 si no tiene)."""
+    calidades = {}
+    for parte in accept_encoding.split(','):
+        nombre, _, parametros = parte.partition(';')
+        nombre = nombre.strip().lower()
+        if not nombre:
+            continue
+        calidad = 1.0
+        for parametro in parametros.split(';'):
+            clave, _, valor = parametro.partition('=')
+            if clave.strip().lower() == 'q':
+                try:
+                    calidad = float(valor)
+                except ValueError:
+                    calidad = 0.0  # un q inválido no habilita la codificación
+        calidades[nombre] = calidad
+    return calidades
+
+
+def elegir_codificacion(accept_encoding):
+    """
+    Mejor codificación aceptada por el cliente: br, gzip o None. Gana la de
+    mayor q (a igual q, br); q=0 la excluye y `*` vale para las no nombradas.
+    """
+    calidades = calidades_aceptadas(accept_encoding)
+    comodin = calidades.get('*', 0.0)
+    mejor, mejor_calidad = None, 0.0
+    for codificacion in (('br', 'gzip') if brotli is not None else ('gzip',)):
+        calidad = calidades.get(codificacion, comodin)
+        if calidad > mejor_calidad:
+            mejor, mejor_calidad = codificacion, calidad
+    return mejor
+
+
+def etag_variante(etag, codificacion):
+    """Cada codificación es una representación distinta, con su propia ETag."""
+    return f'{etag}-{codificacion}' if codificacion else etag
+
+
+class Recurso:
+    __slots__ = ('nombre', 'nombre_con_hash', 'tipo', 'variantes', 'etags')
+
+    def __init__(self, nombre, datos):
+        digest = hashlib.sha256(datos).hexdigest()[:12]
+        base, extension = os.path.splitext(nombre)
+        self.nombre = nombre
+        self.nombre_con_hash = f'{base}.{digest}{extension}'
+        self.tipo = mimetypes.guess_type(nombre)[0] or 'application/octet-stream'
+        # Versiones precomprimidas, calculadas una sola vez al arrancar
+        self.variantes = {None: datos}
+        if self.tipo.split(';')[0] in TIPOS_COMPRIMIBLES and len(datos) >= TAMAÑO_MINIMO:
+            self.variantes['gzip'] = comprimir(datos, 'gzip')
+            if brotli is not None:
+                self.variantes['br'] = comprimir(datos, 'br')
+        self.etags = {codificacion: etag_variante(digest, codificacion) for codificacion in self.variantes}
+
+
+class Estaticos:
+    """
+    Sirve los archivos de static/ con un hash de contenido en el nombre
+    (calendario.<hash>.css) y Cache-Control immutable, comprime las
+    respuestas HTML y JSON y expone asset_url() a las plantillas.
+    """
+
+    def __init__(self, app, carpeta):
+        self.carpeta = carpeta
+        self.recursos = {}   # nombre lógico -> Recurso
+        self.por_nombre = {}  # nombre servido (con o sin hash) -> Recurso
+        self.cargar()
+
+        app.add_url_rule('/static/<path:nombre>', 'static', self.servir)
+        app.jinja_env.globals['asset_url'] = self.url
+        app.after_request(self.comprimir_respuesta)
+
+    def cargar(self):
+        for raiz, _, archivos in os.walk(self.carpeta):
+            for archivo in archivos:
+                ruta = os.path.join(raiz, archivo)
+                nombre = os.path.relpath(ruta, self.carpeta).replace(os.sep, '/')
+                with open(ruta, 'rb') as f:
+                    recurso = Recurso(nombre, f.read())
+                self.recursos[nombre] = recurso
+                self.por_nombre[nombre] = recurso
+                self.por_nombre[recurso.nombre_con_hash] = recurso
+
+    def url(self, nombre):
+        return '/static/' + self.recursos[nombre].nombre_con_hash
+
+    def servir(self, nombre):
+        recurso = self.por_nombre.get(nombre)
+        if recurso is None:
+            abort(404)
+
+        codificacion = elegir_codificacion(request.headers.get('Accept-Encoding', ''))
+        if codificacion not in recurso.variantes:
+            codificacion = None
+        respuesta = Response(recurso.variantes[codificacion], mimetype=recurso.tipo)
+        respuesta.set_etag(recurso.etags[codificacion])
+        if codificacion:
+            respuesta.headers['Content-Encoding'] = codificacion
+        respuesta.vary.add('Accept-Encoding')
+        respuesta.headers['Cache-Control'] = (
+            CACHE_INMUTABLE if nombre == recurso.nombre_con_hash else CACHE_REVALIDAR)
+        return respuesta.make_conditional(request)
+
+    def comprimir_respuesta(self, respuesta):
+        if (respuesta.direct_passthrough or respuesta.is_streamed
+                or respuesta.status_code != 200
+                or 'Content-Encoding' in respuesta.headers
+                or respuesta.mimetype not in TIPOS_COMPRIMIBLES):
+            return respuesta
+        codificacion = elegir_codificacion(request.headers.get('Accept-Encoding', ''))
+        respuesta.vary.add('Accept-Encoding')
+        if codificacion is None:
+            return respuesta
+        datos = respuesta.get_data()
+        if len(datos) < TAMAÑO_MINIMO:
+            return respuesta
+        respuesta.set_data(comprimir(datos, codificacion))
+        respuesta.headers['Content-Encoding'] = codificacion
+        etag, debil = respuesta.get_etag()
+        if etag:
+            # La vista puso la ETag sin codificación y comparó If-None-Match con ella
+            respuesta.set_etag(etag_variante(etag, codificacion), debil)
+            return respuesta.make_conditional(request)
+        return respuesta
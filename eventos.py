@@ -0,0 +1,122 @@
+import logging
+import threading
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+
+class DifusorCambios:
+    """
+    Reparte los cambios del calendario a las conexiones SSE abiertas en este proceso.
+
+    Un único hilo por proceso consulta la tabla de cambios (compartida por todos
+    los workers de gunicorn a través de la base de datos) y despierta a las
+    conexiones en espera. Así, las conexiones inactivas no generan consultas:
+    solo esperan en una condición.
+
+    Con el worker gthread cada conexión abierta ocupa un hilo del worker
+    mientras dure, así que se admiten como máximo `max_conexiones` a la vez
+    para que queden hilos para las demás peticiones. Las que sobran reciben
+    solo un `retry:` y el navegador vuelve a intentar más tarde desde la
+    misma revisión.
+    """
+
+    def __init__(self, leer_cambios, leer_ultimo_id, intervalo=1.0, max_buffer=1000,
+                 max_conexiones=None, espera_sin_lugar=30.0):
+        """
+        leer_cambios: función (desde_id) -> lista de (id, datos_json) con id > desde_id
+        leer_ultimo_id: función () -> id del último cambio registrado (0 si no hay)
+        intervalo: segundos entre consultas a la tabla de cambios
+        max_buffer: cantidad de cambios recientes que se mantienen en memoria
+        max_conexiones: streams abiertos a la vez en este proceso (None, sin límite)
+        espera_sin_lugar: segundos que espera el navegador para reintentar si no hay lugar
+        """
+        self.leer_cambios = leer_cambios
+        self.leer_ultimo_id = leer_ultimo_id
+        self.intervalo = intervalo
+        self.buffer = deque(maxlen=max_buffer)
+        self.ultimo_id = None
+        self.condicion = threading.Condition()
+        self.hilo = None
+        self.detenido = threading.Event()
+        self.oyentes = []
+        self.lugares = threading.BoundedSemaphore(max_conexiones) if max_conexiones else None
+        self.espera_sin_lugar = espera_sin_lugar
+
+    def suscribir(self, oyente):
+        """oyente: función ([(id, datos_json)]) llamada desde el hilo con cada lote de cambios."""
+        self.oyentes.append(oyente)
+
+    def iniciar(self):
+        # El hilo se arranca con el primer suscriptor, ya dentro del worker
+        # (no en el proceso maestro de gunicorn, que no debe tener hilos)
+        with self.condicion:
+            if self.hilo is not None:
+                return
+            self.ultimo_id = self.leer_ultimo_id()
+            self.hilo = threading.Thread(target=self._sondear, name='difusor-cambios', daemon=True)
+            self.hilo.start()
+
+    def detener(self):
+        """Termina el hilo de sondeo (al cerrar la aplicación, por ejemplo en los tests)."""
+        self.detenido.set()
+        if self.hilo is not None:
+            self.hilo.join()
+
+    def _sondear(self):
+        while not self.detenido.wait(self.intervalo):
+            try:
+                nuevos = self.leer_cambios(self.ultimo_id)
+            except Exception:
+                # Un error transitorio de la base de datos no debe matar el hilo
+                continue
+            if nuevos:
+                with self.condicion:
+                    self.buffer.extend(nuevos)
+                    self.ultimo_id = nuevos[-1][0]
+                    self.condicion.notify_all()
+                for oyente in self.oyentes:
+                    try:
+                        oyente(nuevos)
+                    except Exception:
+                        log.exception('Error al notificar cambios del calendario')
+
+    def esperar(self, desde_id, timeout):
+        """
+        Bloquea hasta que haya cambios posteriores a desde_id o venza el timeout.
+        Devuelve la lista de (id, datos_json) pendientes para ese cliente.
+        """
+        with self.condicion:
+            self.condicion.wait_for(lambda: self.ultimo_id > desde_id, timeout=timeout)
+            if self.ultimo_id <= desde_id:
+                return []
+            if self.buffer and self.buffer[0][0] <= desde_id + 1:
+                return [cambio for cambio in self.buffer if cambio[0] > desde_id]
+        # El cliente se quedó atrás más de lo que guarda el buffer
+        return self.leer_cambios(desde_id)
+
+    def stream(self, desde_id=None, heartbeat=15.0):
+        """Generador de mensajes en formato text/event-stream."""
+        if self.lugares is not None and not self.lugares.acquire(blocking=False):
+            # Sin lugar: un 503 haría que EventSource deje de reintentar
+            retry = f'retry: {int(self.espera_sin_lugar * 1000)}\n'
+            yield retry + (f'id: {desde_id}\n\n' if desde_id is not None else '\n')
+            return
+        try:
+            self.iniciar()
+            if desde_id is None:
+                desde_id = self.ultimo_id
+            yield f'retry: 3000\nid: {desde_id}\n\n'
+            while True:
+                cambios = self.esperar(desde_id, heartbeat)
+                if not cambios:
+                    # Comentario SSE para mantener viva la conexión a través de proxies
+                    yield ': ping\n\n'
+                    continue
+                for id_cambio, datos in cambios:
+                    desde_id = id_cambio
+                    yield f'id: {id_cambio}\nevent: cambio\ndata: {datos}\n\n'
+        finally:
+            # También al cerrarse el generador cuando el cliente se desconecta
+            if self.lugares is not None:
+                self.lugares.release()
@@ -0,0 +1,84 @@
+import json
+import threading
+from datetime import date
+
+
+class CacheGuardia:
+    """
+    Respuesta en memoria a "¿quién está de guardia tal día?".
+
+    El turno y los cirujanos por defecto salen del motor de rotación; la
+    base de datos solo aporta las excepciones, es decir, los días cuyos
+    cirujanos difieren de los de la rotación. Las excepciones se cargan una
+    vez por proceso y después se mantienen con los cambios que el
+    DifusorCambios lee de la tabla de cambios, así que una consulta normal
+    no toca la base. Las ediciones de este proceso se aplican también al
+    confirmarse, sin esperar al difusor; como los cambios pueden llegar
+    fuera de orden, cada día recuerda la revisión de su celda.
+    """
+
+    def __init__(self, rotacion, colores, leer_filas, difusor):
+        """
+        rotacion: función (fecha) -> celda {nombre, color, cirujanos} según la rotación, o None
+        colores: diccionario turno -> color
+        leer_filas: función () -> filas (fecha, turno, cirujano1, cirujano2)
+            con el estado actual de todos los días
+        difusor: DifusorCambios cuyos cambios mantienen la caché al día
+        """
+        self.rotacion = rotacion
+        self.colores = colores
+        self.leer_filas = leer_filas
+        self.difusor = difusor
+        self.excepciones = None  # fecha -> celda, para los días editados
+        self.revisiones = {}  # fecha -> revisión de la celda en excepciones
+        self.revision = None
+        self.lock = threading.Lock()
+        difusor.suscribir(self.aplicar_cambios)
+
+    def _celda(self, nombre_turno, cirujano1, cirujano2):
+        return {
+            'nombre': nombre_turno,
+            'color': self.colores.get(nombre_turno),
+            'cirujanos': [cirujano1, cirujano2],
+        }
+
+    def _cargar(self):
+        with self.lock:
+            if self.excepciones is not None:
+                return
+            # El difusor arranca con la revisión actual y avisa de todo lo
+            # posterior; las filas se leen después, así que no se pierde nada
+            self.difusor.iniciar()
+            revision = self.difusor.ultimo_id
+            excepciones = {}
+            for fecha, nombre_turno, cirujano1, cirujano2 in self.leer_filas():
+                celda = self._celda(nombre_turno, cirujano1, cirujano2)
+                if celda != self.rotacion(fecha):
+                    excepciones[fecha] = celda
+            self.revision = revision
+            self.excepciones = excepciones
+
+    def aplicar_cambios(self, cambios):
+        """
+        Recibe [(id, datos_json)] del difusor, en orden de id, o de
+        /actualizar_cirujanos tras confirmar. Un cambio más viejo que el
+        que ya se aplicó a un día no lo pisa.
+        """
+        with self.lock:
+            if self.excepciones is None:
+                return  # la carga inicial leerá el estado ya con estos cambios
+            for id_cambio, datos in cambios:
+                for celda in json.loads(datos)['celdas']:
+                    fecha = date.fromisoformat(celda['fecha'])
+                    if self.revisiones.get(fecha, 0) > id_cambio:
+                        continue
+                    self.excepciones[fecha] = self._celda(celda['nombre'], *celda['cirujanos'])
+                    self.revisiones[fecha] = id_cambio
+                self.revision = max(self.revision, id_cambio)
+
+    def consultar(self, fecha):
+        """Celda de guardia de una fecha: {nombre, color, cirujanos} o None."""
+        if self.excepciones is None:
+            self._cargar()
+        celda = self.excepciones.get(fecha)
+        return celda if celda is not None else self.rotacion(fecha)
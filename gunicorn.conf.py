@@ -0,0 +1,23 @@
+# Configuración de gunicorn (se carga automáticamente desde el directorio actual)
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+# Hilos para que las conexiones SSE (/eventos) no ocupen un worker entero.
+# Cada stream abierto retiene un hilo mientras dura, así que la aplicación
+# admite como máximo SSE_MAX_CONEXIONES (50) por worker; los demás hilos
+# quedan para las peticiones normales. Con más navegadores abiertos que
+# workers * SSE_MAX_CONEXIONES, los que sobran reintentan cada 30 segundos.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 100))
+
+# La aplicación se importa una vez en el maestro y los workers la heredan
+preload_app = True
+
+
+def pre_fork(server, worker):
+    # Mueve los objetos ya creados a la generación permanente para que el
+    # recolector de basura de cada worker no los recorra ni escriba en sus
+    # páginas, lo que rompería el copy-on-write
+    gc.freeze()
@@ -0,0 +1,230 @@
+import mmap
+import struct
+import sys
+from array import array
+from datetime import date
+
+
+class InstantaneaRotacion:
+    """
+    Tabla de rotación precalculada y de solo lectura.
+
+    Guarda un código de turno por día (un byte) a partir de un ordinal base,
+    más tuplas indexadas por código con el nombre, el color y los cirujanos
+    por defecto de cada turno. Los datos viven en unos pocos objetos
+    inmutables, así que al crearla en el proceso maestro de gunicorn
+    (--preload) los workers la comparten copy-on-write sin duplicarla.
+    El código 0 significa "sin turno".
+    """
+
+    __slots__ = ('base', 'codigos', 'nombres', 'colores', 'cirujanos')
+
+    def __init__(self, base, codigos, nombres, colores, cirujanos):
+        self.base = base
+        self.codigos = codigos
+        self.nombres = nombres
+        self.colores = colores
+        self.cirujanos = cirujanos
+
+    @classmethod
+    def construir(cls, turnos, cirujanos_por_defecto, desde, hasta):
+        """
+        turnos: diccionario nombre -> TurnoCiclo/TurnoVolante (como TURNOS)
+        cirujanos_por_defecto: diccionario nombre -> [cirujano1, cirujano2]
+        desde, hasta: fechas (inclusive) que cubre la tabla
+        """
+        nombres = (None,) + tuple(turnos)
+        codigo_por_nombre = {nombre: codigo for codigo, nombre in enumerate(nombres)}
+        base = desde.toordinal()
+        codigos = bytearray(hasta.toordinal() - base + 1)
+        for i in range(len(codigos)):
+            fecha = date.fromordinal(base + i)
+            for nombre, turno in turnos.items():
+                if turno.get_turno_para_fecha(fecha):
+                    codigos[i] = codigo_por_nombre[nombre]
+                    break
+        return cls(
+            base,
+            bytes(codigos),
+            nombres,
+            (None,) + tuple(turno.color for turno in turnos.values()),
+            (None,) + tuple(tuple(cirujanos_por_defecto[nombre]) for nombre in turnos),
+        )
+
+    def __contains__(self, fecha):
+        return 0 <= fecha.toordinal() - self.base < len(self.codigos)
+
+    def codigo(self, fecha):
+        return self.codigos[fecha.toordinal() - self.base]
+
+    def turno(self, fecha):
+        """Mismo resultado que get_turno_for_date para una fecha cubierta."""
+        codigo = self.codigo(fecha)
+        if codigo == 0:
+            return None
+        return {"nombre": self.nombres[codigo], "color": self.colores[codigo]}
+
+    def celda(self, fecha):
+        """Mismo resultado que rotacion.turno_rotacion para una fecha cubierta."""
+        codigo = self.codigo(fecha)
+        if codigo == 0:
+            return None
+        return {'nombre': self.nombres[codigo], 'color': self.colores[codigo],
+                'cirujanos': list(self.cirujanos[codigo])}
+
+
+# --- Formato binario en disco -------------------------------------------------
+#
+# Todo en little-endian; cada sección empieza alineada a 4 bytes:
+#   cabecera     CABECERA (32 bytes)
+#   turnos       uint16[n_turnos * 2]   (id de cadena del nombre, id del color); código c -> c - 1
+#   códigos      uint8[n_dias]          código de turno por día desde el ordinal base, 0 = sin turno
+#   pares/día    uint16[n_dias]         id del par de cirujanos de cada día, 0 = sin par
+#   pares        uint16[n_pares * 2]    (id de cadena de cirujano1, de cirujano2); par p -> p - 1
+#   offsets      uint32[n_cadenas + 1]  inicio de cada cadena dentro del bloque de texto
+#   texto        utf-8
+MAGIA = b'TRNB'
+VERSION_BINARIA = 1
+CABECERA = struct.Struct('<4sHHIIIIQ')  # magia, versión, n_turnos, base, n_dias, n_pares, n_cadenas, revisión
+
+
+def _alinear(n):
+    return (n + 3) & ~3
+
+
+def _secciones(n_turnos, n_dias, n_pares, n_cadenas):
+    """Offsets de inicio de cada sección, en el orden del formato."""
+    turnos = CABECERA.size
+    codigos = _alinear(turnos + 4 * n_turnos)
+    pares_dia = _alinear(codigos + n_dias)
+    pares = _alinear(pares_dia + 2 * n_dias)
+    offsets = _alinear(pares + 4 * n_pares)
+    texto = offsets + 4 * (n_cadenas + 1)
+    return turnos, codigos, pares_dia, pares, offsets, texto
+
+
+def serializar_instantanea(turnos, filas, revision):
+    """
+    turnos: secuencia de (nombre, color); el código de cada turno es su posición + 1
+    filas: iterable de (fecha, nombre_turno, cirujano1, cirujano2) ordenado por fecha
+    revision: revisión de la tabla de cambios que reflejan las filas
+    """
+    cadenas = {}
+
+    def id_cadena(texto):
+        if texto not in cadenas:
+            cadenas[texto] = len(cadenas)
+        return cadenas[texto]
+
+    tabla_turnos = array('H')
+    codigo_por_nombre = {}
+    for codigo, (nombre, color) in enumerate(turnos, start=1):
+        codigo_por_nombre[nombre] = codigo
+        tabla_turnos.extend((id_cadena(nombre), id_cadena(color)))
+
+    filas = list(filas)
+    base = filas[0][0].toordinal() if filas else 0
+    n_dias = filas[-1][0].toordinal() - base + 1 if filas else 0
+    codigos = bytearray(n_dias)
+    pares_dia = array('H', bytes(2 * n_dias))
+    pares = array('H')
+    id_par = {}
+    for fecha, nombre_turno, cirujano1, cirujano2 in filas:
+        i = fecha.toordinal() - base
+        codigos[i] = codigo_por_nombre[nombre_turno]
+        par = (cirujano1, cirujano2)
+        if par not in id_par:
+            id_par[par] = len(id_par) + 1
+            pares.extend((id_cadena(cirujano1), id_cadena(cirujano2)))
+        pares_dia[i] = id_par[par]
+    if len(id_par) > 0xFFFF or len(cadenas) > 0xFFFF:
+        raise ValueError('Demasiados cirujanos distintos para ids de 16 bits')
+
+    offsets = array('I', [0])
+    texto = bytearray()
+    for cadena in cadenas:  # los diccionarios conservan el orden de inserción
+        texto += cadena.encode('utf-8')
+        offsets.append(len(texto))
+
+    if sys.byteorder != 'little':
+        for seccion in (tabla_turnos, pares_dia, pares, offsets):
+            seccion.byteswap()
+
+    inicio = _secciones(len(turnos), n_dias, len(id_par), len(cadenas))
+    salida = bytearray(inicio[-1] + len(texto))
+    CABECERA.pack_into(salida, 0, MAGIA, VERSION_BINARIA, len(turnos), base, n_dias,
+                       len(id_par), len(cadenas), revision)
+    for posicion, datos in zip(inicio, (tabla_turnos, codigos, pares_dia, pares, offsets, texto)):
+        datos = bytes(datos)
+        salida[posicion:posicion + len(datos)] = datos
+    return bytes(salida)
+
+
+class InstantaneaBinaria:
+    """
+    Lectura de un archivo generado con serializar_instantanea mediante mmap.
+
+    Las secciones se exponen como memoryviews sobre el mapa, sin copiar: las
+    páginas las comparte el sistema operativo entre todos los workers y solo
+    se decodifican las cadenas que se consultan.
+    """
+
+    def __init__(self, ruta):
+        if sys.byteorder != 'little':
+            raise ValueError('InstantaneaBinaria requiere una plataforma little-endian')
+        with open(ruta, 'rb') as f:
+            self.mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magia, version, n_turnos, self.base, self.n_dias, n_pares, n_cadenas, self.revision = \
+            CABECERA.unpack_from(self.mapa, 0)
+        if magia != MAGIA or version != VERSION_BINARIA:
+            raise ValueError(f'{ruta} no es una instantánea binaria válida')
+
+        turnos, codigos, pares_dia, pares, offsets, texto = _secciones(n_turnos, self.n_dias, n_pares, n_cadenas)
+        vista = memoryview(self.mapa)
+        self.turnos = vista[turnos:turnos + 4 * n_turnos].cast('H')
+        self.codigos = vista[codigos:codigos + self.n_dias]
+        self.pares_dia = vista[pares_dia:pares_dia + 2 * self.n_dias].cast('H')
+        self.pares = vista[pares:pares + 4 * n_pares].cast('H')
+        self.offsets = vista[offsets:offsets + 4 * (n_cadenas + 1)].cast('I')
+        self.texto = vista[texto:]
+        self._cadenas = {}
+
+    def cadena(self, i):
+        cadena = self._cadenas.get(i)
+        if cadena is None:
+            cadena = self._cadenas[i] = str(self.texto[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+        return cadena
+
+    def __contains__(self, fecha):
+        return 0 <= fecha.toordinal() - self.base < self.n_dias
+
+    def _celda(self, i):
+        codigo = self.codigos[i]
+        if codigo == 0:
+            return None
+        par = self.pares_dia[i] - 1
+        return {
+            'nombre': self.cadena(self.turnos[2 * codigo - 2]),
+            'color': self.cadena(self.turnos[2 * codigo - 1]),
+            'cirujanos': [self.cadena(self.pares[2 * par]), self.cadena(self.pares[2 * par + 1])]
+        }
+
+    def dia(self, fecha):
+        """Turno y cirujanos de una fecha, en la forma de generar_calendario_año, o None."""
+        if fecha not in self:
+            return None
+        return self._celda(fecha.toordinal() - self.base)
+
+    def codigos_rango(self, desde, hasta):
+        """Vista (sin copia) de los códigos de turno entre dos fechas cubiertas, inclusive."""
+        inicio = max(desde.toordinal() - self.base, 0)
+        fin = min(hasta.toordinal() - self.base + 1, self.n_dias)
+        return self.codigos[inicio:max(inicio, fin)]
+
+    def rango(self, desde, hasta):
+        """Itera (fecha, celda) para los días con turno entre dos fechas, inclusive."""
+        inicio = max(desde.toordinal() - self.base, 0)
+        fin = min(hasta.toordinal() - self.base + 1, self.n_dias)
+        for i in range(inicio, fin):
+            if self.codigos[i]:
+                yield date.fromordinal(self.base + i), self._celda(i)
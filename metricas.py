@@ -0,0 +1,205 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import (Response, current_app, g, has_app_context, has_request_context, request,
+                   template_rendered, before_render_template)
+from sqlalchemy import event
+
+# Límites de los buckets de los histogramas de tiempo, en segundos
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Límites para la cantidad de consultas SQL por petición
+BUCKETS_CONSULTAS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class Histograma:
+    """Histograma acumulativo con etiquetas, en el formato de Prometheus."""
+
+    def __init__(self, nombre, ayuda, etiquetas, buckets=BUCKETS):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.buckets = buckets
+        self.series = {}  # valores de las etiquetas -> [conteos por bucket, suma, total]
+
+    def observar(self, valores, valor):
+        serie = self.series.get(valores)
+        if serie is None:
+            serie = self.series[valores] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        serie[0][bisect.bisect_left(self.buckets, valor)] += 1
+        serie[1] += valor
+        serie[2] += 1
+
+    def exponer(self):
+        lineas = [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} histogram']
+        for valores, (conteos, suma, total) in sorted(self.series.items()):
+            etiqueta = _etiquetas(self.etiquetas, valores)
+            acumulado = 0
+            for limite, conteo in zip(self.buckets, conteos):
+                acumulado += conteo
+                lineas.append(f'{self.nombre}_bucket{{{etiqueta},le="{limite}"}} {acumulado}')
+            lineas.append(f'{self.nombre}_bucket{{{etiqueta},le="+Inf"}} {total}')
+            lineas.append(f'{self.nombre}_sum{{{etiqueta}}} {suma}')
+            lineas.append(f'{self.nombre}_count{{{etiqueta}}} {total}')
+        return lineas
+
+
+class Contador:
+    def __init__(self, nombre, ayuda, etiquetas):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.series = {}
+
+    def incrementar(self, valores, cantidad=1):
+        self.series[valores] = self.series.get(valores, 0) + cantidad
+
+    def exponer(self):
+        lineas = [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} counter']
+        for valores, valor in sorted(self.series.items()):
+            lineas.append(f'{self.nombre}{{{_etiquetas(self.etiquetas, valores)}}} {valor}')
+        return lineas
+
+
+def _etiquetas(nombres, valores):
+    return ','.join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores))
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metricas:
+    """
+    Métricas de las peticiones de una aplicación en este proceso (en
+    app.extensions['metricas']). Con varios workers de gunicorn cada uno
+    lleva las suyas: Prometheus debe sumar por instancia.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencia = Histograma(
+            'turnos_http_duracion_segundos', 'Duración de las peticiones por ruta.', ('ruta',))
+        self.peticiones = Contador(
+            'turnos_http_peticiones_total', 'Peticiones atendidas por ruta y código.', ('ruta', 'codigo'))
+        self.sql_consultas = Histograma(
+            'turnos_sql_consultas_por_peticion', 'Consultas SQL ejecutadas por petición.', ('ruta',),
+            buckets=BUCKETS_CONSULTAS)
+        self.sql_duracion = Histograma(
+            'turnos_sql_duracion_segundos', 'Tiempo total en SQL por petición.', ('ruta',))
+        self.plantilla = Histograma(
+            'turnos_plantilla_duracion_segundos', 'Tiempo de renderizado de plantillas por petición.', ('ruta',))
+        self.secciones = Histograma(
+            'turnos_seccion_duracion_segundos', 'Duración de secciones instrumentadas del código.', ('seccion',))
+
+    def registrar(self, ruta, codigo, total, consultas, tiempo_sql, tiempo_plantilla):
+        with self.lock:
+            self.latencia.observar((ruta,), total)
+            self.peticiones.incrementar((ruta, codigo))
+            self.sql_consultas.observar((ruta,), consultas)
+            self.sql_duracion.observar((ruta,), tiempo_sql)
+            if tiempo_plantilla:
+                self.plantilla.observar((ruta,), tiempo_plantilla)
+
+    def exponer(self):
+        with self.lock:
+            lineas = []
+            for metrica in (self.latencia, self.peticiones, self.sql_consultas,
+                            self.sql_duracion, self.plantilla, self.secciones):
+                lineas.extend(metrica.exponer())
+        return '\n'.join(lineas) + '\n'
+
+
+@contextmanager
+def seccion(nombre):
+    """Mide un bloque de código; aparece en /metrics y en el header Server-Timing."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracion = time.perf_counter() - inicio
+        metricas = current_app.extensions.get('metricas') if has_app_context() else None
+        if metricas is not None:
+            with metricas.lock:
+                metricas.secciones.observar((nombre,), duracion)
+        if has_request_context() and 'metricas_secciones' in g:
+            g.metricas_secciones.append((nombre, duracion))
+
+
+def _antes_de_plantilla(app, template, context, **extra):
+    if has_request_context():
+        g.metricas_plantilla_inicio = time.perf_counter()
+
+
+def _plantilla_renderizada(app, template, context, **extra):
+    if not has_request_context():
+        return
+    inicio = g.pop('metricas_plantilla_inicio', None)
+    if inicio is not None and 'metricas_plantilla_tiempo' in g:
+        g.metricas_plantilla_tiempo += time.perf_counter() - inicio
+
+
+def _server_timing(total, consultas, tiempo_sql, tiempo_plantilla, secciones):
+    partes = [f'db;dur={tiempo_sql * 1000:.2f};desc="{consultas} consultas"']
+    if tiempo_plantilla:
+        partes.append(f'plantilla;dur={tiempo_plantilla * 1000:.2f}')
+    for nombre, duracion in secciones:
+        partes.append(f'{nombre};dur={duracion * 1000:.2f}')
+    partes.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(partes)
+
+
+def _medir_consultas(metricas, engine):
+    # Tiempo de SQL: los eventos del motor de la aplicación acumulan en el
+    # contexto de la petición actual, si es de la misma aplicación. El inicio
+    # se guarda en el contexto de ejecución de la sentencia, que se descarta
+    # con ella: una sentencia que falla no deja nada en la conexión.
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _antes_de_consulta(conn, cursor, statement, parameters, context, executemany):
+        context._metricas_inicio = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _despues_de_consulta(conn, cursor, statement, parameters, context, executemany):
+        inicio = getattr(context, '_metricas_inicio', None)
+        if inicio is None:
+            return
+        duracion = time.perf_counter() - inicio
+        if (has_request_context() and 'metricas_inicio' in g
+                and current_app.extensions.get('metricas') is metricas):
+            g.metricas_sql_consultas += 1
+            g.metricas_sql_tiempo += duracion
+
+
+def instalar_metricas(app, engine):
+    """Registra la instrumentación de la aplicación y de su motor SQL, y expone /metrics."""
+    metricas = app.extensions['metricas'] = Metricas()
+    _medir_consultas(metricas, engine)
+
+    @app.before_request
+    def _iniciar_medicion():
+        g.metricas_inicio = time.perf_counter()
+        g.metricas_sql_consultas = 0
+        g.metricas_sql_tiempo = 0.0
+        g.metricas_plantilla_tiempo = 0.0
+        g.metricas_secciones = []
+
+    @app.after_request
+    def _registrar_medicion(response):
+        if 'metricas_inicio' not in g:
+            return response
+        total = time.perf_counter() - g.metricas_inicio
+        ruta = request.url_rule.rule if request.url_rule else 'sin_ruta'
+        metricas.registrar(ruta, response.status_code, total, g.metricas_sql_consultas,
+                           g.metricas_sql_tiempo, g.metricas_plantilla_tiempo)
+        response.headers['Server-Timing'] = _server_timing(
+            total, g.metricas_sql_consultas, g.metricas_sql_tiempo,
+            g.metricas_plantilla_tiempo, g.metricas_secciones)
+        return response
+
+    before_render_template.connect(_antes_de_plantilla, app)
+    template_rendered.connect(_plantilla_renderizada, app)
+
+    @app.route('/metrics')
+    def exponer_metricas():
+        return Response(metricas.exponer(), mimetype='text/plain; version=0.0.4')
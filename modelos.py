@@ -0,0 +1,334 @@
+"""
+Capa de datos: los modelos, la inicialización del esquema y las consultas
+del calendario, su historial y la sincronización incremental.
+
+`db` no está ligado a ninguna aplicación; create_app() en app.py lo ata con
+db.init_app(). Todas las funciones de este módulo corren dentro de un
+contexto de aplicación.
+"""
+import hashlib
+import json
+from datetime import date, datetime
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import SQLAlchemyError
+
+from base_datos import CLAVE_BLOQUEO_PUNTOS_CONTROL, bloqueo_exclusivo
+from rotacion import CIRUJANOS_POR_DEFECTO, COLORES_TURNOS, TURNOS, get_turno_for_date
+
+db = SQLAlchemy()
+
+# Modelo para la base de datos
+class CirujanosTurno(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    fecha = db.Column(db.Date, nullable=False, index=True)
+    nombre_turno = db.Column(db.String(50), nullable=False)
+    cirujano1 = db.Column(db.String(100), nullable=False)
+    cirujano2 = db.Column(db.String(100), nullable=False)
+
+    def __repr__(self):
+        return f'<Turno {self.fecha} {self.nombre_turno}>'
+
+# Registro de cambios confirmados, leído por los streams SSE de todos los workers
+# Su id es la revisión del calendario. Los lectores avanzan por id
+# (id > desde), así que quien registra un cambio toma antes
+# base_datos.bloquear_revisiones() para que los ids se confirmen en orden
+class CambioCalendario(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    creado = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    datos = db.Column(db.Text, nullable=False)
+
+    def __repr__(self):
+        return f'<Cambio {self.id}>'
+
+# Historial de solo agregado: una fila por celda modificada en cada revisión.
+# Nunca se actualiza ni se borra; CirujanosTurno guarda solo el estado actual
+class HistorialCelda(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    revision = db.Column(db.Integer, nullable=False)
+    mes = db.Column(db.Date, nullable=False)  # primer día del mes de `fecha`
+    fecha = db.Column(db.Date, nullable=False)
+    nombre_turno = db.Column(db.String(50), nullable=False)
+    cirujano1 = db.Column(db.String(100), nullable=False)
+    cirujano2 = db.Column(db.String(100), nullable=False)
+
+    __table_args__ = (db.Index('ix_historial_celda_mes_revision', 'mes', 'revision'),)
+
+# Estado completo de un mes en una revisión. Reconstruir un mes en el pasado
+# parte del punto de control anterior más cercano y aplica solo las filas de
+# HistorialCelda posteriores
+class PuntoControlMes(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    mes = db.Column(db.Date, nullable=False)
+    revision = db.Column(db.Integer, nullable=False)
+    datos = db.Column(db.Text, nullable=False)  # JSON: [[fecha, turno, cirujano1, cirujano2], ...]
+
+    __table_args__ = (db.Index('ix_punto_control_mes_revision', 'mes', 'revision'),)
+
+# Cambios acumulados en un mes a partir de los cuales se guarda un nuevo punto de control
+CAMBIOS_POR_PUNTO_CONTROL = 50
+
+# Hash del contenido de cada mes, actualizado en la misma transacción que
+# cada edición. Es el XOR de hash_celda() de todas sus celdas, así que se
+# actualiza sin releer el mes
+class HashMes(db.Model):
+    mes = db.Column(db.Date, primary_key=True)
+    hash = db.Column(db.BigInteger, nullable=False)
+    revision = db.Column(db.Integer, nullable=False)  # última revisión que tocó el mes
+
+# Con más celdas cambiadas que esto, /api/sync devuelve solo los meses
+LIMITE_CELDAS_SYNC = 500
+
+# Versión del esquema; incrementarla al agregar tablas para que
+# inicializar_db() las cree en las bases existentes
+VERSION_ESQUEMA = 4
+
+class VersionEsquema(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+
+def leer_version_esquema():
+    try:
+        return db.session.query(VersionEsquema.version).scalar()
+    except SQLAlchemyError:
+        # La tabla todavía no existe
+        db.session.rollback()
+        return None
+
+# Función para inicializar la base de datos con los datos por defecto.
+# Es idempotente y segura con varios workers: la comprobación rápida de la
+# versión evita el bloqueo cuando la base ya está lista, y el bloqueo
+# exclusivo garantiza que solo un proceso cree las tablas y las siembre.
+def inicializar_db():
+    if leer_version_esquema() == VERSION_ESQUEMA:
+        return
+
+    with bloqueo_exclusivo(db.engine):
+        # Otro proceso pudo terminar mientras esperábamos el bloqueo
+        if leer_version_esquema() == VERSION_ESQUEMA:
+            return
+
+        version_anterior = leer_version_esquema()
+        db.create_all()
+        # create_all no agrega índices nuevos a tablas que ya existían
+        for tabla in db.metadata.sorted_tables:
+            for indice in tabla.indexes:
+                indice.create(db.engine, checkfirst=True)
+
+        # Verificar si ya hay datos
+        if CirujanosTurno.query.first() is None:
+            sembrar_turnos(date(2025, 1, 1), date(2026, 12, 31))
+        if version_anterior is None or version_anterior < 2:
+            # El historial empieza aquí: punto de control de cada mes con el estado actual
+            crear_puntos_control_iniciales()
+        if version_anterior is None or version_anterior < 3:
+            crear_hashes_mes()
+
+        version = db.session.get(VersionEsquema, 1)
+        if version is None:
+            db.session.add(VersionEsquema(id=1, version=VERSION_ESQUEMA))
+        else:
+            version.version = VERSION_ESQUEMA
+        db.session.commit()
+
+def sembrar_turnos(desde, hasta):
+    # Crear registros con los cirujanos por defecto, en un solo INSERT masivo
+    # y en orden de fecha para que el resultado sea siempre el mismo
+    filas = []
+    for ordinal in range(desde.toordinal(), hasta.toordinal() + 1):
+        fecha = date.fromordinal(ordinal)
+        turno = get_turno_for_date(fecha, TURNOS)
+        if turno:
+            filas.append({
+                'fecha': fecha,
+                'nombre_turno': turno['nombre'],
+                'cirujano1': CIRUJANOS_POR_DEFECTO[turno['nombre']][0],
+                'cirujano2': CIRUJANOS_POR_DEFECTO[turno['nombre']][1]
+            })
+    db.session.execute(db.insert(CirujanosTurno), filas)
+
+def leer_cambios(desde_id):
+    cambios = CambioCalendario.query.filter(
+        CambioCalendario.id > desde_id
+    ).order_by(CambioCalendario.id).all()
+    return [(cambio.id, cambio.datos) for cambio in cambios]
+
+def leer_ultimo_id():
+    return db.session.query(db.func.max(CambioCalendario.id)).scalar() or 0
+
+def leer_filas_turnos(desde=None, hasta=None, cirujanos=None):
+    # Estado actual de los días como (fecha, turno, cirujano1, cirujano2);
+    # todos, o los del rango inclusive y con alguno de `cirujanos`
+    consulta = db.session.query(
+        CirujanosTurno.fecha,
+        CirujanosTurno.nombre_turno,
+        CirujanosTurno.cirujano1,
+        CirujanosTurno.cirujano2
+    )
+    if desde is not None:
+        consulta = consulta.filter(CirujanosTurno.fecha >= desde)
+    if hasta is not None:
+        consulta = consulta.filter(CirujanosTurno.fecha <= hasta)
+    if cirujanos is not None:
+        consulta = consulta.filter(db.or_(
+            CirujanosTurno.cirujano1.in_(cirujanos),
+            CirujanosTurno.cirujano2.in_(cirujanos)
+        ))
+    return consulta.order_by(CirujanosTurno.fecha).all()
+
+# --- Historial ---------------------------------------------------------------
+
+def crear_puntos_control_iniciales():
+    # Un punto de control por mes con el estado actual de CirujanosTurno
+    revision = leer_ultimo_id()
+    meses = {}
+    for turno in CirujanosTurno.query.order_by(CirujanosTurno.fecha):
+        meses.setdefault(turno.fecha.replace(day=1), []).append(
+            [turno.fecha.isoformat(), turno.nombre_turno, turno.cirujano1, turno.cirujano2])
+    if meses:
+        db.session.execute(db.insert(PuntoControlMes), [
+            {'mes': mes, 'revision': revision, 'datos': json.dumps(filas, ensure_ascii=False)}
+            for mes, filas in meses.items()
+        ])
+
+def revision_en(momento):
+    # Última revisión confirmada hasta `momento` (UTC, sin zona horaria)
+    return db.session.query(db.func.max(CambioCalendario.id)).filter(
+        CambioCalendario.creado <= momento
+    ).scalar() or 0
+
+def reconstruir_mes(mes, revision, fecha=None):
+    """
+    Estado de un mes tal como estaba en `revision`: diccionario
+    fecha -> (turno, cirujano1, cirujano2), o None si el historial empieza
+    después de esa revisión. Con `fecha` solo se aplican los cambios de ese día.
+    """
+    punto = PuntoControlMes.query.filter(
+        PuntoControlMes.mes == mes,
+        PuntoControlMes.revision <= revision
+    ).order_by(PuntoControlMes.revision.desc()).first()
+    if punto is None:
+        return None
+    estado = {date.fromisoformat(dia): tuple(resto) for dia, *resto in json.loads(punto.datos)}
+
+    cambios = db.session.query(
+        HistorialCelda.fecha,
+        HistorialCelda.nombre_turno,
+        HistorialCelda.cirujano1,
+        HistorialCelda.cirujano2
+    ).filter(
+        HistorialCelda.mes == mes,
+        HistorialCelda.revision > punto.revision,
+        HistorialCelda.revision <= revision
+    )
+    if fecha is not None:
+        cambios = cambios.filter(HistorialCelda.fecha == fecha)
+    for dia, nombre_turno, cirujano1, cirujano2 in cambios.order_by(HistorialCelda.id):
+        estado[dia] = (nombre_turno, cirujano1, cirujano2)
+    return estado
+
+def actualizar_puntos_control():
+    # Nuevo punto de control para los meses que acumularon suficientes
+    # cambios desde el último. Corre en segundo plano tras cada edición, de
+    # a un worker por vez para no guardar dos veces el mismo punto
+    with bloqueo_exclusivo(db.engine, CLAVE_BLOQUEO_PUNTOS_CONTROL, '.puntos_control.lock'):
+        ultimos = db.session.query(
+            PuntoControlMes.mes,
+            db.func.max(PuntoControlMes.revision).label('revision')
+        ).group_by(PuntoControlMes.mes).subquery()
+        pendientes = db.session.query(
+            HistorialCelda.mes,
+            db.func.max(HistorialCelda.revision)
+        ).join(ultimos, db.and_(
+            HistorialCelda.mes == ultimos.c.mes,
+            HistorialCelda.revision > ultimos.c.revision
+        )).group_by(HistorialCelda.mes).having(
+            db.func.count() >= CAMBIOS_POR_PUNTO_CONTROL
+        ).all()
+
+        for mes, revision in pendientes:
+            estado = reconstruir_mes(mes, revision)
+            db.session.add(PuntoControlMes(mes=mes, revision=revision, datos=json.dumps(
+                [[dia.isoformat(), *valores] for dia, valores in sorted(estado.items())],
+                ensure_ascii=False
+            )))
+        db.session.commit()
+
+# --- Sincronización incremental ----------------------------------------------
+
+def hash_celda(fecha, nombre_turno, cirujano1, cirujano2):
+    # 64 bits con signo, para que quepa en un BIGINT
+    texto = '\x1f'.join((fecha.isoformat(), nombre_turno, cirujano1, cirujano2))
+    return int.from_bytes(hashlib.blake2b(texto.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+def formatear_hash(valor):
+    return format(valor & 0xFFFFFFFFFFFFFFFF, '016x')
+
+def crear_hashes_mes():
+    revision = leer_ultimo_id()
+    hashes = {}
+    filas = db.session.query(
+        CirujanosTurno.fecha,
+        CirujanosTurno.nombre_turno,
+        CirujanosTurno.cirujano1,
+        CirujanosTurno.cirujano2
+    )
+    for fila in filas:
+        mes = fila.fecha.replace(day=1)
+        hashes[mes] = hashes.get(mes, 0) ^ hash_celda(*fila)
+    db.session.query(HashMes).delete()
+    if hashes:
+        db.session.execute(db.insert(HashMes), [
+            {'mes': mes, 'hash': valor, 'revision': revision} for mes, valor in hashes.items()
+        ])
+
+def actualizar_hashes_mes(anteriores, turnos, revision):
+    # anteriores: (fecha, turno, cirujano1, cirujano2) de cada turno antes de editarlo,
+    # leídos con bloquear_revisiones() ya tomado: si no, el delta parte de valores viejos
+    deltas = {}
+    for anterior, turno in zip(anteriores, turnos):
+        mes = turno.fecha.replace(day=1)
+        nuevo = hash_celda(turno.fecha, turno.nombre_turno, turno.cirujano1, turno.cirujano2)
+        deltas[mes] = deltas.get(mes, 0) ^ hash_celda(*anterior) ^ nuevo
+    for hash_mes in HashMes.query.filter(HashMes.mes.in_(list(deltas))):
+        hash_mes.hash ^= deltas[hash_mes.mes]
+        hash_mes.revision = revision
+
+# --- Calendario --------------------------------------------------------------
+
+def serializar_celda(turno_db):
+    # Representación JSON de una celda del calendario
+    return {
+        'fecha': turno_db.fecha.isoformat(),
+        'nombre': turno_db.nombre_turno,
+        'color': COLORES_TURNOS[turno_db.nombre_turno],
+        'cirujanos': [turno_db.cirujano1, turno_db.cirujano2]
+    }
+
+def generar_calendario(desde, hasta):
+    # Una sola consulta por rango (usa el índice de fecha)
+    turnos = CirujanosTurno.query.filter(
+        CirujanosTurno.fecha.between(desde, hasta)
+    ).all()
+    calendario = {}
+    for turno_db in turnos:
+        calendario[turno_db.fecha] = {
+            'nombre': turno_db.nombre_turno,
+            'color': COLORES_TURNOS[turno_db.nombre_turno],
+            'cirujanos': [turno_db.cirujano1, turno_db.cirujano2]
+        }
+    return calendario
+
+def generar_calendario_año(año):
+    return generar_calendario(date(año, 1, 1), date(año, 12, 31))
+
+def años_modificados(desde, hasta):
+    # Años tocados por los cambios registrados con id en (desde, hasta]
+    años = set()
+    cambios = db.session.query(CambioCalendario.datos).filter(
+        CambioCalendario.id > desde,
+        CambioCalendario.id <= hasta
+    )
+    for (datos,) in cambios:
+        años.update(int(celda['fecha'][:4]) for celda in json.loads(datos)['celdas'])
+    return años
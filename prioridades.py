@@ -0,0 +1,111 @@
+"""
+Resolución de asignaciones superpuestas por prioridad.
+
+Cada flujo es una fuente de asignaciones (un equipo, una regla, un
+reemplazo por vacaciones) que pertenece a una capa y tiene una prioridad.
+Dentro de una capa cada día queda con una sola asignación: la del flujo de
+menor número de prioridad; a igual prioridad gana el flujo que se pasó
+primero y, dentro de un flujo, la asignación que aparece primero. Las capas
+no compiten entre sí (un día puede tener a la vez un turno fijo y un
+volante). Todo lo que pierde queda registrado como anulado.
+
+Una asignación es (fecha, detalle) para un día o (desde, hasta, detalle)
+para un rango inclusive. Las fechas pueden ser date o datetime; se
+convierten a ordinales al entrar y vuelven a date al salir.
+
+Los flujos se ordenan por separado (timsort es lineal si ya vienen en
+orden, como los que generan los scripts de turnos) y se combinan con
+heapq.merge en un único barrido por fecha. Cada día solo se comparan las
+asignaciones activas en ese día, así que el costo crece linealmente con
+los días cubiertos.
+"""
+import heapq
+from datetime import date
+
+
+class Flujo:
+    """Asignaciones de una fuente, con su capa y su prioridad (menor gana)."""
+
+    __slots__ = ('nombre', 'asignaciones', 'capa', 'prioridad')
+
+    def __init__(self, nombre, asignaciones, capa='fijo', prioridad=0):
+        self.nombre = nombre
+        self.asignaciones = asignaciones
+        self.capa = capa
+        self.prioridad = prioridad
+
+
+class Resolucion:
+    """
+    Resultado de resolver():
+      por_dia: diccionario fecha -> {capa: (nombre del flujo, detalle)}
+      anuladas: lista de (fecha, capa, ganadora, anulada), con ganadora y
+          anulada como (nombre del flujo, detalle), en orden de fecha
+    """
+
+    __slots__ = ('por_dia', 'anuladas')
+
+    def __init__(self, por_dia, anuladas):
+        self.por_dia = por_dia
+        self.anuladas = anuladas
+
+    def capa(self, capa):
+        """Diccionario fecha -> (nombre del flujo, detalle) de una sola capa."""
+        return {fecha: capas[capa] for fecha, capas in self.por_dia.items() if capa in capas}
+
+
+def _intervalos(indice, flujo):
+    # (inicio, fin, prioridad, índice del flujo, secuencia, detalle) en orden de inicio
+    intervalos = []
+    for secuencia, asignacion in enumerate(flujo.asignaciones):
+        if len(asignacion) == 2:
+            fecha, detalle = asignacion
+            inicio = fin = fecha.toordinal()
+        else:
+            desde, hasta, detalle = asignacion
+            inicio, fin = desde.toordinal(), hasta.toordinal()
+            if fin < inicio:
+                raise ValueError(f'Rango vacío en {flujo.nombre}: {desde} a {hasta}')
+        intervalos.append((inicio, fin, flujo.prioridad, indice, secuencia, detalle))
+    intervalos.sort(key=lambda intervalo: intervalo[0])
+    return intervalos
+
+
+def resolver(flujos):
+    """Resuelve los flujos día por día y devuelve una Resolucion."""
+    flujos = list(flujos)
+    eventos = heapq.merge(
+        *(_intervalos(indice, flujo) for indice, flujo in enumerate(flujos)),
+        key=lambda intervalo: intervalo[0]
+    )
+    capas = [flujo.capa for flujo in flujos]
+    nombres = [flujo.nombre for flujo in flujos]
+
+    por_dia = {}
+    anuladas = []
+    activos = {}  # capa -> intervalos que todavía cubren días
+    siguiente = next(eventos, None)
+    dia = None
+    while siguiente is not None or any(activos.values()):
+        # Sin nada activo se salta directo al próximo inicio
+        dia = siguiente[0] if not any(activos.values()) else dia + 1
+        while siguiente is not None and siguiente[0] == dia:
+            activos.setdefault(capas[siguiente[3]], []).append(siguiente)
+            siguiente = next(eventos, None)
+
+        asignado = {}
+        for capa, intervalos in activos.items():
+            if not intervalos:
+                continue
+            # Prioridad, flujo y secuencia: el orden de la tupla es el desempate
+            ganador = min(intervalos, key=lambda intervalo: intervalo[2:5])
+            asignado[capa] = (nombres[ganador[3]], ganador[5])
+            if len(intervalos) > 1:
+                fecha = date.fromordinal(dia)
+                for intervalo in sorted(intervalos, key=lambda intervalo: intervalo[2:5]):
+                    if intervalo is not ganador:
+                        anuladas.append((fecha, capa, asignado[capa], (nombres[intervalo[3]], intervalo[5])))
+            # Los que terminan hoy dejan de estar activos
+            intervalos[:] = [intervalo for intervalo in intervalos if intervalo[1] > dia]
+        por_dia[date.fromordinal(dia)] = asignado
+    return Resolucion(por_dia, anuladas)
@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+
+from estaticos import brotli, comprimir
+from tareas import TareaAgrupada
+
+try:
+    import fcntl
+except ImportError:  # Windows: un solo proceso, no hace falta bloquear
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+
+class Publicador:
+    """
+    Mantiene en disco una copia ya renderizada del calendario.
+
+    Cada año se guarda como un fragmento HTML junto con la revisión de la
+    tabla de cambios hasta la que refleja los datos. Al publicar solo se
+    vuelven a renderizar los años tocados por cambios posteriores a esa
+    revisión, y la página completa se arma uniendo los fragmentos. Todo se
+    escribe en archivos temporales que se reemplazan con os.replace, así
+    que los lectores nunca ven una página a medias. Se guardan también las
+    versiones precomprimidas (.gz y .br).
+    """
+
+    def __init__(self, carpeta, años, renderizar_año, renderizar_pagina, leer_revision, años_modificados,
+                 adicionales=()):
+        """
+        carpeta: directorio donde se publican los archivos
+        años: años que forman la página principal
+        renderizar_año: función (año) -> (revisión, html de la sección)
+        renderizar_pagina: función (secciones, revisión) -> html completo
+        leer_revision: función () -> revisión actual de la tabla de cambios
+        años_modificados: función (desde, hasta) -> años tocados por los
+            cambios con revisión en (desde, hasta]
+        adicionales: funciones (escribir) que mantienen otros datos derivados
+            y corren en cada publicación, bajo el mismo bloqueo;
+            escribir(nombre, bytes) reemplaza un archivo atómicamente
+        """
+        self.carpeta = carpeta
+        self.años = tuple(años)
+        self.renderizar_año = renderizar_año
+        self.renderizar_pagina = renderizar_pagina
+        self.leer_revision = leer_revision
+        self.años_modificados = años_modificados
+        self.adicionales = tuple(adicionales)
+        self.tarea = TareaAgrupada(self._publicar_pendiente, 'publicador')
+
+    def ruta(self, nombre):
+        return os.path.join(self.carpeta, nombre)
+
+    def ruta_pagina(self, codificacion=None):
+        """Ruta del archivo publicado para la codificación dada, o None si no existe."""
+        nombre = 'index.html' + {None: '', 'gzip': '.gz', 'br': '.br'}[codificacion]
+        ruta = self.ruta(nombre)
+        return ruta if os.path.exists(ruta) else None
+
+    @contextmanager
+    def _bloqueo(self):
+        # Serializa las publicaciones de todos los workers: quien obtiene el
+        # bloqueo después lee la base después, así que nunca pisa datos nuevos
+        # con datos viejos
+        if fcntl is None:
+            yield
+            return
+        with open(self.ruta('.lock'), 'w') as archivo:
+            fcntl.flock(archivo, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(archivo, fcntl.LOCK_UN)
+
+    def _escribir(self, nombre, datos):
+        descriptor, temporal = tempfile.mkstemp(dir=self.carpeta, prefix='.' + nombre)
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(datos)
+        os.replace(temporal, self.ruta(nombre))
+
+    def _leer_revisiones(self):
+        try:
+            with open(self.ruta('revisiones.json'), encoding='utf-8') as f:
+                return {int(año): revision for año, revision in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+
+    def publicar(self, forzar=False):
+        """
+        Actualiza los fragmentos de los años con cambios y republica la página.
+        Con forzar=True renderiza todos los años (por ejemplo, al arrancar).
+        """
+        os.makedirs(self.carpeta, exist_ok=True)
+        with self._bloqueo():
+            revisiones = self._leer_revisiones()
+            actual = self.leer_revision()
+
+            if forzar or any(año not in revisiones for año in self.años):
+                afectados = set(self.años)
+            else:
+                afectados = self.años_modificados(min(revisiones.values()), actual)
+            if not afectados and all(revisiones[año] == actual for año in self.años):
+                return
+
+            for año in self.años:
+                if año in afectados:
+                    revisiones[año], html = self.renderizar_año(año)
+                    self._escribir(f'{año}.html', html.encode('utf-8'))
+                else:
+                    # Ningún cambio hasta `actual` tocó este año: el fragmento sigue vigente
+                    revisiones[año] = max(revisiones[año], actual)
+
+            secciones = []
+            for año in self.años:
+                with open(self.ruta(f'{año}.html'), encoding='utf-8') as f:
+                    secciones.append(f.read())
+            # La página se declara en la revisión más antigua de sus partes;
+            # el cliente pide a /eventos los cambios posteriores
+            pagina = self.renderizar_pagina(secciones, min(revisiones.values())).encode('utf-8')
+
+            self._escribir('index.html', pagina)
+            self._escribir('index.html.gz', comprimir(pagina, 'gzip'))
+            if brotli is not None:
+                self._escribir('index.html.br', comprimir(pagina, 'br'))
+            for adicional in self.adicionales:
+                adicional(self._escribir)
+            self._escribir('revisiones.json', json.dumps(
+                {str(año): revision for año, revision in revisiones.items()}).encode('utf-8'))
+
+    def publicar_en_segundo_plano(self):
+        """Encola una publicación; varias ediciones seguidas se agrupan en una sola."""
+        self.tarea.solicitar()
+
+    def _publicar_pendiente(self):
+        try:
+            self.publicar()
+        except Exception:
+            # GET / sigue sirviendo la versión anterior hasta la próxima publicación
+            log.exception('No se pudo publicar el calendario')
@@ -0,0 +1,168 @@
+"""
+Detección de consultas N+1.
+
+RegistroConsultas graba las sentencias SQL que ejecuta un hilo dentro de un
+bloque `with`; las de otros hilos (el publicador, el difusor) no cuentan,
+y con `motor` tampoco las de otros motores del proceso.
+El fixture de pytest `vigilante_consultas` agrupa las sentencias por
+petición Flask, marca las formas repetidas y hace fallar el test si una
+ruta supera su presupuesto en PRESUPUESTOS_CONSULTAS. tests/test_consultas.py
+lo usa con cada ruta presupuestada.
+"""
+import re
+import threading
+import time
+from collections import Counter
+
+from flask import request, request_finished, request_started
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import pytest
+except ImportError:  # pytest solo hace falta para el fixture
+    pytest = None
+
+# Máximo de sentencias SQL por petición, según la regla de la ruta
+PRESUPUESTOS_CONSULTAS = {
+    '/': 4,                          # sin página publicada: revisión y rango de cada año; publicada, ninguna
+    '/actualizar_cirujanos': 8,      # bloqueo de escritura (BEGIN IMMEDIATE o advisory lock), lectura, UPDATE,
+                                     # reglas de descanso, registro del cambio, historial y hashes (2)
+    '/eventos': 0,                   # la vista no consulta; el stream espera al difusor
+    '/metrics': 0,
+    '/api/historial': 3,             # revisión, punto de control y cambios posteriores
+    '/api/sync': 4,                  # revisión, meses, inicio del historial y celdas
+    '/api/turnos': 2,                # sin instantánea publicada: revisión y rango; publicada, ninguna
+    '/calendario/<int:anio>/<int:mes>': 2,  # revisión y una consulta por rango
+    '/calendario/<int:anio>': 2,
+    '/api/version': 1,               # solo la primera vez; después la da el difusor
+    '/api/guardia': 1,               # solo la primera vez, al cargar las excepciones
+}
+
+# A partir de cuántas repeticiones de la misma forma se considera un N+1
+UMBRAL_REPETICIONES = 5
+
+
+def forma_sentencia(sentencia):
+    """Normaliza una sentencia para agrupar las que solo difieren en literales."""
+    forma = re.sub(r"'(?:[^']|'')*'", '?', sentencia)
+    forma = re.sub(r'\b\d+\b', '?', forma)
+    return re.sub(r'\s+', ' ', forma).strip()
+
+
+class RegistroConsultas:
+    """
+    Graba las sentencias SQL que ejecuta el hilo que entra al bloque (o el
+    asignado a `hilo`) con `motor`, o con cualquier motor si no se indica.
+
+        with RegistroConsultas() as registro:
+            cliente.get('/')
+        assert registro.total <= 2
+    """
+
+    def __init__(self, motor=Engine):
+        self.motor = motor
+        self.sentencias = []  # (sentencia, duración en segundos, executemany)
+        self.hilo = None
+
+    def __enter__(self):
+        self.hilo = threading.get_ident()
+        event.listen(self.motor, 'before_cursor_execute', self._antes)
+        event.listen(self.motor, 'after_cursor_execute', self._despues)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.motor, 'before_cursor_execute', self._antes)
+        event.remove(self.motor, 'after_cursor_execute', self._despues)
+
+    def _antes(self, conn, cursor, statement, parameters, context, executemany):
+        # El inicio queda en el contexto de ejecución de la sentencia: si
+        # falla, no hay after_cursor_execute y no queda nada desparejado
+        if context is not None and threading.get_ident() == self.hilo:
+            context._registro_inicio = time.perf_counter()
+
+    def _despues(self, conn, cursor, statement, parameters, context, executemany):
+        inicio = getattr(context, '_registro_inicio', None)
+        if inicio is not None:
+            self.sentencias.append((statement, time.perf_counter() - inicio, executemany))
+
+    @property
+    def total(self):
+        return len(self.sentencias)
+
+    @property
+    def duracion(self):
+        return sum(duracion for _, duracion, _ in self.sentencias)
+
+    def formas_repetidas(self, umbral=UMBRAL_REPETICIONES):
+        """Formas de sentencia ejecutadas al menos `umbral` veces: candidatas a N+1."""
+        conteo = Counter(forma_sentencia(sentencia) for sentencia, _, _ in self.sentencias)
+        return {forma: veces for forma, veces in conteo.items() if veces >= umbral}
+
+    def reiniciar(self):
+        self.sentencias = []
+
+
+class VigilanteConsultas:
+    """
+    Registra las consultas de cada petición a una aplicación Flask y anota
+    las que superan el presupuesto de su ruta o repiten la misma forma.
+    Cuenta las del motor de la aplicación en el hilo que atiende la
+    petición, así que sirve para peticiones de a una, como las de
+    app.test_client().
+    """
+
+    def __init__(self, app, presupuestos=None, umbral=UMBRAL_REPETICIONES):
+        self.app = app
+        self.presupuestos = PRESUPUESTOS_CONSULTAS if presupuestos is None else presupuestos
+        self.umbral = umbral
+        with app.app_context():
+            motor = app.extensions['sqlalchemy'].engine
+        self.registro = RegistroConsultas(motor)
+        self.peticiones = []  # (ruta, cantidad de consultas)
+        self.problemas = []
+
+    def __enter__(self):
+        self.registro.__enter__()
+        request_started.connect(self._inicio_peticion, self.app)
+        request_finished.connect(self._fin_peticion, self.app)
+        return self
+
+    def __exit__(self, *exc):
+        request_started.disconnect(self._inicio_peticion, self.app)
+        request_finished.disconnect(self._fin_peticion, self.app)
+        self.registro.__exit__(*exc)
+
+    def _inicio_peticion(self, sender, **extra):
+        self.registro.reiniciar()
+        self.registro.hilo = threading.get_ident()
+
+    def _fin_peticion(self, sender, response, **extra):
+        ruta = request.url_rule.rule if request.url_rule else request.path
+        total = self.registro.total
+        self.peticiones.append((ruta, total))
+
+        presupuesto = self.presupuestos.get(ruta)
+        if presupuesto is not None and total > presupuesto:
+            self.problemas.append(
+                f'{request.method} {request.path}: {total} consultas, presupuesto {presupuesto}')
+        for forma, veces in self.registro.formas_repetidas(self.umbral).items():
+            self.problemas.append(
+                f'{request.method} {request.path}: posible N+1, {veces} veces: {forma}')
+
+    def verificar(self):
+        if self.problemas:
+            raise AssertionError('Consultas fuera de presupuesto:\n' + '\n'.join(self.problemas))
+
+
+if pytest is not None:
+    @pytest.fixture
+    def vigilante_consultas(app):
+        """
+        Requiere un fixture `app` con la aplicación Flask (por ejemplo
+        create_app({'PRECALENTAR': False})). Falla el test al terminar si
+        alguna petición superó su presupuesto de consultas.
+        """
+        with VigilanteConsultas(app) as vigilante:
+            yield vigilante
+        vigilante.verificar()
@@ -0,0 +1,236 @@
+"""
+Búsqueda de rotaciones válidas: exactamente un equipo de guardia por día.
+
+Cada plantilla describe el patrón de un equipo (el ciclo fijo de 6 semanas
+o el volante cada 6 días) y enumera sus variantes: todos los desfases y
+fases de inicio posibles. Como todos los patrones son periódicos, basta con
+revisar un período común (42 días para los turnos actuales): cada variante
+se representa como una máscara de bits de ese período y la búsqueda es un
+problema de cobertura exacta. Se cubre siempre el primer día libre, se
+descartan las variantes que chocan con lo ya asignado y se poda la rama en
+cuanto a algún equipo pendiente no le queda ninguna variante compatible.
+
+Las ramas del primer nivel se reparten entre procesos con
+ProcessPoolExecutor.
+
+Uso:
+    python resolver_rotacion.py
+    python resolver_rotacion.py --procesos 4 --limite 10
+"""
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+
+# Día 0 del período. Es lunes, así que el día de la semana del día i es i % 7
+REFERENCIA = date(2024, 12, 30)
+
+
+class PlantillaCiclo:
+    """
+    Patrón fijo de 6 semanas, con la misma regla que TurnoCiclo en rotacion.py:
+    semanas 1-3 en el día designado, semana 4 en el día designado y el
+    domingo, semana 5 el sábado y semana 6 el viernes.
+    """
+
+    periodo = 42
+
+    def __init__(self, nombre, dia_semana):
+        self.nombre = nombre
+        self.dia_semana = dia_semana  # 0=lunes
+
+    def de_guardia(self, i, alineacion, fase):
+        semana = ((i - alineacion) % self.periodo // 7 + fase) % 6 or 6
+        dia = i % 7
+        if semana <= 3:
+            return dia == self.dia_semana
+        elif semana == 4:
+            return dia == self.dia_semana or dia == 6
+        elif semana == 5:
+            return dia == 5
+        return dia == 4
+
+    def variantes(self, periodo):
+        """Itera (parámetros para TurnoCiclo, días de guardia en el período)."""
+        # Correr el inicio 7 días equivale a bajar una semana la fase, así
+        # que alcanza con alinear el ciclo dentro de la primera semana
+        for alineacion in range(7):
+            for fase in range(6):
+                dias = [i for i in range(periodo) if self.de_guardia(i, alineacion, fase)]
+                parametros = {
+                    'fecha_inicial': REFERENCIA + timedelta(days=alineacion),
+                    'semana_inicial': fase,
+                }
+                yield parametros, dias
+
+
+class PlantillaVolante:
+    """
+    Un día de guardia cada `periodo` días, como TurnoVolante. Cada variante
+    empieza en su primera guardia del período, así que la máscara coincide
+    con TurnoVolante (sin guardias antes de la fecha inicial) desde
+    REFERENCIA en adelante; antes de REFERENCIA la rotación no es exacta.
+    """
+
+    def __init__(self, nombre, periodo=6):
+        self.nombre = nombre
+        self.periodo = periodo
+
+    def variantes(self, periodo):
+        for desfase in range(self.periodo):
+            dias = list(range(desfase, periodo, self.periodo))
+            yield {'fecha_inicial': REFERENCIA + timedelta(days=desfase)}, dias
+
+
+# Los equipos actuales
+PLANTILLAS = (
+    PlantillaCiclo('Turno lunes', 0),
+    PlantillaCiclo('Turno martes', 1),
+    PlantillaCiclo('Turno miércoles', 2),
+    PlantillaCiclo('Turno jueves', 3),
+    PlantillaVolante('Volante 1'),
+    PlantillaVolante('Volante 2'),
+)
+
+
+def periodo_comun(plantillas):
+    periodo = 7  # los patrones dependen del día de la semana
+    for plantilla in plantillas:
+        periodo = periodo * plantilla.periodo // math.gcd(periodo, plantilla.periodo)
+    return periodo
+
+
+def candidatos(plantilla, periodo):
+    """Lista de (máscara, parámetros) sin variantes repetidas."""
+    vistas = {}
+    for parametros, dias in plantilla.variantes(periodo):
+        mascara = 0
+        for i in dias:
+            mascara |= 1 << i
+        vistas.setdefault(mascara, parametros)
+    return list(vistas.items())
+
+
+# --- Búsqueda -----------------------------------------------------------------
+#
+# Los candidatos se cargan una vez por proceso (initializer) y cada tarea
+# recibe solo la elección del primer nivel. Una solución es una tupla con el
+# índice de la variante elegida para cada plantilla.
+
+_candidatos = None
+_completo = None
+
+
+def _iniciar(mascaras, periodo):
+    global _candidatos, _completo
+    _candidatos = mascaras
+    _completo = (1 << periodo) - 1
+
+
+def _buscar(cubierto, disponibles, elegidos, soluciones, limite):
+    if cubierto == _completo:
+        # Con la suma de días verificada de antemano, solo se llega aquí
+        # con todas las plantillas asignadas
+        soluciones.append(tuple(elegidos))
+        return
+    libre = ~cubierto & (cubierto + 1)  # bit del primer día sin cubrir
+    for k, opciones in disponibles.items():
+        for j in opciones:
+            mascara = _candidatos[k][j]
+            if not mascara & libre:
+                continue
+            nuevo = cubierto | mascara
+            resto = {}
+            for otro, suyas in disponibles.items():
+                if otro == k:
+                    continue
+                compatibles = [i for i in suyas if not _candidatos[otro][i] & nuevo]
+                if not compatibles:
+                    break
+                resto[otro] = compatibles
+            else:
+                elegidos[k] = j
+                _buscar(nuevo, resto, elegidos, soluciones, limite)
+                elegidos[k] = None
+                if limite is not None and len(soluciones) >= limite:
+                    return
+
+
+def _explorar_rama(rama, limite=None):
+    """Soluciones cuyo primer día lo cubre la variante j de la plantilla k."""
+    k, j = rama
+    mascara = _candidatos[k][j]
+    disponibles = {}
+    for otro, mascaras in enumerate(_candidatos):
+        if otro == k:
+            continue
+        disponibles[otro] = [i for i, m in enumerate(mascaras) if not m & mascara]
+        if not disponibles[otro]:
+            return []
+    elegidos = [None] * len(_candidatos)
+    elegidos[k] = j
+    soluciones = []
+    _buscar(mascara, disponibles, elegidos, soluciones, limite)
+    return soluciones
+
+
+def resolver(plantillas=PLANTILLAS, procesos=None, limite=None):
+    """
+    Devuelve las rotaciones válidas: listas de (nombre, parámetros), una por
+    plantilla. procesos=1 busca en este proceso; None usa todos los núcleos.
+    """
+    periodo = periodo_comun(plantillas)
+    listas = [candidatos(plantilla, periodo) for plantilla in plantillas]
+    mascaras = [[mascara for mascara, _ in lista] for lista in listas]
+    if sum(bin(lista[0]).count('1') for lista in mascaras) != periodo or any(
+            len({bin(m).count('1') for m in lista}) != 1 for lista in mascaras):
+        # Sin esto la búsqueda podría cubrir el período dejando equipos sin asignar
+        raise ValueError('Los días de guardia de las plantillas no suman exactamente un período')
+
+    ramas = [(k, j) for k, lista in enumerate(mascaras) for j, m in enumerate(lista) if m & 1]
+    encontradas = []
+    if procesos == 1:
+        _iniciar(mascaras, periodo)
+        for rama in ramas:
+            encontradas.extend(_explorar_rama(rama, limite))
+            if limite is not None and len(encontradas) >= limite:
+                break
+    else:
+        with ProcessPoolExecutor(procesos, initializer=_iniciar, initargs=(mascaras, periodo)) as ejecutor:
+            futuros = [ejecutor.submit(_explorar_rama, rama, limite) for rama in ramas]
+            for futuro in as_completed(futuros):
+                encontradas.extend(futuro.result())
+                if limite is not None and len(encontradas) >= limite:
+                    for pendiente in futuros:
+                        pendiente.cancel()
+                    break
+
+    encontradas.sort()  # el orden no depende de qué proceso terminó primero
+    if limite is not None:
+        encontradas = encontradas[:limite]
+    return [
+        [(plantilla.nombre, lista[j][1]) for plantilla, lista, j in zip(plantillas, listas, solucion)]
+        for solucion in encontradas
+    ]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--procesos', type=int, default=os.cpu_count(),
+                        help='procesos de búsqueda (1 = sin pool)')
+    parser.add_argument('--limite', type=int, help='detenerse tras encontrar N rotaciones')
+    parser.add_argument('--mostrar', type=int, default=5, help='rotaciones a imprimir')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    rotaciones = resolver(procesos=args.procesos, limite=args.limite)
+    duracion = time.perf_counter() - inicio
+    print(f'{len(rotaciones)} rotaciones válidas (período de {periodo_comun(PLANTILLAS)} días) '
+          f'en {duracion:.2f} s con {args.procesos} procesos')
+    for numero, rotacion in enumerate(rotaciones[:args.mostrar], start=1):
+        print(f'\nRotación {numero}:')
+        for nombre, parametros in rotacion:
+            detalle = ', '.join(f'{clave}={valor}' for clave, valor in parametros.items())
+            print(f'  {nombre}: {detalle}')
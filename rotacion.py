@@ -0,0 +1,141 @@
+"""
+Motor de rotación: qué equipo está de guardia cada día según TURNOS.
+
+No depende de Flask ni de la base de datos, así que los scripts y los
+benchmarks que solo necesitan la rotación lo importan sin el costo de la
+aplicación web.
+"""
+from datetime import date
+
+from instantanea import InstantaneaRotacion
+
+# Los motores trabajan con ordinales (date.toordinal()): sin isinstance ni
+# timedelta por consulta. date.fromordinal(1) es lunes, así que el día de la
+# semana de un ordinal es (ordinal - 1) % 7. Las fechas (date o datetime)
+# solo se aceptan en el constructor y en get_turno_para_fecha.
+DIAS_TURNO = {
+    "Turno lunes": 0,
+    "Turno martes": 1,
+    "Turno miércoles": 2,
+    "Turno jueves": 3
+}
+
+class TurnoCiclo:
+    __slots__ = ('nombre', 'color', 'ordinal_inicial', 'semana_inicial', 'dia_turno')
+
+    ciclo_dias = 42  # 6 semanas
+
+    def __init__(self, nombre, color, fecha_inicial, semana_inicial):
+        self.nombre = nombre
+        self.color = color
+        self.ordinal_inicial = fecha_inicial.toordinal()
+        self.semana_inicial = semana_inicial
+        self.dia_turno = DIAS_TURNO[nombre]
+
+    @property
+    def fecha_inicial(self):
+        return date.fromordinal(self.ordinal_inicial)
+
+    def get_turno_para_fecha(self, fecha):
+        return self.de_guardia(fecha.toordinal())
+
+    def de_guardia(self, ordinal):
+        dia_en_ciclo = (ordinal - self.ordinal_inicial) % 42
+        semana_en_ciclo = (dia_en_ciclo // 7 + self.semana_inicial) % 6 or 6
+        dia_semana = (ordinal - 1) % 7
+
+        if semana_en_ciclo <= 3:
+            return dia_semana == self.dia_turno
+        elif semana_en_ciclo == 4:
+            return dia_semana == self.dia_turno or dia_semana == 6
+        elif semana_en_ciclo == 5:
+            return dia_semana == 5
+        else:  # semana_en_ciclo == 6
+            return dia_semana == 4
+
+class TurnoVolante:
+    __slots__ = ('nombre', 'color', 'ordinal_inicial')
+
+    periodo = 6
+
+    def __init__(self, nombre, color, fecha_inicial):
+        self.nombre = nombre
+        self.color = color
+        self.ordinal_inicial = fecha_inicial.toordinal()
+
+    @property
+    def fecha_inicial(self):
+        return date.fromordinal(self.ordinal_inicial)
+
+    def get_turno_para_fecha(self, fecha):
+        return self.de_guardia(fecha.toordinal())
+
+    def de_guardia(self, ordinal):
+        # Sin guardias antes de la fecha inicial
+        dias = ordinal - self.ordinal_inicial
+        return dias >= 0 and dias % 6 == 0
+
+# Configuración de turnos con fechas consistentes
+TURNOS = {
+    "Turno miércoles": TurnoCiclo("Turno miércoles", "lightblue", date(2025, 1, 1), 3),
+    "Turno jueves": TurnoCiclo("Turno jueves", "plum", date(2025, 1, 2), 4),
+    "Volante 1": TurnoVolante("Volante 1", "khaki", date(2025, 1, 3)),
+    "Volante 2": TurnoVolante("Volante 2", "salmon", date(2025, 1, 4)),
+    "Turno lunes": TurnoCiclo("Turno lunes", "pink", date(2025, 1, 6), 2),
+    "Turno martes": TurnoCiclo("Turno martes", "lightgreen", date(2025, 1, 7), 3)
+}
+
+# Datos iniciales de cirujanos por turno
+CIRUJANOS_POR_DEFECTO = {
+    "Turno miércoles": ["Dr. Pérez", "Dr. González"],
+    "Turno jueves": ["Dr. Rodríguez", "Dr. Sánchez"],
+    "Volante 1": ["Dr. López", "Dr. Martínez"],
+    "Volante 2": ["Dr. García", "Dr. Torres"],
+    "Turno lunes": ["Dr. Díaz", "Dr. Ruiz"],
+    "Turno martes": ["Dr. Morales", "Dr. Castro"]
+}
+
+# Diccionario de colores para los turnos
+COLORES_TURNOS = {nombre: turno.color for nombre, turno in TURNOS.items()}
+
+# Rango cubierto por la tabla de rotación precalculada
+INICIO_INSTANTANEA = date(2025, 1, 1)
+FIN_INSTANTANEA = date(2035, 12, 31)
+_instantanea = None
+
+def obtener_instantanea():
+    # Se construye una sola vez por proceso; con --preload, en el maestro
+    global _instantanea
+    if _instantanea is None:
+        _instantanea = InstantaneaRotacion.construir(
+            TURNOS, CIRUJANOS_POR_DEFECTO, INICIO_INSTANTANEA, FIN_INSTANTANEA
+        )
+    return _instantanea
+
+def get_turno_for_date(fecha, turnos):
+    fecha = fecha if isinstance(fecha, date) else fecha.date()
+
+    if turnos is TURNOS:
+        instantanea = obtener_instantanea()
+        if fecha in instantanea:
+            return instantanea.turno(fecha)
+
+    for turno_name, turno in turnos.items():
+        if turno.get_turno_para_fecha(fecha):
+            return {"nombre": turno.nombre, "color": turno.color}
+    return None
+
+def turno_rotacion(fecha):
+    # Celda según la rotación, con los cirujanos por defecto
+    instantanea = obtener_instantanea()
+    if fecha in instantanea:
+        return instantanea.celda(fecha)
+
+    turno = get_turno_for_date(fecha, TURNOS)
+    if not turno:
+        return None
+    return {
+        'nombre': turno['nombre'],
+        'color': turno['color'],
+        'cirujanos': list(CIRUJANOS_POR_DEFECTO[turno['nombre']])
+    }
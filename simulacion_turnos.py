@@ -1,7 +1,10 @@
-from datetime import date, timedelta
+from datetime import date
 
-# Clase que mantiene el estado de cada equipo
+# Clase que mantiene el estado de cada equipo. Las fechas se guardan como
+# ordinales (date.toordinal()) para no crear fechas ni timedelta por día
 class TeamState:
+    __slots__ = ('name', 'cycle_ordinal', 'pattern', 'cycle_length', 'index', 'next_ordinal')
+
     def __init__(self, name, cycle_start, pattern, cycle_length):
         """
         name: nombre del turno (p.ej., "Turno lunes")
@@ -10,66 +13,82 @@ class TeamState:
         cycle_length: duración total del ciclo (en días)
         """
         self.name = name
-        self.cycle_start = cycle_start
-        self.pattern = pattern
+        self.cycle_ordinal = cycle_start.toordinal()
+        self.pattern = tuple(pattern)
         self.cycle_length = cycle_length
         self.index = 0  # índice del offset actual
+        self.next_ordinal = self.cycle_ordinal + self.pattern[0]
+
+    @property
+    def cycle_start(self):
+        return date.fromordinal(self.cycle_ordinal)
 
     def next_date(self):
         # Devuelve la fecha de la próxima asignación para este equipo
-        return self.cycle_start + timedelta(days=self.pattern[self.index])
+        return date.fromordinal(self.next_ordinal)
 
     def update(self):
         # Se asignó el turno en la fecha actual; se avanza en el ciclo
         self.index += 1
         if self.index >= len(self.pattern):
-            self.cycle_start = self.cycle_start + timedelta(days=self.cycle_length)
+            self.cycle_ordinal += self.cycle_length
             self.index = 0
+        self.next_ordinal = self.cycle_ordinal + self.pattern[self.index]
 
-# Inicializamos los estados usando los datos reales de febrero 2025
-# Separamos los equipos fijos y los volantes
+def crear_equipos():
+    """
+    Estados iniciales usando los datos reales de febrero 2025.
+    Devuelve (equipos fijos, equipos volantes).
+    """
+    # Equipos fijos
+    teams_fixed = []
+    teams_fixed.append(TeamState("Turno lunes", date(2025, 2, 1), [0, 6, 9, 16, 23], 30))
+    teams_fixed.append(TeamState("Turno martes", date(2025, 2, 4), [0, 7, 14, 21, 26], 31))
+    teams_fixed.append(TeamState("Turno miércoles", date(2025, 2, 5), [0, 7, 14, 18], 24))
+    teams_fixed.append(TeamState("Turno jueves", date(2025, 2, 6), [0, 7, 10, 16, 22], 28))
 
-# Equipos fijos
-teams_fixed = []
-teams_fixed.append(TeamState("Turno lunes", date(2025, 2, 1), [0, 6, 9, 16, 23], 30))
-teams_fixed.append(TeamState("Turno martes", date(2025, 2, 4), [0, 7, 14, 21, 26], 31))
-teams_fixed.append(TeamState("Turno miércoles", date(2025, 2, 5), [0, 7, 14, 18], 24))
-teams_fixed.append(TeamState("Turno jueves", date(2025, 2, 6), [0, 7, 10, 16, 22], 28))
+    # Equipos volantes
+    teams_volante = []
+    teams_volante.append(TeamState("Volante 1", date(2025, 2, 2), [0], 6))
+    teams_volante.append(TeamState("Volante 2", date(2025, 2, 3), [0], 6))
+    return teams_fixed, teams_volante
 
-# Equipos volantes
-teams_volante = []
-teams_volante.append(TeamState("Volante 1", date(2025, 2, 2), [0], 6))
-teams_volante.append(TeamState("Volante 2", date(2025, 2, 3), [0], 6))
+def simular(teams_fixed, teams_volante, start_day, end_day, estricto=True):
+    """
+    Recorre los días de start_day a end_day asignando un equipo por día.
+    Con estricto=True lanza una excepción ante un conflicto o un día sin
+    asignación; si no, deja el primer equipo asignado (o None) y sigue.
+    """
+    schedule = {}
 
-# Definimos el rango de simulación: del 1 de febrero al 31 de diciembre de 2025
-start_day = date(2025, 2, 1)
-end_day = date(2025, 12, 31)
-schedule = {}
+    for ordinal in range(start_day.toordinal(), end_day.toordinal() + 1):
+        assigned_team = None
+        # Primero, consultamos los turnos fijos:
+        for team in teams_fixed:
+            if team.next_ordinal == ordinal:
+                if assigned_team is not None and estricto:
+                    raise Exception(f"Conflict on {date.fromordinal(ordinal)} among fixed teams: already assigned {assigned_team} and trying to assign {team.name}")
+                assigned_team = assigned_team or team.name
+                team.update()  # actualizamos el estado del equipo asignado
+        # Si no hay asignación fija, consultamos los volantes:
+        if assigned_team is None:
+            for team in teams_volante:
+                if team.next_ordinal == ordinal:
+                    if assigned_team is not None and estricto:
+                        raise Exception(f"Conflict on {date.fromordinal(ordinal)} among volantes: already assigned {assigned_team} and trying to assign {team.name}")
+                    assigned_team = assigned_team or team.name
+                    team.update()
+        if assigned_team is None and estricto:
+            raise Exception(f"No assignment for {date.fromordinal(ordinal)}")
+        schedule[date.fromordinal(ordinal)] = assigned_team
+    return schedule
 
-current_day = start_day
-while current_day <= end_day:
-    assigned_team = None
-    # Primero, consultamos los turnos fijos:
-    for team in teams_fixed:
-        if team.next_date() == current_day:
-            if assigned_team is not None:
-                raise Exception(f"Conflict on {current_day} among fixed teams: already assigned {assigned_team} and trying to assign {team.name}")
-            assigned_team = team.name
-            team.update()  # actualizamos el estado del equipo asignado
-    # Si no hay asignación fija, consultamos los volantes:
-    if assigned_team is None:
-        for team in teams_volante:
-            if team.next_date() == current_day:
-                if assigned_team is not None:
-                    raise Exception(f"Conflict on {current_day} among volantes: already assigned {assigned_team} and trying to assign {team.name}")
-                assigned_team = team.name
-                team.update()
-    if assigned_team is None:
-        raise Exception(f"No assignment for {current_day}")
-    schedule[current_day] = assigned_team
-    current_day += timedelta(days=1)
+if __name__ == "__main__":
+    teams_fixed, teams_volante = crear_equipos()
+    # Definimos el rango de simulación: del 1 de febrero al 31 de diciembre de 2025
+    schedule = simular(teams_fixed, teams_volante, date(2025, 2, 1), date(2025, 12, 31))
 
-# Imprimimos el calendario final ordenado por fecha
-print("Calendario de turnos 2025 (del 1 de febrero al 31 de diciembre):")
-for day in sorted(schedule.keys()):
-    print(f"{day}: {schedule[day]}")
+    # Imprimimos el calendario final ordenado por fecha
+    print("Calendario de turnos 2025 (del 1 de febrero al 31 de diciembre):")
+    for day in sorted(schedule.keys()):
+        print(f"{day}: {schedule[day]}")
@@ -0,0 +1,213 @@
+const modal = document.getElementById('editModal');
+const span = document.getElementsByClassName('close')[0];
+
+function editarTurno(fecha, cirujano1, cirujano2, nombreTurno) {
+    const [year, month, day] = fecha.split('-');
+    const fechaObj = new Date(year, month - 1, day);
+    const fechaFormateada = fechaObj.toLocaleDateString('es-ES', {
+        day: '2-digit',
+        month: 'long',
+        year: 'numeric'
+    });
+
+    document.getElementById('fechaTurno').value = fecha;
+    document.getElementById('fechaMostrada').value = fechaFormateada;
+    document.getElementById('cirujano1').value = cirujano1;
+    document.getElementById('cirujano2').value = cirujano2;
+    document.getElementById('nombreTurno').value = nombreTurno;
+    document.getElementById('aplicarFuturo').checked = false;
+    modal.style.display = "block";
+}
+
+function guardarCambios() {
+    const edicion = {
+        fecha: document.getElementById('fechaTurno').value,
+        cirujano1: document.getElementById('cirujano1').value,
+        cirujano2: document.getElementById('cirujano2').value,
+        nombreTurno: document.getElementById('nombreTurno').value,
+        aplicarFuturo: document.getElementById('aplicarFuturo').checked
+    };
+
+    if (navigator.onLine) {
+        enviarEdicion(edicion).catch(() => encolarEdicion(edicion));
+    } else {
+        encolarEdicion(edicion);
+    }
+
+    modal.style.display = "none";
+}
+
+// Resuelve true si la edición se guardó y false si el servidor la rechazó
+// (o el usuario no quiso forzarla); solo falla si no hubo respuesta, que es
+// el único caso en que tiene sentido reintentar
+function enviarEdicion(edicion) {
+    return fetch('/actualizar_cirujanos', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(edicion)
+    })
+    .then(response => response.json().catch(() => ({
+        // Un error 500 o una página del proxy: reintentar no lo arregla
+        success: false,
+        error: 'el servidor respondió ' + response.status
+    })))
+    .then(data => {
+        if(data.success) {
+            data.celdas.forEach(actualizarCelda);
+            return true;
+        }
+        if (data.infracciones) {
+            // Reglas de descanso: se muestran y se puede guardar igual
+            const detalle = data.infracciones.map(infraccion => infraccion.descripcion).join('\n');
+            if (confirm(data.error + ':\n' + detalle + '\n\n¿Guardar de todos modos?')) {
+                return enviarEdicion(Object.assign({}, edicion, {forzar: true}));
+            }
+        } else {
+            alert('Error al guardar los cambios del ' + edicion.fecha + ': ' + data.error);
+        }
+        return false;
+    });
+}
+
+// Ediciones hechas sin conexión: se guardan en orden y se envían por la
+// misma ruta al recuperarla
+const COLA_EDICIONES = 'colaEdiciones';
+
+function leerCola() {
+    return JSON.parse(localStorage.getItem(COLA_EDICIONES) || '[]');
+}
+
+function encolarEdicion(edicion) {
+    const cola = leerCola();
+    cola.push(edicion);
+    localStorage.setItem(COLA_EDICIONES, JSON.stringify(cola));
+    aplicarLocalmente(edicion);
+}
+
+function reproducirCola() {
+    const cola = leerCola();
+    if (cola.length === 0 || !navigator.onLine) {
+        return;
+    }
+    // Se quita de la cola solo cuando el servidor respondió; sin respuesta
+    // queda para el próximo evento online
+    enviarEdicion(cola[0]).then(function(guardada) {
+        localStorage.setItem(COLA_EDICIONES, JSON.stringify(leerCola().slice(1)));
+        if (guardada) {
+            return;
+        }
+        // Rechazada: las celdas vuelven a lo que tiene el servidor, con las
+        // ediciones que siguen en cola aplicadas encima
+        return restaurarCeldas(cola[0]).then(function() {
+            leerCola().forEach(aplicarLocalmente);
+        });
+    }).then(reproducirCola, function() {});
+}
+
+// Meses de la página que pudo tocar una edición
+function mesesDeEdicion(edicion) {
+    const mes = edicion.fecha.slice(0, 7);
+    if (!edicion.aplicarFuturo) {
+        return [mes];
+    }
+    const meses = new Set();
+    document.querySelectorAll('.dia[id]').forEach(function(dia) {
+        const mesDia = dia.id.slice(1, 8);
+        if (mesDia >= mes) {
+            meses.add(mesDia);
+        }
+    });
+    return Array.from(meses);
+}
+
+function restaurarCeldas(edicion) {
+    return Promise.all(mesesDeEdicion(edicion).map(function(mes) {
+        return fetch('/api/historial?mes=' + mes)
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    data.celdas.forEach(actualizarCelda);
+                }
+            });
+    }));
+}
+
+// Muestra una edición pendiente con el mismo criterio que el servidor:
+// la fecha elegida o, con cambio definitivo, todos los turnos iguales desde ahí
+function aplicarLocalmente(edicion) {
+    document.querySelectorAll('.dia[id]').forEach(function(dia) {
+        const fecha = dia.id.slice(1);
+        const info = dia.querySelector('.turno-info');
+        if (!info) {
+            return;
+        }
+        const coincide = edicion.aplicarFuturo
+            ? fecha >= edicion.fecha && info.firstChild.textContent === edicion.nombreTurno
+            : fecha === edicion.fecha;
+        if (coincide) {
+            actualizarCelda({
+                fecha: fecha,
+                nombre: info.firstChild.textContent,
+                color: info.style.background,
+                cirujanos: [edicion.cirujano1, edicion.cirujano2]
+            });
+            dia.classList.add('pendiente');
+        }
+    });
+}
+
+// Actualiza en el DOM una celda devuelta por el servidor
+function actualizarCelda(celda) {
+    const dia = document.getElementById('d' + celda.fecha);
+    if (!dia) {
+        return;  // La fecha no está en la página actual
+    }
+    const info = dia.querySelector('.turno-info');
+    const [cirujano1, cirujano2] = info.querySelectorAll('.cirujanos > div');
+    dia.classList.remove('pendiente');
+    info.style.background = celda.color;
+    info.firstChild.textContent = celda.nombre;
+    cirujano1.textContent = celda.cirujanos[0];
+    cirujano2.textContent = celda.cirujanos[1];
+}
+
+// Un solo listener para todas las celdas: los datos se leen de la celda clicada
+document.querySelector('.calendar-container').addEventListener('click', function(event) {
+    const info = event.target.closest('.turno-info');
+    if (!info) {
+        return;
+    }
+    const [cirujano1, cirujano2] = info.querySelectorAll('.cirujanos > div');
+    editarTurno(
+        info.parentElement.id.slice(1),
+        cirujano1.textContent,
+        cirujano2.textContent,
+        info.firstChild.textContent
+    );
+});
+
+function cerrarModal() {
+    modal.style.display = "none";
+}
+
+// Cambios hechos por otros coordinadores, recibidos en vivo
+const eventos = new EventSource('/eventos?desde=' + document.body.dataset.revision);
+eventos.addEventListener('cambio', function(event) {
+    JSON.parse(event.data).celdas.forEach(actualizarCelda);
+});
+
+window.addEventListener('online', reproducirCola);
+reproducirCola();
+
+if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.register('/sw.js');
+}
+
+span.onclick = cerrarModal;
+window.onclick = function(event) {
+    if (event.target == modal) {
+        cerrarModal();
+    }
+}
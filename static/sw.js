@@ -0,0 +1,87 @@
+// Service worker del calendario. Lo sirve la ruta /sw.js, que completa las
+// dos constantes siguientes con las URLs con hash de los recursos y un hash
+// de esas URLs (ver generar_service_worker en app.py)
+const RECURSOS = __RECURSOS__;
+const CACHE_RECURSOS = 'recursos-' + __VERSION__;
+// Las páginas y las respuestas de /api/ sobreviven a los cambios de versión
+const CACHE_DATOS = 'datos';
+const REVISION = '/__revision__';  // revisión de la página guardada
+
+self.addEventListener('install', function(event) {
+    event.waitUntil(Promise.all([
+        caches.open(CACHE_RECURSOS).then(cache => cache.addAll(RECURSOS)),
+        guardarPagina()
+    ]).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', function(event) {
+    event.waitUntil(caches.keys().then(nombres => Promise.all(
+        nombres
+            .filter(nombre => nombre !== CACHE_RECURSOS && nombre !== CACHE_DATOS)
+            .map(nombre => caches.delete(nombre))
+    )).then(() => self.clients.claim()));
+});
+
+self.addEventListener('fetch', function(event) {
+    const url = new URL(event.request.url);
+    if (event.request.method !== 'GET' || url.origin !== location.origin || url.pathname === '/eventos') {
+        return;  // ediciones y SSE van siempre a la red
+    }
+    if (event.request.mode === 'navigate' && url.pathname === '/') {
+        event.respondWith(servirPagina(event));
+    } else if (RECURSOS.includes(url.pathname)) {
+        // Con hash en el nombre: lo guardado nunca queda viejo
+        event.respondWith(caches.match(event.request).then(guardada => guardada || fetch(event.request)));
+    } else if (url.pathname.startsWith('/api/') || url.pathname.startsWith('/calendario')) {
+        event.respondWith(redPrimero(event.request));
+    }
+});
+
+// La página guardada se muestra al instante; en segundo plano se compara su
+// revisión con /api/version y se descarga de nuevo solo si hubo cambios.
+// Los cambios que falten en una página vieja llegan igual por /eventos
+function servirPagina(event) {
+    return caches.open(CACHE_DATOS).then(cache => cache.match('/').then(function(guardada) {
+        if (!guardada) {
+            return fetch(event.request);
+        }
+        event.waitUntil(revalidarPagina(cache));
+        return guardada;
+    }));
+}
+
+function revalidarPagina(cache) {
+    return Promise.all([
+        fetch('/api/version', {cache: 'no-store'}).then(respuesta => respuesta.json()),
+        cache.match(REVISION).then(respuesta => respuesta ? respuesta.text() : '-1')
+    ]).then(function([version, revision]) {
+        if (version.revision > Number(revision)) {
+            return guardarPagina();
+        }
+    }).catch(() => {});  // sin conexión: se sigue usando la guardada
+}
+
+function guardarPagina() {
+    return fetch('/', {cache: 'no-cache'}).then(function(respuesta) {
+        if (!respuesta.ok) {
+            return;
+        }
+        return respuesta.clone().text().then(function(html) {
+            const revision = /data-revision="(\d+)"/.exec(html);
+            return caches.open(CACHE_DATOS).then(cache => Promise.all([
+                cache.put('/', respuesta),
+                cache.put(REVISION, new Response(revision ? revision[1] : '0'))
+            ]));
+        });
+    });
+}
+
+function redPrimero(request) {
+    return fetch(request).then(function(respuesta) {
+        if (respuesta.ok) {
+            const copia = respuesta.clone();
+            caches.open(CACHE_DATOS).then(cache => cache.put(request, copia));
+        }
+        return respuesta;
+    }).catch(() => caches.match(request).then(guardada => guardada || Response.error()));
+}
@@ -0,0 +1,49 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+
+class TareaAgrupada:
+    """
+    Corre una función en un hilo propio cada vez que se pide, agrupando los
+    pedidos: si llegan varios mientras la función espera turno, corre una
+    sola vez más. El hilo se crea con el primer pedido, ya dentro del worker
+    (el proceso maestro de gunicorn no debe tener hilos).
+    """
+
+    def __init__(self, funcion, nombre):
+        """
+        funcion: función sin argumentos; sus excepciones se registran en el log
+        nombre: prefijo del nombre del hilo y del mensaje de error
+        """
+        self.funcion = funcion
+        self.nombre = nombre
+        self.pendiente = False
+        self.lock = threading.Lock()
+        self.ejecutor = None
+
+    def solicitar(self):
+        with self.lock:
+            if self.pendiente:
+                return
+            self.pendiente = True
+            if self.ejecutor is None:
+                self.ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.nombre)
+        self.ejecutor.submit(self._ejecutar)
+
+    def esperar(self):
+        """Espera a que terminen los pedidos en curso (al cerrar la aplicación o en los tests)."""
+        with self.lock:
+            ejecutor, self.ejecutor = self.ejecutor, None
+        if ejecutor is not None:
+            ejecutor.shutdown(wait=True)
+
+    def _ejecutar(self):
+        with self.lock:
+            self.pendiente = False
+        try:
+            self.funcion()
+        except Exception:
+            log.exception('Error en la tarea en segundo plano %s', self.nombre)
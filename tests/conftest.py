@@ -0,0 +1,53 @@
+import os
+import sys
+from datetime import date
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from registro_consultas import vigilante_consultas  # noqa: E402,F401  (fixture)
+from rotacion import turno_rotacion  # noqa: E402
+
+
+def crear_aplicacion(carpeta, **config):
+    """Una aplicación sin precalentar sobre una base y una carpeta de publicación temporales."""
+    from app import create_app
+
+    return create_app(dict({
+        'TESTING': True,
+        'PRECALENTAR': False,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(carpeta, 'turnos.db'),
+        'CARPETA_PUBLICADO': os.path.join(carpeta, 'publicado'),
+    }, **config))
+
+
+def cerrar_aplicacion(app):
+    # Las tareas en segundo plano terminan antes de borrar la carpeta
+    app.extensions['calendario'].cerrar()
+
+
+@pytest.fixture
+def app(tmp_path):
+    aplicacion = crear_aplicacion(str(tmp_path))
+    yield aplicacion
+    cerrar_aplicacion(aplicacion)
+
+
+@pytest.fixture
+def cliente(app):
+    return app.test_client()
+
+
+def editar(cliente, fecha, cirujano1, cirujano2, nombre_turno=None, aplicar_futuro=False, **extra):
+    """POST /actualizar_cirujanos; devuelve el JSON de la respuesta."""
+    if nombre_turno is None:
+        nombre_turno = turno_rotacion(date.fromisoformat(fecha))['nombre']
+    return cliente.post('/actualizar_cirujanos', json=dict({
+        'fecha': fecha,
+        'nombreTurno': nombre_turno,
+        'cirujano1': cirujano1,
+        'cirujano2': cirujano2,
+        'aplicarFuturo': aplicar_futuro,
+    }, **extra)).get_json()
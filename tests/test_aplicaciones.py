@@ -0,0 +1,41 @@
+from conftest import cerrar_aplicacion, crear_aplicacion, editar
+from modelos import db
+from registro_consultas import RegistroConsultas, VigilanteConsultas
+
+
+def test_dos_aplicaciones_en_el_mismo_proceso(tmp_path):
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    app_a = crear_aplicacion(str(tmp_path / 'a'))
+    app_b = crear_aplicacion(str(tmp_path / 'b'))
+    try:
+        cliente_a, cliente_b = app_a.test_client(), app_b.test_client()
+        revision_b = cliente_b.get('/api/sync').get_json()['revision']
+
+        with VigilanteConsultas(app_a) as vigilante:
+            assert editar(cliente_a, '2025-03-05', 'Dr. Uno', 'Dr. Dos')['success']
+            assert cliente_b.get('/').status_code == 200
+        # Las consultas de la otra aplicación no cuentan
+        assert [ruta for ruta, _ in vigilante.peticiones] == ['/actualizar_cirujanos']
+        with app_a.app_context():
+            motor_a = db.engine
+        with RegistroConsultas(motor_a) as registro:
+            cliente_b.get('/api/sync')
+        assert registro.total == 0
+
+        sync_a = cliente_a.get('/api/sync?since=0').get_json()
+        assert [celda['cirujanos'] for celda in sync_a['celdas']] == [['Dr. Uno', 'Dr. Dos']]
+        sync_b = cliente_b.get(f'/api/sync?since={revision_b}').get_json()
+        assert sync_b['meses'] == {} and sync_b['celdas'] == []
+
+        for servicios in (app_a.extensions['calendario'], app_b.extensions['calendario']):
+            servicios.publicador.tarea.esperar()
+        assert 'Dr. Uno' in cliente_a.get('/').get_data(as_text=True)
+        assert 'Dr. Uno' not in cliente_b.get('/').get_data(as_text=True)
+
+        # Cada aplicación lleva sus propias métricas
+        assert 'ruta="/actualizar_cirujanos"' in cliente_a.get('/metrics').get_data(as_text=True)
+        assert 'ruta="/actualizar_cirujanos"' not in cliente_b.get('/metrics').get_data(as_text=True)
+    finally:
+        cerrar_aplicacion(app_a)
+        cerrar_aplicacion(app_b)
@@ -0,0 +1,21 @@
+import os
+
+from sqlalchemy import create_engine, text
+
+from modelos import db
+
+
+def modo_diario(engine):
+    with engine.connect() as conexion:
+        return conexion.execute(text('PRAGMA journal_mode')).scalar().lower()
+
+
+def test_pragmas_solo_en_el_motor_de_la_aplicacion(app, tmp_path):
+    with app.app_context():
+        assert modo_diario(db.engine) == 'wal'
+
+    otro = create_engine('sqlite:///' + os.path.join(str(tmp_path), 'otra.db'))
+    try:
+        assert modo_diario(otro) == 'delete'
+    finally:
+        otro.dispose()
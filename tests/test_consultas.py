@@ -0,0 +1,99 @@
+"""
+Cada ruta con presupuesto en PRESUPUESTOS_CONSULTAS, medida en su caso más
+caro. Toda ruta que lee la base debe tener presupuesto; las demás van en
+RUTAS_SIN_BASE.
+"""
+from conftest import editar
+from registro_consultas import PRESUPUESTOS_CONSULTAS
+
+
+def consultas(vigilante, ruta):
+    return [total for regla, total in vigilante.peticiones if regla == ruta]
+
+
+def test_pagina_sin_publicar(cliente, vigilante_consultas):
+    assert cliente.get('/').status_code == 200
+    assert consultas(vigilante_consultas, '/') == [4]
+
+
+def test_pagina_publicada(app, cliente, vigilante_consultas):
+    app.extensions['calendario'].publicador.publicar(forzar=True)
+    assert cliente.get('/').status_code == 200
+    assert consultas(vigilante_consultas, '/') == [0]
+
+
+def test_actualizar_cirujanos(cliente, vigilante_consultas):
+    assert editar(cliente, '2025-03-05', 'Dr. Uno', 'Dr. Dos')['success']
+    # Ya con uno de los cirujanos puesto: sigue siendo un solo UPDATE
+    assert editar(cliente, '2025-03-05', 'Dr. Uno', 'Dr. Tres', aplicar_futuro=True)['success']
+    assert editar(cliente, '2025-03-05', 'Dr. Cuatro', 'Dr. Tres', aplicar_futuro=True)['success']
+    assert consultas(vigilante_consultas, '/actualizar_cirujanos') == [8, 8, 8]
+
+
+def test_api_sync(cliente, vigilante_consultas):
+    editar(cliente, '2025-03-05', 'Dr. Uno', 'Dr. Dos')
+    assert cliente.get('/api/sync').get_json()['success']
+    assert cliente.get('/api/sync?since=0').get_json()['celdas']
+    assert consultas(vigilante_consultas, '/api/sync') == [2, 4]
+
+
+def test_api_historial(cliente, vigilante_consultas):
+    editar(cliente, '2025-03-05', 'Dr. Uno', 'Dr. Dos')
+    assert cliente.get('/api/historial?mes=2025-03').get_json()['success']
+    assert cliente.get('/api/historial?fecha=2025-03-05&revision=0').get_json()['success']
+    assert consultas(vigilante_consultas, '/api/historial') == [3, 2]
+
+
+def test_calendarios(cliente, vigilante_consultas):
+    assert cliente.get('/calendario/2025/3').status_code == 200
+    assert cliente.get('/calendario/2025').status_code == 200
+    assert consultas(vigilante_consultas, '/calendario/<int:anio>/<int:mes>') == [2]
+    assert consultas(vigilante_consultas, '/calendario/<int:anio>') == [2]
+
+
+def test_version_y_guardia(cliente, vigilante_consultas):
+    # Solo la primera petición consulta la base
+    for _ in range(2):
+        assert cliente.get('/api/version').status_code == 200
+        assert cliente.get('/api/guardia?fecha=2025-03-05').status_code == 200
+    assert consultas(vigilante_consultas, '/api/version') == [1, 0]
+    assert consultas(vigilante_consultas, '/api/guardia') == [1, 0]
+
+
+def test_metricas_y_eventos(cliente, vigilante_consultas):
+    assert cliente.get('/metrics').status_code == 200
+    respuesta = cliente.get('/eventos?desde=0', buffered=False)
+    assert next(respuesta.response).startswith(b'retry:')
+    respuesta.close()
+    assert consultas(vigilante_consultas, '/metrics') == [0]
+    assert consultas(vigilante_consultas, '/eventos') == [0]
+
+
+def test_api_turnos(app, cliente, vigilante_consultas):
+    url = '/api/turnos?desde=2025-03-01&hasta=2025-03-31'
+    assert cliente.get(url).get_json()['celdas']
+    app.extensions['calendario'].publicador.publicar()
+    assert cliente.get(url).get_json()['celdas']
+    assert consultas(vigilante_consultas, '/api/turnos') == [2, 0]
+
+
+# Rutas que nunca leen la base: no llevan presupuesto
+RUTAS_SIN_BASE = {
+    '/calendario',             # redirige al mes actual
+    '/sw.js',                  # generado a partir de los estáticos
+    '/static/<path:nombre>',   # servido desde memoria por Estaticos
+}
+
+
+def test_rutas_sin_base(app, cliente, vigilante_consultas):
+    assert cliente.get('/calendario').status_code in (301, 302)
+    assert cliente.get('/sw.js').status_code == 200
+    assert cliente.get(app.extensions['calendario'].estaticos.url('calendario.js')).status_code == 200
+    assert {ruta for ruta, _ in vigilante_consultas.peticiones} == RUTAS_SIN_BASE
+    assert all(total == 0 for _, total in vigilante_consultas.peticiones)
+
+
+def test_todas_las_rutas_tienen_presupuesto(app):
+    reglas = {regla.rule for regla in app.url_map.iter_rules()}
+    assert set(PRESUPUESTOS_CONSULTAS) == reglas - RUTAS_SIN_BASE
+    assert not set(PRESUPUESTOS_CONSULTAS) & RUTAS_SIN_BASE
@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+
+import pytest
+
+import descanso
+from conftest import editar
+from descanso import REGLAS, Regla, infracciones_nuevas, revisar
+
+SEMANA = (Regla('7 días', 7, 2),)
+
+
+def filas(cirujano, dias, desde=date(2025, 3, 1)):
+    return [(desde + timedelta(days=dia), 'Turno lunes', cirujano, '') for dia in dias]
+
+
+def test_la_rotacion_cumple_las_reglas():
+    assert revisar(descanso.filas_rotacion(date(2025, 1, 1), date(2034, 12, 31))) == []
+
+
+def test_dias_consecutivos():
+    infracciones = revisar(filas('Dr. A', [0, 1]))
+    assert [(i.tipo, i.nombre, i.regla.nombre, i.cuenta) for i in infracciones] == [
+        ('equipo', 'Turno lunes', 'días consecutivos', 2),
+        ('cirujano', 'Dr. A', 'días consecutivos', 2),
+    ]
+
+
+def test_mismo_cirujano_en_las_dos_posiciones_cuenta_una_vez():
+    assert revisar([(date(2025, 3, 1), 'Turno lunes', 'Dr. A', 'Dr. A')], SEMANA) == []
+
+
+def test_orden_de_fecha():
+    with pytest.raises(ValueError):
+        revisar(filas('Dr. A', [3, 1]))
+
+
+def test_infraccion_existente_no_bloquea():
+    antes = filas('Dr. A', [0, 2, 4]) + filas('Dr. B', [5])
+    despues = filas('Dr. A', [0, 2, 4]) + filas('Dr. C', [5])
+    assert infracciones_nuevas(antes, sorted(despues), {'Dr. C'}, SEMANA) == []
+
+
+def test_infraccion_agravada_se_reporta():
+    # 3 guardias en la semana que termina el día 6; la edición agrega la cuarta
+    antes = filas('Dr. A', [0, 3, 6]) + filas('Dr. B', [1])
+    despues = filas('Dr. A', [0, 1, 3, 6])
+    antes.sort()
+    nuevas = infracciones_nuevas(antes, despues, {'Dr. A'}, SEMANA)
+    assert (date(2025, 3, 7), 4) in [(i.fecha, i.cuenta) for i in nuevas]
+
+
+def test_rango_afectado():
+    desde, hasta = descanso.rango_afectado([date(2025, 3, 10), date(2025, 3, 5)])
+    alcance = max(regla.dias for regla in REGLAS) - 1
+    assert (desde, hasta) == (date(2025, 3, 5) - timedelta(days=alcance), date(2025, 3, 10) + timedelta(days=alcance))
+
+
+def test_edicion_rechazada_y_forzada(cliente):
+    # Dr. Díaz (Turno lunes) está de guardia el 3 de marzo; ponerlo también el 4
+    respuesta = editar(cliente, '2025-03-04', 'Dr. Díaz', 'Dr. Otro')
+    assert not respuesta['success']
+    assert {i['regla'] for i in respuesta['infracciones']} >= {'días consecutivos'}
+    # No se guardó nada
+    assert cliente.get('/api/sync?since=0').get_json()['meses'] == {}
+
+    respuesta = editar(cliente, '2025-03-04', 'Dr. Díaz', 'Dr. Otro', forzar=True)
+    assert respuesta['success']
+    assert respuesta['avisos']
+    assert respuesta['celdas'][0]['cirujanos'] == ['Dr. Díaz', 'Dr. Otro']
+
+    # La infracción ya existe: cambiar el otro cirujano no la agrega ni la agrava
+    respuesta = editar(cliente, '2025-03-04', 'Dr. Díaz', 'Dr. Tercero')
+    assert respuesta['success']
+    assert respuesta['avisos'] == []
+
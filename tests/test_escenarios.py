@@ -0,0 +1,36 @@
+from datetime import date, timedelta
+
+import pytest
+
+import resolver_rotacion
+from escenarios import _dias_rotacion, _dias_turnos, evaluar
+from rotacion import TurnoCiclo, TurnoVolante
+
+
+def como_turnos(rotacion):
+    return {
+        nombre: TurnoCiclo(nombre, 'gray', parametros['fecha_inicial'], parametros['semana_inicial'])
+        if 'semana_inicial' in parametros else TurnoVolante(nombre, 'gray', parametros['fecha_inicial'])
+        for nombre, parametros in rotacion
+    }
+
+
+@pytest.fixture(scope='module')
+def rotacion():
+    return resolver_rotacion.resolver(procesos=1, limite=1)[0]
+
+
+@pytest.mark.parametrize('desfase', [0, 3, 8])
+def test_rotacion_coincide_con_turnos(rotacion, desfase):
+    # Incluye días antes de REFERENCIA y volantes corridos más allá del período del volante
+    rotacion = [(nombre, dict(parametros, fecha_inicial=parametros['fecha_inicial'] + timedelta(days=desfase))
+                 if nombre == 'Volante 1' else parametros) for nombre, parametros in rotacion]
+    desde, hasta = date(2024, 11, 1), date(2025, 6, 30)
+    assert _dias_rotacion(rotacion, desde, hasta) == _dias_turnos(como_turnos(rotacion), desde, hasta)
+
+
+def test_rotacion_sin_huecos_desde_referencia(rotacion):
+    resultado = evaluar(rotacion, resolver_rotacion.REFERENCIA, date(2026, 12, 31))
+    assert resultado['sin_cubrir'] == 0 and resultado['conflictos'] == 0
+    # Antes de REFERENCIA los volantes todavía no empezaron
+    assert evaluar(rotacion, date(2024, 12, 1), date(2024, 12, 29))['sin_cubrir'] > 0
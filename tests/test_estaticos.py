@@ -0,0 +1,71 @@
+import pytest
+
+import estaticos
+from estaticos import elegir_codificacion
+
+
+@pytest.mark.parametrize('header, esperada', [
+    ('', None),
+    ('gzip', 'gzip'),
+    ('gzip, deflate', 'gzip'),
+    ('gzip;q=0', None),
+    ('gzip;q=0, identity', None),
+    ('GZIP;Q=0.5', 'gzip'),
+    ('gzip;q=abc', None),
+    ('*', 'gzip'),
+    ('*, gzip;q=0', None),
+])
+def test_elegir_codificacion_sin_brotli(monkeypatch, header, esperada):
+    monkeypatch.setattr(estaticos, 'brotli', None)
+    assert elegir_codificacion(header) == esperada
+
+
+@pytest.mark.parametrize('header, esperada', [
+    ('gzip, br', 'br'),
+    ('br;q=0, gzip', 'gzip'),
+    ('br;q=0.5, gzip;q=0.8', 'gzip'),
+    ('br;q=0.8, gzip;q=0.8', 'br'),
+    ('*;q=0.1, br;q=0', 'gzip'),
+])
+def test_elegir_codificacion_con_brotli(monkeypatch, header, esperada):
+    monkeypatch.setattr(estaticos, 'brotli', object())
+    assert elegir_codificacion(header) == esperada
+
+
+def obtener(cliente, url, codificacion, etag=None):
+    headers = {'Accept-Encoding': codificacion}
+    if etag:
+        headers['If-None-Match'] = etag
+    return cliente.get(url, headers=headers)
+
+
+def test_recurso_con_etag_por_codificacion(app, cliente):
+    url = app.extensions['calendario'].estaticos.url('calendario.js')
+    comprimida = obtener(cliente, url, 'gzip')
+    sin_comprimir = obtener(cliente, url, 'gzip;q=0')
+    assert comprimida.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Encoding' not in sin_comprimir.headers
+    assert comprimida.headers['ETag'] != sin_comprimir.headers['ETag']
+    assert 'Accept-Encoding' in comprimida.headers['Vary']
+
+    assert obtener(cliente, url, 'gzip', comprimida.headers['ETag']).status_code == 304
+    # La ETag de otra variante no sirve para esta
+    assert obtener(cliente, url, 'identity', comprimida.headers['ETag']).status_code == 200
+
+
+def test_calendario_con_etag_por_codificacion(cliente):
+    comprimida = obtener(cliente, '/calendario/2025/3', 'gzip')
+    sin_comprimir = obtener(cliente, '/calendario/2025/3', 'identity')
+    assert comprimida.headers['Content-Encoding'] == 'gzip'
+    assert comprimida.headers['ETag'] != sin_comprimir.headers['ETag']
+
+    respuesta = obtener(cliente, '/calendario/2025/3', 'gzip', comprimida.headers['ETag'])
+    assert respuesta.status_code == 304
+    assert respuesta.headers['ETag'] == comprimida.headers['ETag']
+    assert obtener(cliente, '/calendario/2025/3', 'identity', sin_comprimir.headers['ETag']).status_code == 304
+    assert obtener(cliente, '/calendario/2025/3', 'identity', comprimida.headers['ETag']).status_code == 200
+
+
+def test_service_worker_revalida_comprimido(cliente):
+    primera = obtener(cliente, '/sw.js', 'gzip')
+    assert obtener(cliente, '/sw.js', 'gzip', primera.headers['ETag']).status_code == 304
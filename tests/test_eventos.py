@@ -0,0 +1,68 @@
+import json
+import threading
+
+from conftest import editar
+from eventos import DifusorCambios
+
+
+def crear_difusor(cambios, **opciones):
+    def leer_cambios(desde):
+        return [cambio for cambio in cambios if cambio[0] > desde]
+
+    def leer_ultimo_id():
+        return cambios[-1][0] if cambios else 0
+    return DifusorCambios(leer_cambios, leer_ultimo_id, intervalo=0.01, **opciones)
+
+
+def test_stream_entrega_los_cambios_posteriores():
+    cambios = [(1, '{"a":1}')]
+    difusor = crear_difusor(cambios)
+    stream = difusor.stream(0, heartbeat=1.0)
+    assert next(stream) == 'retry: 3000\nid: 0\n\n'
+    assert next(stream) == 'id: 1\nevent: cambio\ndata: {"a":1}\n\n'
+
+    cambios.append((2, '{"a":2}'))
+    assert next(stream) == 'id: 2\nevent: cambio\ndata: {"a":2}\n\n'
+    stream.close()
+
+
+def test_stream_con_heartbeat():
+    difusor = crear_difusor([])
+    stream = difusor.stream(0, heartbeat=0.01)
+    next(stream)
+    assert next(stream) == ': ping\n\n'
+    stream.close()
+
+
+def test_limite_de_conexiones():
+    difusor = crear_difusor([], max_conexiones=1, espera_sin_lugar=30.0)
+    primero = difusor.stream(0, heartbeat=1.0)
+    next(primero)
+
+    # Sin lugar: solo el retry, con la revisión para retomar desde ahí
+    segundo = difusor.stream(5)
+    assert list(segundo) == ['retry: 30000\nid: 5\n\n']
+
+    # Al cerrarse el primero se libera el lugar
+    primero.close()
+    tercero = difusor.stream(0, heartbeat=1.0)
+    assert next(tercero) == 'retry: 3000\nid: 0\n\n'
+    tercero.close()
+
+
+def test_eventos_de_punta_a_punta(cliente):
+    respuesta = cliente.get('/eventos?desde=0', buffered=False)
+    mensajes = iter(respuesta.response)
+    assert next(mensajes).startswith(b'retry: 3000\nid: 0')
+
+    recibido = []
+    hilo = threading.Thread(target=lambda: recibido.append(next(mensajes)))
+    hilo.start()
+    assert editar(cliente, '2025-03-05', 'Dr. Uno', 'Dr. Dos')['success']
+    hilo.join(timeout=10)
+    respuesta.close()
+
+    id_linea, evento, datos = recibido[0].decode('utf-8').strip().split('\n')
+    assert id_linea == 'id: 1' and evento == 'event: cambio'
+    celdas = json.loads(datos[len('data: '):])['celdas']
+    assert celdas[0]['cirujanos'] == ['Dr. Uno', 'Dr. Dos']
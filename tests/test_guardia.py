@@ -0,0 +1,38 @@
+import json
+from datetime import date
+
+from conftest import editar
+from guardia import CacheGuardia
+
+
+class DifusorFijo:
+    ultimo_id = 0
+
+    def suscribir(self, oyente):
+        pass
+
+    def iniciar(self):
+        pass
+
+
+def cambio(revision, fecha, *cirujanos):
+    celda = {'fecha': fecha, 'nombre': 'Turno lunes', 'color': 'pink', 'cirujanos': list(cirujanos)}
+    return revision, json.dumps({'celdas': [celda]})
+
+
+def test_un_cambio_viejo_no_pisa_uno_nuevo():
+    cache = CacheGuardia(lambda fecha: None, {'Turno lunes': 'pink'}, lambda: [], DifusorFijo())
+    cache.consultar(date(2025, 3, 3))
+
+    # La edición propia llega antes que la de otro worker, confirmada antes
+    cache.aplicar_cambios([cambio(5, '2025-03-03', 'Dr. Nuevo', 'Dr. B')])
+    cache.aplicar_cambios([cambio(4, '2025-03-03', 'Dr. Viejo', 'Dr. B'), cambio(5, '2025-03-03', 'Dr. Nuevo', 'Dr. B')])
+    assert cache.consultar(date(2025, 3, 3))['cirujanos'] == ['Dr. Nuevo', 'Dr. B']
+    assert cache.revision == 5
+
+
+def test_guardia_refleja_la_edicion_propia_enseguida(cliente):
+    assert cliente.get('/api/guardia?fecha=2025-03-05').get_json()['success']
+    assert editar(cliente, '2025-03-05', 'Dr. Uno', 'Dr. Dos')['success']
+    datos = cliente.get('/api/guardia?fecha=2025-03-05').get_json()
+    assert datos['cirujanos'] == ['Dr. Uno', 'Dr. Dos'] and datos['revision'] == 1
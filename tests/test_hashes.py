@@ -0,0 +1,53 @@
+import threading
+from datetime import date
+
+import app as modulo_app
+from conftest import cerrar_aplicacion, crear_aplicacion, editar
+from modelos import CirujanosTurno, HashMes, hash_celda
+
+
+def hashes_recalculados():
+    hashes = {}
+    for turno in CirujanosTurno.query:
+        mes = turno.fecha.replace(day=1)
+        hashes[mes] = hashes.get(mes, 0) ^ hash_celda(
+            turno.fecha, turno.nombre_turno, turno.cirujano1, turno.cirujano2)
+    return hashes
+
+
+def test_ediciones_intercaladas_de_dos_workers(tmp_path, monkeypatch):
+    # Dos aplicaciones sobre la misma base, como dos workers de gunicorn
+    primera = crear_aplicacion(str(tmp_path))
+    segunda = crear_aplicacion(str(tmp_path), CARPETA_PUBLICADO=str(tmp_path / 'publicado2'))
+    resultados = {}
+
+    def editar_en_segunda():
+        resultados['segunda'] = editar(segunda.test_client(), '2025-03-05', 'Dr. Tres', 'Dr. Cuatro')
+
+    original = modulo_app.actualizar_hashes_mes
+    intercalada = []
+
+    def actualizar_y_esperar(*args, **kwargs):
+        # La primera edición, a punto de confirmar, deja correr a la segunda
+        if not intercalada:
+            hilo = threading.Thread(target=editar_en_segunda)
+            intercalada.append(hilo)
+            hilo.start()
+            hilo.join(timeout=0.5)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(modulo_app, 'actualizar_hashes_mes', actualizar_y_esperar)
+    try:
+        resultados['primera'] = editar(primera.test_client(), '2025-03-05', 'Dr. Uno', 'Dr. Dos')
+        intercalada[0].join(timeout=10)
+        assert resultados['primera']['success'] and resultados['segunda']['success']
+
+        with primera.app_context():
+            guardados = {hash_mes.mes: hash_mes.hash for hash_mes in HashMes.query}
+            assert guardados == hashes_recalculados()
+            # La segunda esperó a que la primera confirmara: su edición queda
+            turno = CirujanosTurno.query.filter_by(fecha=date(2025, 3, 5)).one()
+            assert (turno.cirujano1, turno.cirujano2) == ('Dr. Tres', 'Dr. Cuatro')
+    finally:
+        cerrar_aplicacion(primera)
+        cerrar_aplicacion(segunda)
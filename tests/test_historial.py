@@ -0,0 +1,44 @@
+from datetime import date
+
+from conftest import cerrar_aplicacion, crear_aplicacion, editar
+from modelos import CAMBIOS_POR_PUNTO_CONTROL, PuntoControlMes
+
+
+def puntos_control(app, mes):
+    with app.app_context():
+        return [punto.revision for punto in PuntoControlMes.query.filter_by(mes=mes).order_by(PuntoControlMes.revision)]
+
+
+def test_historial_por_revision(cliente):
+    editar(cliente, '2025-03-05', 'Dr. Uno', 'Dr. Dos')
+    editar(cliente, '2025-03-05', 'Dr. Tres', 'Dr. Cuatro')
+
+    def cirujanos(revision):
+        datos = cliente.get(f'/api/historial?fecha=2025-03-05&revision={revision}').get_json()
+        return datos['celdas'][0]['cirujanos']
+
+    assert cirujanos(0) == ['Dr. García', 'Dr. Torres']
+    assert cirujanos(1) == ['Dr. Uno', 'Dr. Dos']
+    assert cirujanos(2) == ['Dr. Tres', 'Dr. Cuatro']
+
+
+def test_historial_parametros_invalidos(cliente):
+    assert cliente.get('/api/historial').status_code == 400
+    assert cliente.get('/api/historial?mes=2025-13').status_code == 400
+
+
+def test_puntos_de_control_sin_poder_publicar(tmp_path):
+    # Un archivo en lugar de la carpeta: publicar falla siempre
+    (tmp_path / 'publicado').write_text('')
+    app = crear_aplicacion(str(tmp_path), CARPETA_PUBLICADO=str(tmp_path / 'publicado' / 'no'))
+    try:
+        cliente = app.test_client()
+        for numero in range(CAMBIOS_POR_PUNTO_CONTROL):
+            assert editar(cliente, '2025-03-05', f'Dr. {numero}', 'Dr. Otro')['success']
+        app.extensions['calendario'].puntos_control.esperar()
+
+        assert puntos_control(app, date(2025, 3, 1)) == [0, CAMBIOS_POR_PUNTO_CONTROL]
+        datos = cliente.get(f'/api/historial?fecha=2025-03-05&revision={CAMBIOS_POR_PUNTO_CONTROL}').get_json()
+        assert datos['celdas'][0]['cirujanos'] == [f'Dr. {CAMBIOS_POR_PUNTO_CONTROL - 1}', 'Dr. Otro']
+    finally:
+        cerrar_aplicacion(app)
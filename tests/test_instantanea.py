@@ -0,0 +1,38 @@
+from datetime import date
+
+from conftest import editar
+from instantanea import InstantaneaBinaria, serializar_instantanea
+
+
+def test_instantanea_binaria_ida_y_vuelta(tmp_path):
+    filas = [
+        (date(2025, 3, 1), 'Equipo A', 'Dr. Uno', 'Dr. Dos'),
+        (date(2025, 3, 3), 'Equipo B', 'Dra. Ñandú', 'Dr. Dos'),
+        (date(2025, 3, 4), 'Equipo A', 'Dr. Uno', 'Dr. Dos'),
+    ]
+    ruta = tmp_path / 'calendario.bin'
+    ruta.write_bytes(serializar_instantanea([('Equipo A', '#f00'), ('Equipo B', '#0f0')], filas, 7))
+    instantanea = InstantaneaBinaria(str(ruta))
+
+    assert instantanea.revision == 7
+    assert instantanea.dia(date(2025, 3, 3)) == {
+        'nombre': 'Equipo B', 'color': '#0f0', 'cirujanos': ['Dra. Ñandú', 'Dr. Dos']}
+    assert instantanea.dia(date(2025, 3, 2)) is None
+    assert instantanea.dia(date(2025, 2, 28)) is None
+    assert [fecha for fecha, _ in instantanea.rango(date(2025, 1, 1), date(2025, 12, 31))] == [
+        date(2025, 3, 1), date(2025, 3, 3), date(2025, 3, 4)]
+    assert bytes(instantanea.codigos_rango(date(2025, 3, 2), date(2025, 3, 3))) == b'\x00\x02'
+
+
+def test_api_turnos_igual_con_y_sin_instantanea(app, cliente):
+    assert editar(cliente, '2025-03-05', 'Dr. Uno', 'Dr. Dos')['success']
+    url = '/api/turnos?desde=2025-03-01&hasta=2025-03-31'
+    desde_base = cliente.get(url).get_json()
+
+    app.extensions['calendario'].publicador.publicar()
+    assert app.extensions['calendario'].instantanea_publicada() is not None
+    desde_instantanea = cliente.get(url).get_json()
+
+    assert desde_instantanea == desde_base
+    por_fecha = {celda['fecha']: celda['cirujanos'] for celda in desde_base['celdas']}
+    assert por_fecha['2025-03-05'] == ['Dr. Uno', 'Dr. Dos']
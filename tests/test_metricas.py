@@ -0,0 +1,20 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from modelos import db
+
+
+def test_consultas_fallidas_no_dejan_estado_en_la_conexion(app):
+    with app.app_context(), db.engine.connect() as conexion:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conexion.execute(text('SELECT * FROM tabla_inexistente'))
+        assert conexion.execute(text('SELECT 1')).scalar() == 1
+        assert 'metricas_inicio' not in conexion.info
+
+
+def test_server_timing_cuenta_las_consultas(cliente):
+    respuesta = cliente.get('/')
+    assert 'desc="4 consultas"' in respuesta.headers['Server-Timing']
+    assert 'turnos_http_peticiones_total{ruta="/",codigo="200"}' in cliente.get('/metrics').get_data(as_text=True)
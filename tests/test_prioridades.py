@@ -0,0 +1,44 @@
+from datetime import date
+
+import pytest
+
+from prioridades import Flujo, resolver
+
+
+def test_gana_la_menor_prioridad_y_registra_las_anuladas():
+    base = Flujo('rotación', [(date(2025, 3, d), f'equipo {d}') for d in range(1, 6)], prioridad=2)
+    vacaciones = Flujo('vacaciones', [(date(2025, 3, 2), date(2025, 3, 3), 'reemplazo')], prioridad=1)
+    resolucion = resolver([base, vacaciones])
+
+    fijo = resolucion.capa('fijo')
+    assert fijo[date(2025, 3, 1)] == ('rotación', 'equipo 1')
+    assert fijo[date(2025, 3, 2)] == fijo[date(2025, 3, 3)] == ('vacaciones', 'reemplazo')
+    assert fijo[date(2025, 3, 4)] == ('rotación', 'equipo 4')
+    assert resolucion.anuladas == [
+        (date(2025, 3, 2), 'fijo', ('vacaciones', 'reemplazo'), ('rotación', 'equipo 2')),
+        (date(2025, 3, 3), 'fijo', ('vacaciones', 'reemplazo'), ('rotación', 'equipo 3')),
+    ]
+
+
+def test_a_igual_prioridad_gana_el_primer_flujo():
+    primero = Flujo('primero', [(date(2025, 3, 1), 'a')])
+    segundo = Flujo('segundo', [(date(2025, 3, 1), 'b')])
+    assert resolver([segundo, primero]).capa('fijo')[date(2025, 3, 1)] == ('segundo', 'b')
+
+
+def test_las_capas_no_compiten():
+    fijo = Flujo('fijo', [(date(2025, 3, 1), 'a')])
+    volante = Flujo('volante', [(date(2025, 3, 1), 'b')], capa='volante')
+    resolucion = resolver([fijo, volante])
+    assert resolucion.por_dia[date(2025, 3, 1)] == {'fijo': ('fijo', 'a'), 'volante': ('volante', 'b')}
+    assert resolucion.anuladas == []
+
+
+def test_dias_sin_asignaciones_se_saltan():
+    flujo = Flujo('f', [(date(2025, 1, 1), 'a'), (date(2025, 12, 31), 'b')])
+    assert list(resolver([flujo]).por_dia) == [date(2025, 1, 1), date(2025, 12, 31)]
+
+
+def test_rango_vacio():
+    with pytest.raises(ValueError):
+        resolver([Flujo('f', [(date(2025, 3, 2), date(2025, 3, 1), 'a')])])
@@ -0,0 +1,72 @@
+import gzip
+import os
+
+from conftest import editar
+from publicador import Publicador
+
+
+class Fuente:
+    """Datos en memoria para el publicador: los cambios son (revisión, año)."""
+
+    def __init__(self):
+        self.cambios = []
+        self.renderizados = []
+
+    def revision(self):
+        return self.cambios[-1][0] if self.cambios else 0
+
+    def renderizar_año(self, año):
+        self.renderizados.append(año)
+        return self.revision(), f'<section>{año} r{self.revision()}</section>'
+
+    def años_modificados(self, desde, hasta):
+        return {año for revision, año in self.cambios if desde < revision <= hasta}
+
+
+def crear_publicador(carpeta, fuente, adicionales=()):
+    return Publicador(carpeta, (2025, 2026), fuente.renderizar_año,
+                      lambda secciones, revision: f'r{revision}:' + ''.join(secciones),
+                      fuente.revision, fuente.años_modificados, adicionales)
+
+
+def test_publicar_solo_renderiza_los_años_con_cambios(tmp_path):
+    fuente = Fuente()
+    escritos = []
+    publicador = crear_publicador(str(tmp_path), fuente,
+                                  [lambda escribir: escritos.append(escribir('extra.txt', b'x'))])
+    publicador.publicar()
+    assert fuente.renderizados == [2025, 2026]
+
+    fuente.renderizados.clear()
+    publicador.publicar()
+    assert fuente.renderizados == []
+
+    fuente.cambios.append((1, 2026))
+    publicador.publicar()
+    assert fuente.renderizados == [2026]
+
+    pagina = (tmp_path / 'index.html').read_text(encoding='utf-8')
+    assert pagina == 'r1:<section>2025 r0</section><section>2026 r1</section>'
+    assert gzip.decompress((tmp_path / 'index.html.gz').read_bytes()).decode('utf-8') == pagina
+    assert len(escritos) == 2 and (tmp_path / 'extra.txt').read_bytes() == b'x'
+    assert not [nombre for nombre in os.listdir(tmp_path) if nombre.startswith('.index')]
+
+
+def test_publicar_forzado_renderiza_todo(tmp_path):
+    fuente = Fuente()
+    publicador = crear_publicador(str(tmp_path), fuente)
+    publicador.publicar()
+    fuente.renderizados.clear()
+    publicador.publicar(forzar=True)
+    assert fuente.renderizados == [2025, 2026]
+
+
+def test_pagina_publicada_tras_una_edicion(app, cliente):
+    assert editar(cliente, '2025-03-05', 'Dr. Uno', 'Dr. Dos')['success']
+    publicador = app.extensions['calendario'].publicador
+    publicador.tarea.esperar()
+
+    assert publicador.ruta_pagina() is not None
+    respuesta = cliente.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert respuesta.headers['Content-Encoding'] == 'gzip'
+    assert 'Dr. Uno' in gzip.decompress(respuesta.get_data()).decode('utf-8')
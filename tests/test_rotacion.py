@@ -0,0 +1,21 @@
+from datetime import date, timedelta
+
+from rotacion import CIRUJANOS_POR_DEFECTO, FIN_INSTANTANEA, TURNOS, turno_rotacion
+
+
+def test_turno_rotacion_desde_la_instantanea_coincide_con_turnos():
+    # Dentro y fuera del rango precalculado
+    for fecha in (date(2025, 3, 1) + timedelta(days=i) for i in range(90)):
+        esperado = next(({'nombre': nombre, 'color': turno.color,
+                          'cirujanos': CIRUJANOS_POR_DEFECTO[nombre]}
+                         for nombre, turno in TURNOS.items() if turno.get_turno_para_fecha(fecha)), None)
+        assert turno_rotacion(fecha) == esperado
+        fuera = FIN_INSTANTANEA + timedelta(days=1) + (fecha - date(2025, 3, 1))
+        esperado = next((nombre for nombre, turno in TURNOS.items() if turno.get_turno_para_fecha(fuera)), None)
+        assert (turno_rotacion(fuera) or {}).get('nombre') == esperado
+
+
+def test_turno_rotacion_devuelve_una_lista_nueva():
+    celda = turno_rotacion(date(2025, 3, 5))
+    celda['cirujanos'][0] = 'otro'
+    assert turno_rotacion(date(2025, 3, 5))['cirujanos'][0] != 'otro'
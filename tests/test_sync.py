@@ -0,0 +1,43 @@
+from datetime import date
+
+from conftest import editar
+from modelos import PuntoControlMes, db
+
+
+def test_sync_sin_since_devuelve_todos_los_meses(cliente):
+    datos = cliente.get('/api/sync').get_json()
+    assert datos['success'] and '2025-03' in datos['meses']
+    assert 'celdas' not in datos
+
+
+def test_sync_since_invalido(cliente):
+    assert cliente.get('/api/sync?since=abc').status_code == 400
+
+
+def test_sync_devuelve_el_ultimo_estado_de_cada_celda(cliente):
+    inicial = cliente.get('/api/sync').get_json()
+    editar(cliente, '2025-03-05', 'Dr. Uno', 'Dr. Dos')
+    editar(cliente, '2025-03-05', 'Dr. Tres', 'Dr. Cuatro')
+
+    datos = cliente.get(f'/api/sync?since={inicial["revision"]}').get_json()
+    assert datos['revision'] == inicial['revision'] + 2
+    assert list(datos['meses']) == ['2025-03']
+    assert datos['meses']['2025-03']['hash'] != inicial['meses']['2025-03']['hash']
+    assert [(celda['fecha'], celda['cirujanos']) for celda in datos['celdas']] == [
+        ('2025-03-05', ['Dr. Tres', 'Dr. Cuatro'])]
+
+    # Al día: nada nuevo
+    al_dia = cliente.get(f'/api/sync?since={datos["revision"]}').get_json()
+    assert al_dia['meses'] == {} and al_dia['celdas'] == []
+
+
+def test_sync_pide_reiniciar_si_el_historial_no_alcanza(app, cliente):
+    editar(cliente, '2025-03-05', 'Dr. Uno', 'Dr. Dos')
+    with app.app_context():
+        # Como si los puntos de control anteriores a la revisión 1 se hubieran podado
+        PuntoControlMes.query.filter(PuntoControlMes.revision < 1).delete()
+        db.session.add(PuntoControlMes(mes=date(2025, 3, 1), revision=1, datos='[]'))
+        db.session.commit()
+
+    datos = cliente.get('/api/sync?since=0').get_json()
+    assert datos['reiniciar'] and 'celdas' not in datos
@@ -1,5 +1,7 @@
 from datetime import datetime, timedelta
 
+from prioridades import Flujo, resolver
+
 def generate_volantes(start_date, end_date):
     """
     Genera las asignaciones para los turnos volante:
@@ -94,9 +96,10 @@ turno_martes    = generate_fixed_turno(martes_cycle_start, "Turno martes", end_2
 turno_miercoles = generate_fixed_turno(miercoles_cycle_start, "Turno miércoles", end_2025)
 turno_jueves    = generate_fixed_turno(jueves_cycle_start, "Turno jueves", end_2025)
 
-# ––– Fusionar asignaciones fijas en un diccionario para garantizar que
-# cada día tenga máximo una asignación fija.
-# Definimos una prioridad: (menor valor = mayor prioridad)
+# ––– Resolver superposiciones –––
+# Cada turno es un flujo de la capa "Fijo" con su prioridad (menor valor =
+# mayor prioridad), así que cada día queda con máximo una asignación fija.
+# Los volantes son otra capa: conviven con el turno fijo del día.
 priority = {
     "Turno jueves": 1,
     "Turno miércoles": 2,
@@ -104,42 +107,23 @@ priority = {
     "Turno lunes": 4
 }
 
-fixed_assignments = {}  # clave: fecha (date), valor: (turno, fase)
-for turno_list in [turno_lunes, turno_martes, turno_miercoles, turno_jueves]:
-    for (fecha, turno, fase) in turno_list:
-        # Convertir a fecha (sin hora)
-        day = fecha.date()
-        if day in fixed_assignments:
-            # Si ya existe asignación, conservar la de mayor prioridad
-            existing_turno = fixed_assignments[day][0]
-            if priority[turno] < priority[existing_turno]:
-                fixed_assignments[day] = (turno, fase)
-        else:
-            fixed_assignments[day] = (turno, fase)
-
-# ––– Combinar asignaciones volantes y fijas en un diccionario global –––
-# Para cada día del 2025, se mostrará la asignación fija (si existe)
-# y la asignación de volante (si existe).
-global_calendar = {}
-
-# Agregar asignaciones fijas:
-for day, (turno, fase) in fixed_assignments.items():
-    global_calendar[day] = {"Fijo": f"{turno} ({fase})"}
-
-# Agregar asignaciones de volantes (pueden convivir, ya que son otro grupo)
-for (fecha, vol) in volantes:
-    day = fecha.date()
-    # Si ya hay asignación de volante en ese día, concatenar; de lo contrario, crear la entrada.
-    if day in global_calendar:
-        global_calendar[day]["Volante"] = vol
-    else:
-        global_calendar[day] = {"Volante": vol}
+flujos = [
+    Flujo(turno_name, [(fecha, fase) for fecha, _, fase in turno_list], capa="Fijo", prioridad=priority[turno_name])
+    for turno_name, turno_list in [("Turno lunes", turno_lunes), ("Turno martes", turno_martes),
+                                   ("Turno miércoles", turno_miercoles), ("Turno jueves", turno_jueves)]
+]
+flujos.append(Flujo("Volantes", [(fecha, vol) for fecha, vol in volantes], capa="Volante"))
+resolucion = resolver(flujos)
 
 # ––– Imprimir el calendario (ordenado por fecha) –––
 print("Calendario de turnos 2025:")
-for day in sorted(global_calendar.keys()):
-    entry = global_calendar[day]
+for day, entry in resolucion.por_dia.items():
     date_str = day.strftime("%Y-%m-%d")
-    fijo = entry.get("Fijo", "—")
-    volante = entry.get("Volante", "—")
+    fijo = "{} ({})".format(*entry["Fijo"]) if "Fijo" in entry else "—"
+    volante = entry["Volante"][1] if "Volante" in entry else "—"
     print(f"{date_str}: Fijo -> {fijo} | Volante -> {volante}")
+
+# ––– Asignaciones fijas descartadas por prioridad –––
+print(f"\nAsignaciones anuladas: {len(resolucion.anuladas)}")
+for day, capa, (ganador, fase_ganador), (anulado, fase_anulada) in resolucion.anuladas:
+    print(f"{day}: {anulado} ({fase_anulada}) cede ante {ganador} ({fase_ganador})")